@@ -0,0 +1,701 @@
+#!/usr/bin/env python3
+
+"""
+Runs performance benchmarks of the OptiMathSAT Python API.
+
+Usage:
+
+    ~$ python3 bench.py strategies [options]
+    ~$ python3 bench.py loader [options]
+    ~$ python3 bench.py timer [options]
+    ~$ python3 bench.py allsat [options]
+    ~$ python3 bench.py profile [options]
+    ~$ python3 bench.py warmstart [options]
+"""
+
+###
+### SETUP PATHS
+###
+
+import argparse
+import csv
+import glob
+import itertools
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, 'include')
+LIB_DIR = os.path.join(BASE_DIR, 'lib')
+SMT2_DIR = os.path.join(BASE_DIR, 'unit-tests', 'smt2')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+###
+### OUTPUT
+###
+
+def print_rows(rows, columns):
+    """
+    Prints a list of benchmark records as a table.
+
+    :param rows: a list of dictionaries.
+    :param columns: the list of keys to be printed.
+    """
+    widths = [max([len(col)] + [len(str(row[col])) for row in rows]) for col in columns]
+    print("  ".join(col.rjust(width) for col, width in zip(columns, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(str(row[col]).rjust(width) for col, width in zip(columns, widths)))
+    return
+
+def store_rows(rows, columns, json_file=None, csv_file=None):
+    """
+    Stores a list of benchmark records in JSON and/or CSV format.
+
+    :param rows: a list of dictionaries.
+    :param columns: the list of keys to be stored in the CSV file.
+    :param json_file: the JSON output file, if any.
+    :param csv_file: the CSV output file, if any.
+    """
+    if json_file:
+        with open(json_file, 'w') as f:
+            json.dump(rows, f, indent=4)
+    if csv_file:
+        with open(csv_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+    return
+
+###
+### STRATEGIES BENCHMARK
+###
+
+STRATEGY_COLUMNS = ["instance", "opt.strategy", "opt.bin.pivot_position",
+                    "opt.bin.max_consecutive", "opt.abort_interval",
+                    "median_time", "linear_steps", "binary_steps",
+                    "status", "lower", "upper"]
+
+OPT_STATUS = ["unknown", "unsat", "sat_partial", "sat_approx", "sat_optimal"]
+
+def strategy_configs(args):
+    """
+    Enumerates the search configurations to be benchmarked.
+    The 'opt.bin.*' options are only varied for the strategies
+    that perform binary steps.
+
+    :param args: the parsed command-line arguments.
+
+    :returns: a list of option dictionaries.
+    """
+    ret = []
+    for strategy in args.strategies.split(","):
+        if strategy == "lin":
+            bin_opts = [(None, None)]
+        else:
+            bin_opts = itertools.product(args.pivots.split(","),
+                                         args.max_consecutive.split(","))
+        for (pivot, consecutive), interval in itertools.product(
+                bin_opts, (args.abort_intervals or "").split(",")):
+            opts = {"opt.strategy" : strategy}
+            if pivot is not None:
+                opts["opt.bin.pivot_position"] = pivot
+                opts["opt.bin.max_consecutive"] = consecutive
+            if interval:
+                opts["opt.abort_interval"] = interval
+            ret.append(opts)
+    return ret
+
+def run_strategy(instance, opts, objective, timeout):
+    """
+    Solves an instance with the given search configuration
+    in a separate process.
+
+    The solver-verbose output of the child process is used to
+    count the number of linear and binary search steps.
+
+    :param instance: the path of the SMT-LIBv2 instance.
+    :param opts: the search options.
+    :param objective: the cost function to be minimized.
+    :param timeout: the search timeout, in seconds, or None.
+
+    :returns: a dictionary with the solve time, the number of
+              search steps, the objective status and its final
+              bounds.
+    """
+    cmd = [sys.executable, os.path.abspath(__file__), "strategy-run",
+           instance, objective, json.dumps(opts)]
+    if timeout:
+        cmd += ["--timeout", str(timeout)]
+    output = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            check=True).stdout.decode("utf-8", errors="replace")
+    ret = {"linear_steps" : 0, "binary_steps" : 0}
+    for line in output.splitlines():
+        if " - linear step: " in line:
+            ret["linear_steps"] += 1
+        elif " - binary step: " in line:
+            ret["binary_steps"] += 1
+        elif line.startswith("BENCH "):
+            ret.update(json.loads(line[6:]))
+    return ret
+
+def strategy_run(args):
+    """
+    Solves a single instance and prints a 'BENCH <json>' line
+    with the outcome. This is executed in a child process of
+    bench_strategies().
+
+    :param args: the parsed command-line arguments.
+    """
+    from wrapper import (create_config, create_env, create_minimize, # pylint: disable=import-error,import-outside-toplevel
+                         assert_objective, get_objective_value_pretty_string,
+                         msat_from_smtlib2, msat_assert_formula, msat_solve,
+                         msat_objective_result, msat_set_termination_test,
+                         MSAT_ERROR_TERM, MSAT_FINAL_LOWER, MSAT_FINAL_UPPER,
+                         Timer)
+    opts = {"opt.verbose" : "true"}
+    opts.update(json.loads(args.options))
+    with create_config(opts) as cfg:
+        with create_env(cfg) as env:
+            with open(args.instance, 'r') as f:
+                term = msat_from_smtlib2(env, f.read())
+                assert not MSAT_ERROR_TERM(term)
+                msat_assert_formula(env, term)
+            if args.timeout:
+                callback = Timer(args.timeout)
+                msat_set_termination_test(env, callback)
+            with create_minimize(env, args.objective) as obj:
+                assert_objective(env, obj)
+                start = time.monotonic()
+                msat_solve(env)
+                elapsed = time.monotonic() - start
+                res = {
+                    "time" : elapsed,
+                    "status" : OPT_STATUS[msat_objective_result(env, obj) + 1],
+                    "lower" : get_objective_value_pretty_string(env, obj, MSAT_FINAL_LOWER),
+                    "upper" : get_objective_value_pretty_string(env, obj, MSAT_FINAL_UPPER),
+                }
+    sys.stdout.flush()
+    print("BENCH " + json.dumps(res))
+    return
+
+def bench_strategies(args):
+    """
+    Sweeps search strategies and their parameters over the
+    given SMT-LIBv2 instances.
+
+    :param args: the parsed command-line arguments.
+    """
+    instances = args.instances or sorted(glob.glob(os.path.join(SMT2_DIR, "*.smt2")))
+    rows = []
+    for instance, opts in itertools.product(instances, strategy_configs(args)):
+        runs = [run_strategy(instance, opts, args.objective, args.timeout)
+                for _ in range(args.repeat)]
+        row = {col : opts.get(col, "") for col in STRATEGY_COLUMNS}
+        row.update({
+            "instance" : os.path.basename(instance),
+            "median_time" : "{:.3f}".format(statistics.median(run["time"] for run in runs)),
+            "linear_steps" : runs[-1]["linear_steps"],
+            "binary_steps" : runs[-1]["binary_steps"],
+            "status" : runs[-1]["status"],
+            "lower" : runs[-1]["lower"],
+            "upper" : runs[-1]["upper"],
+        })
+        rows.append(row)
+        if args.progress:
+            print_rows([row], STRATEGY_COLUMNS)
+    print_rows(rows, STRATEGY_COLUMNS)
+    store_rows(rows, STRATEGY_COLUMNS, args.json, args.csv)
+    return
+
+###
+### LOADER BENCHMARK
+###
+
+LOADER_COLUMNS = ["instance", "mode", "size_mb", "median_time", "mb_per_s",
+                  "base_rss_mb", "peak_rss_mb"]
+
+def loader_run(args):
+    """
+    Loads a single instance with the given loader and prints a
+    'BENCH <json>' line with the elapsed time and the peak RSS.
+    This is executed in a child process of bench_loader().
+
+    :param args: the parsed command-line arguments.
+    """
+    from wrapper import (create_config, create_env, load_smtlib2_stream, # pylint: disable=import-error,import-outside-toplevel
+                         msat_from_smtlib2, msat_assert_formula, MSAT_ERROR_TERM)
+    with create_config({}) as cfg:
+        with create_env(cfg) as env:
+            base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            start = time.monotonic()
+            if args.mode == "read":
+                with open(args.instance, 'r') as f:
+                    term = msat_from_smtlib2(env, f.read())
+                    assert not MSAT_ERROR_TERM(term)
+                    msat_assert_formula(env, term)
+            else:
+                load_smtlib2_stream(env, args.instance, args.chunk_size)
+            elapsed = time.monotonic() - start
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # N.B.: ru_maxrss is expressed in KiB on Linux.
+    print("BENCH " + json.dumps({"time" : elapsed, "base" : base / 1024.0,
+                                 "peak" : peak / 1024.0}))
+    return
+
+def bench_loader(args):
+    """
+    Compares the throughput and the peak memory usage of loading
+    SMT-LIBv2 instances with f.read() and with the streaming loader.
+
+    :param args: the parsed command-line arguments.
+    """
+    instances = args.instances or sorted(glob.glob(os.path.join(SMT2_DIR, "*.smt2")))
+    rows = []
+    for instance, mode in itertools.product(instances, ("read", "stream")):
+        cmd = [sys.executable, os.path.abspath(__file__), "loader-run",
+               instance, mode, "--chunk-size", str(args.chunk_size)]
+        runs = []
+        for _ in range(args.repeat):
+            output = subprocess.run(cmd, stdout=subprocess.PIPE, check=True).stdout
+            line = [line for line in output.decode("utf-8").splitlines()
+                    if line.startswith("BENCH ")][-1]
+            runs.append(json.loads(line[6:]))
+        size = os.path.getsize(instance) / (1024.0 * 1024.0)
+        median = statistics.median(run["time"] for run in runs)
+        rows.append({
+            "instance" : os.path.basename(instance),
+            "mode" : mode,
+            "size_mb" : "{:.2f}".format(size),
+            "median_time" : "{:.3f}".format(median),
+            "mb_per_s" : "{:.2f}".format(size / median if median > 0 else float("inf")),
+            "base_rss_mb" : "{:.1f}".format(max(run["base"] for run in runs)),
+            "peak_rss_mb" : "{:.1f}".format(max(run["peak"] for run in runs)),
+        })
+    print_rows(rows, LOADER_COLUMNS)
+    store_rows(rows, LOADER_COLUMNS, args.json, args.csv)
+    return
+
+###
+### TIMER BENCHMARK
+###
+
+TIMER_COLUMNS = ["timer", "ns_per_call", "solve_time", "overshoot", "calls"]
+
+TIMER_KINDS = ("Timer", "SampledTimer", "ThreadedTimer")
+
+def make_timer(kind, timeout):
+    """
+    Creates a termination test of the given kind.
+
+    :param kind: the name of the timer class.
+    :param timeout: the number of seconds before a timeout.
+
+    :returns: a callable termination test.
+    """
+    import wrapper # pylint: disable=import-error,import-outside-toplevel
+    return getattr(wrapper, kind)(timeout)
+
+def timer_run(args):
+    """
+    Solves the 'timeout.py' workload with a given termination test,
+    and prints a 'BENCH <json>' line with the solve time and the
+    number of callback invocations. This is executed in a child
+    process of bench_timer().
+
+    :param args: the parsed command-line arguments.
+    """
+    from wrapper import (create_config, create_env, create_minimize, # pylint: disable=import-error,import-outside-toplevel
+                         assert_objective, msat_from_smtlib2, msat_assert_formula,
+                         msat_solve, msat_set_termination_test, MSAT_ERROR_TERM)
+    timer = make_timer(args.kind, args.timeout)
+    calls = [0]
+
+    def callback():
+        calls[0] += 1
+        return timer()
+
+    with create_config({"opt.soft_timeout" : "false", "opt.priority" : "box"}) as cfg:
+        with create_env(cfg) as env:
+            with open(args.instance, 'r') as f:
+                term = msat_from_smtlib2(env, f.read())
+                assert not MSAT_ERROR_TERM(term)
+                msat_assert_formula(env, term)
+            msat_set_termination_test(env, callback if args.count else timer)
+            if hasattr(timer, "reset"):
+                timer.reset()
+            with create_minimize(env, args.objective) as obj:
+                assert_objective(env, obj)
+                start = time.monotonic()
+                msat_solve(env)
+                elapsed = time.monotonic() - start
+    print("BENCH " + json.dumps({"time" : elapsed, "calls" : calls[0]}))
+    return
+
+def bench_timer(args):
+    """
+    Measures the overhead of the termination tests, both in a tight
+    loop and, optionally, on the 'timeout.py' workload.
+
+    :param args: the parsed command-line arguments.
+    """
+    rows = []
+    for kind in TIMER_KINDS:
+        timer = make_timer(kind, 3600.0)
+        start = time.perf_counter_ns()
+        for _ in range(args.calls):
+            timer()
+        elapsed = time.perf_counter_ns() - start
+        if hasattr(timer, "cancel"):
+            timer.cancel()
+        row = {"timer" : kind,
+               "ns_per_call" : "{:.1f}".format(elapsed / args.calls),
+               "solve_time" : "", "overshoot" : "", "calls" : ""}
+        if args.workload:
+            runs = []
+            for count in (False, True):
+                cmd = [sys.executable, os.path.abspath(__file__), "timer-run",
+                       kind, args.workload, args.objective, str(args.timeout)]
+                if count:
+                    cmd.append("--count")
+                output = subprocess.run(cmd, stdout=subprocess.PIPE, check=True).stdout
+                line = [line for line in output.decode("utf-8").splitlines()
+                        if line.startswith("BENCH ")][-1]
+                runs.append(json.loads(line[6:]))
+            row["solve_time"] = "{:.3f}".format(runs[0]["time"])
+            row["overshoot"] = "{:.3f}".format(runs[0]["time"] - args.timeout)
+            row["calls"] = runs[1]["calls"]
+        rows.append(row)
+    print_rows(rows, TIMER_COLUMNS)
+    store_rows(rows, TIMER_COLUMNS, args.json, args.csv)
+    return
+
+###
+### ALLSAT BENCHMARK
+###
+
+ALLSAT_COLUMNS = ["mode", "atoms", "models", "time", "models_per_s"]
+
+ALLSAT_MODES = ("printer", "collector")
+
+def allsat_run(args):
+    """
+    Enumerates the models of a disjunction of Boolean atoms with
+    either the AllSatModelPrinter or the AllSatCollector, and prints
+    a 'BENCH <json>' line with the number of models and the time.
+    This is executed in a child process of bench_allsat().
+
+    :param args: the parsed command-line arguments.
+    """
+    from wrapper import (create_config, create_env, make_bool_vars, # pylint: disable=import-error,import-outside-toplevel
+                         assert_string_formula, solve_all_sat, AllSatCollector)
+    names = ["b{}".format(idx) for idx in range(args.atoms)]
+    with create_config({}) as cfg:
+        with create_env(cfg, optimizing=False) as env:
+            make_bool_vars(env, names)
+            assert_string_formula(env, "(or {})".format(" ".join(names)))
+            callback = None
+            if args.mode == "collector":
+                callback = AllSatCollector(env, names, lambda chunk: None, args.chunk_size)
+            start = time.monotonic()
+            models = solve_all_sat(env, names, callback)
+            elapsed = time.monotonic() - start
+            if callback is not None:
+                models = callback.count
+    sys.stdout.flush()
+    print("BENCH " + json.dumps({"time" : elapsed, "models" : models}))
+    return
+
+def bench_allsat(args):
+    """
+    Compares the throughput of the AllSAT model printer and of the
+    AllSAT model collector.
+
+    :param args: the parsed command-line arguments.
+    """
+    rows = []
+    for mode in ALLSAT_MODES:
+        cmd = [sys.executable, os.path.abspath(__file__), "allsat-run", mode,
+               str(args.atoms), "--chunk-size", str(args.chunk_size)]
+        output = subprocess.run(cmd, stdout=subprocess.PIPE, check=True).stdout
+        line = [line for line in output.decode("utf-8").splitlines()
+                if line.startswith("BENCH ")][-1]
+        run = json.loads(line[6:])
+        rows.append({"mode" : mode,
+                     "atoms" : args.atoms,
+                     "models" : run["models"],
+                     "time" : "{:.3f}".format(run["time"]),
+                     "models_per_s" : "{:.0f}".format(run["models"] / run["time"])
+                                      if run["time"] else ""})
+    print_rows(rows, ALLSAT_COLUMNS)
+    store_rows(rows, ALLSAT_COLUMNS, args.json, args.csv)
+    return
+
+###
+### SEARCH PROFILE
+###
+
+def bench_profile(args):
+    """
+    Solves an instance recording each step of the optimization
+    search, prints the time spent per step kind and the gap closing
+    rate, and optionally stores a flame-chart JSON.
+
+    :param args: the parsed command-line arguments.
+    """
+    from wrapper import (create_config, create_env, create_minimize, # pylint: disable=import-error,import-outside-toplevel
+                         assert_objective, msat_from_smtlib2, msat_assert_formula,
+                         MSAT_ERROR_TERM)
+    from search_profile import profile_solve # pylint: disable=import-error,import-outside-toplevel
+    opts = {"opt.verbose" : "true"}
+    opts.update(json.loads(args.options))
+    with create_config(opts) as cfg:
+        with create_env(cfg) as env:
+            with open(args.instance, 'r') as f:
+                term = msat_from_smtlib2(env, f.read())
+                assert not MSAT_ERROR_TERM(term)
+                msat_assert_formula(env, term)
+            with create_minimize(env, args.objective) as obj:
+                assert_objective(env, obj)
+                _, profiler = profile_solve(env)
+    profiler.print_report()
+    if args.trace:
+        profiler.dump_trace(args.trace)
+    return
+
+###
+### WARM START BENCHMARK
+###
+
+WARMSTART_COLUMNS = ["step", "perturbation", "first", "cold_time", "warm_time", "speedup",
+                     "optimum", "fallback"]
+
+def warmstart_solve(cfg, args, perturbation, warm):
+    """
+    Solves the instance, extended with a perturbation, in a fresh
+    environment, so that no solver state is inherited from other runs.
+
+    :param cfg: the configuration of the environment.
+    :param args: the parsed command-line arguments.
+    :param perturbation: the SMT-LIBv2 formula to assert, or None.
+    :param warm: the WarmStart instance, or None for a cold solve.
+
+    :returns: a '(time, fallback, warm, optimum)' tuple, where 'time'
+              is the solving time and 'warm' the WarmStart of the
+              solution found.
+    """
+    from wrapper import (create_env, create_minimize, assert_objective, # pylint: disable=import-error,import-outside-toplevel
+                         assert_string_formula, msat_from_smtlib2, msat_assert_formula,
+                         MSAT_ERROR_TERM, get_warm_start, get_model, term_to_number,
+                         warm_solve)
+    with create_env(cfg) as env:
+        with open(args.instance, 'r') as f:
+            term = msat_from_smtlib2(env, f.read())
+            assert not MSAT_ERROR_TERM(term)
+            msat_assert_formula(env, term)
+        if perturbation is not None:
+            assert_string_formula(env, perturbation)
+        with create_minimize(env, args.objective) as obj:
+            assert_objective(env, obj)
+            start = time.monotonic()
+            with warm_solve(env, warm) as (ret, fallback):
+                elapsed = time.monotonic() - start
+                assert ret > 0
+                next_warm = get_warm_start(env, [("min", args.objective)])
+                with get_model(env) as model:
+                    optimum = term_to_number(model[args.objective])
+    return elapsed, fallback, next_warm, optimum
+
+def bench_warmstart(args):
+    """
+    Compares cold and warm re-solves over a sequence of perturbed
+    instances. Each perturbation forbids a course to be assigned to
+    the period it has in the previous optimal solution.
+
+    Every solve runs in a fresh environment, and the order of the
+    cold and warm solves is drawn at random at each step, so that
+    the speedup is reported separately for both orders.
+
+    :param args: the parsed command-line arguments.
+    """
+    import random # pylint: disable=import-outside-toplevel
+    from wrapper import create_config # pylint: disable=import-error,import-outside-toplevel
+    rng = random.Random(args.seed)
+    rows = []
+    with create_config(json.loads(args.options)) as cfg:
+        _, _, warm, _ = warmstart_solve(cfg, args, None, None)
+        for step in range(args.steps):
+            course = "{}__ARRAY__{}".format(args.variable, rng.randint(1, args.size))
+            period = dict(warm.model)[course]
+            perturbation = "(not (= {} {}))".format(course, period)
+            modes = ["cold", "warm"]
+            rng.shuffle(modes)
+            times = {}
+            for mode in modes:
+                times[mode], fallback, next_warm, optimum = warmstart_solve(
+                    cfg, args, perturbation, warm if mode == "warm" else None)
+                if mode == "warm":
+                    warm_fallback, following = fallback, next_warm
+            warm = following
+            rows.append({"step" : step,
+                         "perturbation" : perturbation,
+                         "first" : modes[0],
+                         "cold_time" : "{:.3f}".format(times["cold"]),
+                         "warm_time" : "{:.3f}".format(times["warm"]),
+                         "speedup" : "{:.2f}".format(times["cold"] / times["warm"])
+                                     if times["warm"] else "",
+                         "optimum" : str(optimum),
+                         "fallback" : warm_fallback})
+            if args.progress:
+                print_rows(rows[-1:], WARMSTART_COLUMNS)
+    print_rows(rows, WARMSTART_COLUMNS)
+    for first in ("cold", "warm"):
+        speedups = [float(row["speedup"]) for row in rows
+                    if row["first"] == first and row["speedup"]]
+        if speedups:
+            print("{} first: {} steps, median speedup {:.2f}".format(
+                first, len(speedups), statistics.median(speedups)))
+    store_rows(rows, WARMSTART_COLUMNS, args.json, args.csv)
+    return
+
+###
+### MAIN
+###
+
+def main():
+    """
+    Parses the command-line arguments and runs the requested benchmark.
+    """
+    parser = argparse.ArgumentParser(description="OptiMathSAT Python API benchmarks.")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    sub = subparsers.add_parser("strategies",
+                                help="sweep search strategies over SMT-LIBv2 instances")
+    sub.add_argument("instances", nargs="*",
+                     help="SMT-LIBv2 instances (default: unit-tests/smt2/*.smt2)")
+    sub.add_argument("--objective", default="objective",
+                     help="the cost function to minimize")
+    sub.add_argument("--strategies", default="lin,bin,ada")
+    sub.add_argument("--pivots", default="0.25,0.5,0.75",
+                     help="values of opt.bin.pivot_position")
+    sub.add_argument("--max-consecutive", default="1,2,5",
+                     help="values of opt.bin.max_consecutive")
+    sub.add_argument("--abort-intervals", default="",
+                     help="values of opt.abort_interval (default: unset)")
+    sub.add_argument("-n", "--repeat", type=int, default=3)
+    sub.add_argument("--timeout", type=float, default=None,
+                     help="search timeout of each run, in seconds")
+    sub.add_argument("--progress", action="store_true",
+                     help="print each record as soon as it is available")
+    sub.add_argument("--json", help="JSON output file")
+    sub.add_argument("--csv", help="CSV output file")
+    sub.set_defaults(func=bench_strategies)
+
+    sub = subparsers.add_parser("strategy-run", help=argparse.SUPPRESS)
+    sub.add_argument("instance")
+    sub.add_argument("objective")
+    sub.add_argument("options")
+    sub.add_argument("--timeout", type=float, default=None)
+    sub.set_defaults(func=strategy_run)
+
+    sub = subparsers.add_parser("loader",
+                                help="compare SMT-LIBv2 loading with f.read() and streaming")
+    sub.add_argument("instances", nargs="*",
+                     help="SMT-LIBv2 instances (default: unit-tests/smt2/*.smt2)")
+    sub.add_argument("--chunk-size", type=int, default=1 << 20,
+                     help="chunk size of the streaming loader, in bytes")
+    sub.add_argument("-n", "--repeat", type=int, default=3)
+    sub.add_argument("--json", help="JSON output file")
+    sub.add_argument("--csv", help="CSV output file")
+    sub.set_defaults(func=bench_loader)
+
+    sub = subparsers.add_parser("loader-run", help=argparse.SUPPRESS)
+    sub.add_argument("instance")
+    sub.add_argument("mode", choices=("read", "stream"))
+    sub.add_argument("--chunk-size", type=int, default=1 << 20)
+    sub.set_defaults(func=loader_run)
+
+    sub = subparsers.add_parser("timer",
+                                help="measure the overhead of termination tests")
+    sub.add_argument("--calls", type=int, default=1000000,
+                     help="number of calls in the tight loop")
+    sub.add_argument("--workload", nargs="?", const=os.path.join(SMT2_DIR, "bacp-19.smt2"),
+                     help="also solve an SMT-LIBv2 instance with each timer "
+                          "(default: the 'timeout.py' instance)")
+    sub.add_argument("--objective", default="objective",
+                     help="the cost function to minimize")
+    sub.add_argument("--timeout", type=float, default=2.0,
+                     help="search timeout of the workload, in seconds")
+    sub.add_argument("--json", help="JSON output file")
+    sub.add_argument("--csv", help="CSV output file")
+    sub.set_defaults(func=bench_timer)
+
+    sub = subparsers.add_parser("timer-run", help=argparse.SUPPRESS)
+    sub.add_argument("kind", choices=TIMER_KINDS)
+    sub.add_argument("instance")
+    sub.add_argument("objective")
+    sub.add_argument("timeout", type=float)
+    sub.add_argument("--count", action="store_true")
+    sub.set_defaults(func=timer_run)
+
+    sub = subparsers.add_parser("allsat",
+                                help="compare the AllSAT model printer and collector")
+    sub.add_argument("--atoms", type=int, default=16,
+                     help="number of Boolean atoms, i.e. about 2^atoms models")
+    sub.add_argument("--chunk-size", type=int, default=4096,
+                     help="number of models in a chunk of the collector")
+    sub.add_argument("--json", help="JSON output file")
+    sub.add_argument("--csv", help="CSV output file")
+    sub.set_defaults(func=bench_allsat)
+
+    sub = subparsers.add_parser("allsat-run", help=argparse.SUPPRESS)
+    sub.add_argument("mode", choices=ALLSAT_MODES)
+    sub.add_argument("atoms", type=int)
+    sub.add_argument("--chunk-size", type=int, default=4096)
+    sub.set_defaults(func=allsat_run)
+
+    sub = subparsers.add_parser("profile",
+                                help="record the steps of the optimization search")
+    sub.add_argument("instance", nargs="?", default=os.path.join(SMT2_DIR, "bacp-19.smt2"),
+                     help="SMT-LIBv2 instance (default: unit-tests/smt2/bacp-19.smt2)")
+    sub.add_argument("--objective", default="objective",
+                     help="the cost function to minimize")
+    sub.add_argument("--options", default='{"opt.strategy" : "ada"}',
+                     help="search options, as a JSON dictionary")
+    sub.add_argument("--trace", help="flame-chart JSON output file")
+    sub.set_defaults(func=bench_profile)
+
+    sub = subparsers.add_parser("warmstart",
+                                help="compare cold and warm re-solves of perturbed instances")
+    sub.add_argument("instance", nargs="?", default=os.path.join(SMT2_DIR, "bacp-19.smt2"),
+                     help="SMT-LIBv2 instance (default: unit-tests/smt2/bacp-19.smt2)")
+    sub.add_argument("--objective", default="objective",
+                     help="the cost function to minimize")
+    sub.add_argument("--variable", default="course_period",
+                     help="the family of variables to perturb")
+    sub.add_argument("--size", type=int, default=50,
+                     help="the number of variables of the family")
+    sub.add_argument("--steps", type=int, default=10,
+                     help="the number of perturbed instances")
+    sub.add_argument("--seed", type=int, default=0)
+    sub.add_argument("--options", default='{"model_generation" : "true"}',
+                     help="configuration options, as a JSON dictionary")
+    sub.add_argument("--progress", action="store_true",
+                     help="print each record as soon as it is available")
+    sub.add_argument("--json", help="JSON output file")
+    sub.add_argument("--csv", help="CSV output file")
+    sub.set_defaults(func=bench_warmstart)
+
+    args = parser.parse_args()
+    args.func(args)
+    return
+
+if __name__ == "__main__":
+    main()
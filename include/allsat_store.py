@@ -0,0 +1,227 @@
+"""
+On-disk store of AllSAT models.
+
+Models are stored as packed bit-rows over the important atoms, with
+bit 'i' of a row set iff the i-th atom is true, as produced by the
+AllSatCollector. The file layout is:
+
+    magic       8 bytes, b"OMTASAT1"
+    length      4 bytes, little-endian length of the header
+    header      JSON object with the 'atoms' names and the
+                'row_bytes' width of a row, padded with spaces
+                to a multiple of 8 bytes
+    rows        'row_bytes' bytes each, little-endian
+
+so that the number of models follows from the file size, and rows
+can be appended without rewriting the header.
+"""
+
+import json
+import mmap
+import struct
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### FORMAT
+###
+
+MAGIC = b"OMTASAT1"
+
+def _pad(data):
+    """
+    Pads a header so that rows are 8-byte aligned.
+
+    :param data: the encoded header.
+
+    :returns: the padded header.
+    """
+    size = len(MAGIC) + 4 + len(data)
+    return data + b" " * (-size % 8)
+
+###
+### WRITER
+###
+
+class AllSatWriter(object):
+    """
+    Appends AllSAT models to a store. An instance can be used as
+    the consumer of an AllSatCollector.
+    """
+
+    def __init__(self, path, atoms):
+        """
+        Class constructor.
+
+        :param path: the path of the store, which is overwritten.
+        :param atoms: the names of the important atoms.
+        """
+        self.atoms = [str(atom) for atom in atoms]
+        self.row_bytes = max(1, (len(self.atoms) + 7) // 8)
+        self.count = 0
+        header = _pad(json.dumps({"atoms" : self.atoms,
+                                  "row_bytes" : self.row_bytes}).encode("utf-8"))
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __call__(self, chunk):
+        """
+        Appends a chunk of models.
+
+        :param chunk: a list of integer bitsets.
+        """
+        row_bytes = self.row_bytes
+        self._file.write(b"".join(row.to_bytes(row_bytes, "little") for row in chunk))
+        self.count += len(chunk)
+        return
+
+    def close(self):
+        """
+        Flushes and closes the store.
+        """
+        if not self._file.closed:
+            self._file.close()
+        return
+
+def write_all_sat(env, important, path, chunk_size=4096, max_models=None, timeout=None): # pylint: disable=too-many-arguments,locally-disabled
+    """
+    Performs AllSat over the important atoms, storing the models
+    found in a file.
+
+    :param env: the environment to check.
+    :param important: an array of important atoms.
+    :param path: the path of the store, which is overwritten.
+    :param chunk_size: the number of models written at once.
+    :param max_models: the number of models after which the
+                       search is stopped, or None.
+    :param timeout: the number of wall-clock seconds after
+                    which the search is stopped, or None.
+
+    :returns: the number of models stored.
+    """
+    with AllSatWriter(path, important) as writer:
+        collector = AllSatCollector(env, important, writer, chunk_size, max_models, timeout)
+        msat_all_sat(env, collector.atoms, collector)
+        collector.flush()
+    return writer.count
+
+###
+### READER
+###
+
+class AllSatReader(object):
+    """
+    A memory-mapped, read-only view over a store of AllSAT models.
+    """
+
+    def __init__(self, path):
+        """
+        Class constructor.
+
+        :param path: the path of the store.
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise Exception("'{}' is not an AllSAT store.".format(path))
+            length, = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length).decode("utf-8"))
+            self.atoms = header["atoms"]
+            self.row_bytes = header["row_bytes"]
+            self._offset = len(MAGIC) + 4 + length
+            self._index = {atom : idx for idx, atom in enumerate(self.atoms)}
+            size = f.seek(0, 2)
+            self._count = (size - self._offset) // self.row_bytes
+            self._mmap = None
+            if size > self._offset:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Unmaps the store.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        return
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, idx):
+        """
+        Returns a model.
+
+        :param idx: the model index.
+
+        :returns: an integer bitset.
+        """
+        if idx < 0:
+            idx += self._count
+        if idx < 0 or idx >= self._count:
+            raise IndexError(idx)
+        start = self._offset + idx * self.row_bytes
+        return int.from_bytes(self._mmap[start:start + self.row_bytes], "little")
+
+    def __iter__(self):
+        for idx in range(self._count):
+            yield self[idx]
+
+    def assignment(self, idx):
+        """
+        Returns a model as an assignment.
+
+        :param idx: the model index.
+
+        :returns: a dictionary where 'key' is the atom name and
+                  'value' is its truth value.
+        """
+        row = self[idx]
+        return {atom : bool(row >> pos & 1) for pos, atom in enumerate(self.atoms)}
+
+    def filter(self, polarity):
+        """
+        Iterates over the models matching the given atom values.
+        Only the bytes holding such atoms are read.
+
+        :param polarity: a dictionary where 'key' is the atom name
+                         and 'value' is its required truth value.
+
+        :yields: the indices of the matching models.
+        """
+        tests = []
+        for atom, value in polarity.items():
+            if atom not in self._index:
+                raise KeyError(atom)
+            pos = self._index[atom]
+            tests.append((pos // 8, 1 << (pos % 8), bool(value)))
+        data = self._mmap
+        for idx in range(self._count):
+            start = self._offset + idx * self.row_bytes
+            if all(bool(data[start + byte] & bit) == value for byte, bit, value in tests):
+                yield idx
+
+    def count(self, polarity=None):
+        """
+        Counts the models matching the given atom values.
+
+        :param polarity: a dictionary where 'key' is the atom name
+                         and 'value' is its required truth value,
+                         or None.
+
+        :returns: the number of matching models.
+        """
+        if not polarity:
+            return self._count
+        return sum(1 for _ in self.filter(polarity))
@@ -0,0 +1,140 @@
+"""
+asyncio front-end for solving OMT problems.
+
+N.B.: unless the OptiMathSAT Python API has been built with thread
+support, the solver holds the GIL between two invocations of its
+termination test, so solves running on executor threads share one
+CPU with the event loop. To solve several problems in parallel, use
+solve_problem_async() on top of a SolveFarm.
+"""
+
+import asyncio
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### CANCELLATION
+###
+
+class CancelFlag(object): # pylint: disable=too-few-public-methods,locally-disabled
+    """
+    Termination test interrupting the search once cancel() is called,
+    or once an optional nested termination test (e.g. a Timer) fires.
+    """
+
+    def __init__(self, termination_test=None):
+        """
+        Class constructor.
+
+        :param termination_test: a callable returning non-zero when
+                                 the search must be interrupted,
+                                 or None.
+        """
+        self.cancelled = False
+        self._test = termination_test
+
+    def cancel(self):
+        """
+        Requests the interruption of the search.
+        """
+        self.cancelled = True
+        return
+
+    def __call__(self):
+        """
+        Callback function.
+
+        :returns: non-zero upon cancellation.
+        """
+        if self.cancelled:
+            return 1
+        if self._test is not None and self._test():
+            return 1
+        return 0
+
+###
+### ASYNC SOLVE
+###
+
+async def solve_async(env, timeout=None, executor=None, termination_test=None):
+    """
+    Checks the satisfiability of the given environment on an
+    executor thread, without blocking the event loop.
+
+    If the awaiting task is cancelled, the search is interrupted
+    and the cancellation is propagated once the solver has returned,
+    so that 'env' is never left in use by the executor thread.
+
+    The termination test of 'env' is replaced for the duration of
+    the search, and cleared once the solver has returned; a test
+    that must stay in effect is to be given as 'termination_test'.
+
+    :param env: the environment to check.
+    :param timeout: the number of seconds after which the search
+                    is interrupted, or None.
+    :param executor: the concurrent.futures.Executor to use, or
+                     None for the default executor of the loop.
+    :param termination_test: an additional termination test, or None.
+
+    :returns:
+        MSAT_SAT if the problem is satisfiable
+        MSAT_UNSAT if it is unsatisfiable, and
+        MSAT_UNKNOWN if there was some error, if the
+                     satisfiability can't be determined or if
+                     the deadline expired. In the latter case,
+                     partial objective results are available
+                     as with Timer.
+    """
+    flag = CancelFlag(termination_test)
+    msat_set_termination_test(env, flag)
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, msat_solve, env)
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        flag.cancel()
+        return await future
+    except asyncio.CancelledError:
+        flag.cancel()
+        await asyncio.wait([future])
+        raise
+    finally:
+        if future.done():
+            msat_set_termination_test(env, None)
+        else:
+            # N.B.: the task has been cancelled while waiting for
+            #       an interrupted search to return.
+            flag.cancel()
+            future.add_done_callback(lambda _: msat_set_termination_test(env, None))
+
+async def solve_problem_async(farm, problem, timeout=None):
+    """
+    Solves a problem on a SolveFarm, without blocking the event loop.
+
+    If the awaiting task is cancelled, or if the deadline expires,
+    the problem is cancelled on the farm.
+
+    :param farm: the SolveFarm instance to use.
+    :param problem: the problem description.
+    :param timeout: the number of seconds after which the search
+                    is interrupted, or None.
+
+    :returns: the result dictionary of the problem. Upon deadline
+              expiration, it is flagged as 'cancelled' and contains
+              the partial results found so far.
+
+    :raises asyncio.TimeoutError: if the deadline expires before
+                                  the problem is started.
+    """
+    cfuture = farm.submit(problem)
+    future = asyncio.wrap_future(cfuture)
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        farm.cancel(cfuture)
+        if cfuture.cancelled():
+            raise
+        return await future
+    except asyncio.CancelledError:
+        farm.cancel(cfuture)
+        raise
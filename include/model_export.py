@@ -0,0 +1,259 @@
+"""
+Bulk export of model values to NumPy arrays.
+
+This module requires NumPy.
+"""
+
+from fractions import Fraction
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+###
+### MODEL VALUES
+###
+
+def _require_numpy():
+    """
+    Checks that NumPy is available.
+    """
+    if numpy is None:
+        raise Exception("NumPy is required to export model values.")
+    return
+
+def _model_values(env, terms):
+    """
+    Evaluates a list of terms in the model currently loaded in
+    the given environment.
+
+    :param env: the environment in which to operate.
+    :param terms: the list of msat_term to evaluate.
+
+    :returns: the list of msat_term values.
+    """
+    model = msat_get_model(env)
+    if MSAT_ERROR_MODEL(model):
+        raise Exception("Unable to get model from environment.")
+    try:
+        return [msat_model_eval(model, term) for term in terms]
+    finally:
+        msat_destroy_model(model)
+
+def _model_strings(env, terms):
+    """
+    Evaluates a list of terms in the model currently loaded in
+    the given environment.
+
+    N.B.: the Python API gives no access to the GMP numbers within
+          a value term, so the value representation is the only
+          way to obtain its numeric value.
+
+    :param env: the environment in which to operate.
+    :param terms: the list of msat_term to evaluate.
+
+    :returns: the list of value representations.
+    """
+    return [msat_term_repr(value) for value in _model_values(env, terms)]
+
+def _object_array(values):
+    """
+    Stores a list of Python objects in a NumPy array.
+
+    :param values: the list of objects.
+
+    :returns: a numpy.ndarray of dtype object.
+    """
+    ret = numpy.empty(len(values), dtype=object)
+    ret[:] = values
+    return ret
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+def export_bool_values(env, terms):
+    """
+    Exports the values of Boolean terms.
+
+    :param env: the environment in which to operate.
+    :param terms: the list of msat_term, e.g. returned by
+                  make_bool_vars().
+
+    :returns: a numpy.ndarray of dtype bool.
+    """
+    _require_numpy()
+    # N.B.: Boolean values are represented as '`true`', so the
+    #       value term is checked instead.
+    return numpy.array([bool(msat_term_is_true(env, value))
+                        for value in _model_values(env, terms)], dtype=bool)
+
+def export_int_values(env, terms):
+    """
+    Exports the values of Integer terms.
+
+    :param env: the environment in which to operate.
+    :param terms: the list of msat_term, e.g. returned by
+                  make_int_vars().
+
+    :returns: a numpy.ndarray of dtype int64 or, if any value
+              does not fit 64 bits, of dtype object.
+    """
+    _require_numpy()
+    values = [int(value) for value in _model_strings(env, terms)]
+    if any(value < INT64_MIN or value > INT64_MAX for value in values):
+        return _object_array(values)
+    return numpy.array(values, dtype=numpy.int64)
+
+def export_rational_values(env, terms, exact=False):
+    """
+    Exports the values of Rational terms.
+
+    :param env: the environment in which to operate.
+    :param terms: the list of msat_term, e.g. returned by
+                  make_rational_vars().
+    :param exact: when enabled, values are returned as
+                  fractions.Fraction instances.
+
+    :returns: a numpy.ndarray of dtype float64, or of dtype
+              object when 'exact' is enabled.
+    """
+    _require_numpy()
+    values = [Fraction(value) for value in _model_strings(env, terms)]
+    if exact:
+        return _object_array(values)
+    return numpy.array(values, dtype=numpy.float64)
+
+def _bv_width(env, term):
+    """
+    Returns the width of a Bit-Vector term.
+
+    :param env: the environment in which to operate.
+    :param term: the msat_term.
+
+    :returns: the number of bits of 'term'.
+    """
+    res, width = msat_is_bv_type(env, msat_term_get_type(term))
+    if not res:
+        raise Exception("'{}' is not a Bit-Vector term.".format(msat_term_repr(term)))
+    return width
+
+def _bv_numbers(values, signed):
+    """
+    Parses Bit-Vector value representations.
+
+    :param values: the list of value representations,
+                   in the '<value>_<width>' format.
+    :param signed: when enabled, values are interpreted in
+                   two's complement.
+
+    :returns: the list of Python integers.
+    """
+    ret = []
+    for value in values:
+        number, _, bits = value.partition("_")
+        number = int(number)
+        if signed and number >> (int(bits) - 1):
+            number -= 1 << int(bits)
+        ret.append(number)
+    return ret
+
+def export_bv_values(env, terms, width=None, signed=False):
+    """
+    Exports the values of Bit-Vector terms.
+
+    :param env: the environment in which to operate.
+    :param terms: the list of msat_term, e.g. returned by
+                  make_bv_vars().
+    :param width: the largest Bit-Vector width among 'terms',
+                  or None to compute it from their types.
+    :param signed: when enabled, values are interpreted in
+                   two's complement.
+
+    :returns: a numpy.ndarray of the smallest unsigned (signed)
+              integer dtype that fits 'width' bits, or of dtype
+              object if 'width' is larger than 64.
+    """
+    _require_numpy()
+    if width is None:
+        width = max((_bv_width(env, term) for term in terms), default=1)
+    values = _bv_numbers(_model_strings(env, terms), signed)
+    if width > 64:
+        return _object_array(values)
+    for bits in (8, 16, 32, 64):
+        if width <= bits:
+            break
+    dtype = "int{}".format(bits) if signed else "uint{}".format(bits)
+    return numpy.array(values, dtype=dtype)
+
+FP_DTYPES = {
+    (5, 10) : ("float16", "uint16"),
+    (8, 23) : ("float32", "uint32"),
+    (11, 52) : ("float64", "uint64"),
+}
+
+def export_fp_values(env, terms):
+    """
+    Exports the values of Floating-Point terms, which must all
+    share the same IEEE 754 half, single or double precision format.
+
+    N.B.: values are read as their IEEE 754 bit pattern, so that
+          infinities and NaNs are preserved.
+
+    :param env: the environment in which to operate.
+    :param terms: the list of msat_term, e.g. returned by
+                  make_fp_vars().
+
+    :returns: a numpy.ndarray of dtype float16, float32 or float64.
+    """
+    _require_numpy()
+    formats = set()
+    for term in terms:
+        res, ebits, sbits = msat_is_fp_type(env, msat_term_get_type(term))
+        if not res:
+            raise Exception("'{}' is not a Floating-Point term.".format(msat_term_repr(term)))
+        formats.add((ebits, sbits))
+    if not formats:
+        return numpy.array([], dtype=numpy.float64)
+    if len(formats) > 1 or next(iter(formats)) not in FP_DTYPES:
+        raise Exception("Unsupported Floating-Point formats {}.".format(sorted(formats)))
+    fdtype, udtype = FP_DTYPES[formats.pop()]
+    bvs = [msat_make_fp_as_ieeebv(env, term) for term in terms]
+    values = _bv_numbers(_model_strings(env, bvs), False)
+    return numpy.array(values, dtype=udtype).view(fdtype)
+
+def export_all_values(env, vdict, bv_width=None, exact=False):
+    """
+    Exports the values of the variables declared with make_all_vars().
+
+    :param env: the environment in which to operate.
+    :param vdict: the dictionary returned by make_all_vars().
+    :param bv_width: the largest Bit-Vector width, or None to
+                     compute it from the types of the variables.
+    :param exact: when enabled, Rational values are returned as
+                  fractions.Fraction instances.
+
+    :returns: a dictionary where 'key' is the variable type
+              (bool|int|rational|bv|fp) and 'value' is the
+              numpy.ndarray of the values of such variables.
+              Types without variables are omitted.
+    """
+    ret = {}
+    for vtype, terms in vdict.items():
+        if not terms:
+            continue
+        if vtype == "bool":
+            ret[vtype] = export_bool_values(env, terms)
+        elif vtype == "int":
+            ret[vtype] = export_int_values(env, terms)
+        elif vtype == "rational":
+            ret[vtype] = export_rational_values(env, terms, exact)
+        elif vtype == "bv":
+            ret[vtype] = export_bv_values(env, terms, bv_width)
+        elif vtype == "fp":
+            ret[vtype] = export_fp_values(env, terms)
+        else:
+            raise Exception("Unsupported type '{}'.".format(vtype))
+    return ret
@@ -0,0 +1,162 @@
+"""
+Parallel Pareto front exploration by box-splitting.
+
+The range of each objective is first computed with a single
+'opt.priority=box' solve, in which every cost function is both
+minimized and maximized. The objective space is then partitioned
+into boxes, the Pareto front of the problem restricted to each box
+is enumerated on a SolveFarm, and the partial fronts are merged by
+discarding the points dominated by points of other boxes.
+
+Only Integer and Rational cost functions are supported.
+"""
+
+import itertools
+import time
+from fractions import Fraction
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### OBJECTIVE SPACE
+###
+
+def get_objective_ranges(farm, problem):
+    """
+    Computes the range of each objective of a problem.
+
+    :param farm: the SolveFarm instance to use.
+    :param problem: the problem description, whose objectives
+                    are '(min|max, cost_fun)' pairs.
+
+    :returns: a list of '(lower, upper)' pairs of numbers.
+    """
+    bounds = dict(problem)
+    bounds.pop("pareto", None)
+    bounds["options"] = dict(problem.get("options", {}), **{"opt.priority" : "box"})
+    bounds["objectives"] = [(kind, spec[1])
+                            for spec in problem.get("objectives", ())
+                            for kind in ("min", "max")]
+    res = farm.submit(bounds).result()
+    if res["status"] != "sat":
+        raise Exception("Unable to compute the objective ranges: {}.".format(res["status"]))
+    ret = []
+    for lower, upper in zip(res["objectives"][0::2], res["objectives"][1::2]):
+        if "value" not in lower or "value" not in upper:
+            raise Exception("Unbounded objective '{}'.".format(lower["term"]))
+        if isinstance(lower["value"], int) or isinstance(upper["value"], int):
+            raise Exception("Unsupported Bit-Vector objective '{}'.".format(lower["term"]))
+        ret.append((lower["value"], upper["value"]))
+    return ret
+
+def split_range(lower, upper, parts):
+    """
+    Splits a range into consecutive intervals. When both ends
+    are integers, so are the split points.
+
+    :param lower: the lower end of the range.
+    :param upper: the upper end of the range.
+    :param parts: the number of intervals.
+
+    :returns: a list of '(lower, upper, closed)' triples, where
+              'closed' tells whether 'upper' belongs to the interval.
+    """
+    integral = lower.denominator == 1 and upper.denominator == 1
+    points = [lower]
+    for idx in range(1, parts):
+        point = lower + (upper - lower) * idx / parts
+        if integral:
+            point = Fraction(point.numerator // point.denominator)
+        if points[-1] < point < upper:
+            points.append(point)
+    points.append(upper)
+    return [(points[idx], points[idx + 1], idx + 2 == len(points))
+            for idx in range(len(points) - 1)]
+
+def make_boxes(ranges, splits):
+    """
+    Partitions the objective space into boxes.
+
+    :param ranges: the '(lower, upper)' range of each objective.
+    :param splits: the number of intervals of each objective.
+
+    :returns: a list of boxes, each one a list with the
+              '(lower, upper, closed)' interval of each objective.
+    """
+    intervals = [split_range(lower, upper, parts)
+                 for (lower, upper), parts in zip(ranges, splits)]
+    return [list(box) for box in itertools.product(*intervals)]
+
+def box_constraints(cost_funs, box):
+    """
+    Returns the constraints restricting a problem to a box.
+
+    :param cost_funs: the cost function of each objective.
+    :param box: the '(lower, upper, closed)' interval of each objective.
+
+    :returns: a list of SMT-LIBv2 formulas.
+    """
+    ret = []
+    for cost_fun, (lower, upper, closed) in zip(cost_funs, box):
+        ret.append("(<= {} {})".format(number_to_smtlib2(lower), cost_fun))
+        ret.append("({} {} {})".format("<=" if closed else "<", cost_fun,
+                                       number_to_smtlib2(upper)))
+    return ret
+
+###
+### PARALLEL PARETO FRONT
+###
+
+def solve_pareto_split(farm, problem, splits=None):
+    """
+    Computes the Pareto front of a problem by enumerating the
+    front of each box of the objective space on a SolveFarm.
+
+    :param farm: the SolveFarm instance to use.
+    :param problem: the problem description, whose objectives
+                    are '(min|max, cost_fun)' pairs.
+    :param splits: the number of intervals in which the range of
+                   each objective is split, either a list or an int
+                   applying to the first objective only. By default,
+                   the first objective is split in as many intervals
+                   as the workers of 'farm'.
+
+    :returns: a '(front, stats)' pair, where 'front' is a ParetoFront
+              of ParetoPoint instances, with 'model' being a dictionary
+              of value representations, and 'stats' is a dictionary
+              with the number of 'boxes', the number of 'points' found
+              before merging and the 'ranges' of the objectives.
+    """
+    start = time.monotonic()
+    specs = list(problem.get("objectives", ()))
+    for spec in specs:
+        if spec[0] not in ("min", "max"):
+            raise Exception("Unsupported Pareto objective kind '{}'.".format(spec[0]))
+    if splits is None:
+        splits = farm.workers
+    if isinstance(splits, int):
+        splits = [splits] + [1] * (len(specs) - 1)
+
+    ranges = get_objective_ranges(farm, problem)
+    boxes = make_boxes(ranges, splits)
+    cost_funs = [spec[1] for spec in specs]
+
+    futures = []
+    for box in boxes:
+        region = dict(problem, pareto=True)
+        region["options"] = dict(problem.get("options", {}), **{"opt.priority" : "par"})
+        region["hard"] = list(problem.get("hard", ())) + box_constraints(cost_funs, box)
+        futures.append(farm.submit(region))
+
+    front = ParetoFront([spec[0] for spec in specs])
+    points = 0
+    for future in futures:
+        res = future.result()
+        if res["status"] == "error":
+            raise Exception(res["error"])
+        for entry in res.get("front", ()):
+            front.insert(ParetoPoint(points, entry["values"], entry["model"],
+                                     entry["latency"], time.monotonic() - start))
+            points += 1
+
+    return front, {"boxes" : len(boxes), "points" : points, "ranges" : ranges}
@@ -0,0 +1,401 @@
+"""
+Portfolio solving: the same problem is raced under several
+configurations in separate processes, and the first configuration
+to prove optimality wins, the others being cancelled through their
+termination tests.
+
+A problem is described as in solve_farm, with the optional
+'"smtlib2" : path' entry naming an SMT-LIBv2 file whose formula is
+asserted along with the 'hard' constraints.
+
+With a single 'min' or 'max' objective, the workers share their
+improving bounds: each worker periodically interrupts its search,
+publishes the cost of its best model, asserts the best bound known
+to the portfolio and resumes the search. A worker is also interrupted
+when a peer publishes a bound strictly better than the one it is
+using, at most once per cooldown period, since each interruption
+restarts its search.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import queue
+import time
+from contextlib import ExitStack
+from fractions import Fraction
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### CONFIGURATIONS
+###
+
+DEFAULT_PORTFOLIO = [
+    {"opt.strategy" : "lin"},
+    {"opt.strategy" : "bin", "opt.bin.pivot_position" : "0.5"},
+    {"opt.strategy" : "bin", "opt.bin.pivot_position" : "0.25"},
+    {"opt.strategy" : "ada", "opt.bin.max_consecutive" : "5"},
+    {"opt.maxsmt_engine" : "maxres"},
+]
+
+###
+### SHARED BOUND
+###
+
+class SharedBound(object):
+    """
+    The best objective value known to the portfolio, shared
+    among processes.
+    """
+
+    def __init__(self, sense, size=1024):
+        """
+        Class constructor.
+
+        :param sense: the objective direction, either 'min' or 'max'.
+        :param size: the maximum length of the value representation.
+        """
+        self._sign = 1 if sense == "min" else -1
+        self._lock = multiprocessing.Lock()
+        self._value = multiprocessing.RawArray('c', size)
+        self._version = multiprocessing.RawValue('q', 0)
+
+    @property
+    def version(self):
+        """
+        A counter incremented upon each improvement.
+        """
+        return self._version.value
+
+    def get(self):
+        """
+        Returns the best value.
+
+        :returns: a fractions.Fraction, or None.
+        """
+        with self._lock:
+            data = self._value.value
+        return Fraction(data.decode("ascii")) if data else None
+
+    def is_better(self, value, other):
+        """
+        Compares two objective values.
+
+        :param value: a number, or None.
+        :param other: a number, or None.
+
+        :returns: True if 'value' is strictly better than 'other'.
+        """
+        if value is None:
+            return False
+        return other is None or self._sign * value < self._sign * other
+
+    def offer(self, value):
+        """
+        Publishes an objective value, if it improves the best one.
+
+        :param value: a fractions.Fraction.
+
+        :returns: True if the best value has been updated.
+        """
+        with self._lock:
+            data = self._value.value
+            best = Fraction(data.decode("ascii")) if data else None
+            if not self.is_better(value, best):
+                return False
+            self._value.value = str(value).encode("ascii")
+            self._version.value += 1
+        return True
+
+###
+### WORKER PROCESS
+###
+
+class PortfolioTest(object): # pylint: disable=too-few-public-methods,locally-disabled
+    """
+    Termination test of a portfolio worker. The search is interrupted
+    when another worker has won, when it is time to publish the local
+    bound, or when another worker has published a bound strictly better
+    than the one in use, unless the last exchange is too recent.
+    """
+
+    def __init__(self, done, bound, interval, cooldown=None):
+        """
+        Class constructor.
+
+        :param done: a shared integer holding the index of the
+                     winner, or -1.
+        :param bound: the SharedBound instance, or None.
+        :param interval: the initial number of seconds between two
+                         bound exchanges, doubled after each one.
+        :param cooldown: the minimum number of seconds between an
+                         exchange and an interruption due to the
+                         bound of another worker, by default
+                         'interval'.
+        """
+        self._done = done
+        self._bound = bound
+        self._interval = interval
+        self._cooldown = interval if cooldown is None else cooldown
+        self._last = time.monotonic()
+        self._deadline = self._last + interval
+        self.current = None
+        self.seen = 0
+        self.cancelled = False
+        self.fired = False
+
+    def sync(self, current, version):
+        """
+        Signals that bounds have been exchanged.
+
+        :param current: the bound now in use by the worker, or None.
+        :param version: the version of the shared bound that has
+                        been read.
+        """
+        self._interval *= 2
+        self._last = time.monotonic()
+        self._deadline = self._last + self._interval
+        self.current = current
+        self.seen = version
+        self.fired = False
+        return
+
+    def __call__(self):
+        """
+        Callback function.
+
+        :returns: non-zero when the search must be interrupted.
+        """
+        if self._done.value >= 0:
+            self.cancelled = True
+            return 1
+        if self._bound is None:
+            return 0
+        now = time.monotonic()
+        if now >= self._deadline:
+            self.fired = True
+            return 1
+        version = self._bound.version
+        if version != self.seen and now - self._last >= self._cooldown:
+            self.seen = version
+            if self._bound.is_better(self._bound.get(), self.current):
+                self.fired = True
+                return 1
+        return 0
+
+def _setup(env, problem):
+    """
+    Asserts the constraints of a problem.
+
+    :param env: the environment in which to operate.
+    :param problem: the problem description.
+    """
+    make_all_vars(env, problem.get("decls", {}))
+    if problem.get("smtlib2"):
+        with open(problem["smtlib2"], 'r') as f:
+            term = msat_from_smtlib2(env, f.read())
+        if MSAT_ERROR_TERM(term):
+            raise Exception("Unable to parse SMT-LIBv2 file '{}'.".format(problem["smtlib2"]))
+        msat_assert_formula(env, term)
+    assert_string_formulas(env, problem.get("hard", ()))
+    assert_string_soft_formulas_dict(env, problem.get("soft", {}))
+    return
+
+def _incumbent(env, sense):
+    """
+    Returns the cost of the best model found by an interrupted search.
+
+    :param env: the environment in which to operate.
+    :param sense: the objective direction, either 'min' or 'max'.
+
+    :returns: a fractions.Fraction, or None.
+    """
+    for res in get_objective_results(env):
+        if res.status <= 0:
+            return None
+        value = res.upper if sense == "min" else res.lower
+        if value.infinity or value.epsilon:
+            return None
+        value = term_to_number(value.term)
+        # N.B.: Bit-Vector bounds are not shared.
+        return None if isinstance(value, int) else value
+    return None
+
+def _worker_main(index, problem, config, done, bound, results, interval, cooldown): # pylint: disable=too-many-arguments,too-many-locals,locally-disabled
+    """
+    Solves a problem under a configuration, posting the outcome on
+    the 'results' queue unless cancelled.
+
+    :param index: the configuration index.
+    :param problem: the problem description.
+    :param config: the configuration options overriding the ones
+                   of the problem.
+    :param done: a shared integer holding the index of the winner,
+                 or -1.
+    :param bound: the SharedBound instance, or None.
+    :param results: the queue on which the outcome is posted.
+    :param interval: the initial number of seconds between two
+                     bound exchanges.
+    :param cooldown: the minimum number of seconds between two
+                     interruptions due to the bounds of other workers.
+    """
+    start = time.monotonic()
+    res = {"index" : index, "config" : config, "restarts" : 0}
+    try:
+        options = dict(problem.get("options", {}), **config)
+        specs = problem.get("objectives", ())
+        with create_config(options) as cfg:
+            with create_env(cfg) as env:
+                _setup(env, problem)
+                test = PortfolioTest(done, bound, interval, cooldown)
+                msat_set_termination_test(env, test)
+                with ExitStack() as stack:
+                    for spec in specs:
+                        obj = stack.enter_context(OBJECTIVE_MAKERS[spec[0]](env, *spec[1:]))
+                        assert_objective(env, obj)
+                    cost_fun = specs[0][1] if bound is not None else None
+                    while True:
+                        ret = msat_solve(env)
+                        if test.cancelled:
+                            return
+                        results_list = get_objective_results(env, None, msat_from_string(env, "0"))
+                        if ret >= 0 and all(obj_res.status != MSAT_OPT_SAT_PARTIAL
+                                            for obj_res in results_list):
+                            break
+                        if not test.fired:
+                            break
+                        # exchange bounds, then resume the search
+                        value = _incumbent(env, specs[0][0])
+                        if value is not None:
+                            bound.offer(value)
+                        version = bound.version
+                        best = bound.get()
+                        current = test.current
+                        if bound.is_better(best, current):
+                            assert_string_formula(env, "({} {} {})".format(
+                                "<=" if specs[0][0] == "min" else ">=",
+                                cost_fun, number_to_smtlib2(best)))
+                            current = best
+                        test.sync(current, version)
+                        res["restarts"] += 1
+                    res["status"] = "sat" if ret > 0 else ("unsat" if ret == 0 else "unknown")
+                    res["objectives"] = [{
+                        "term" : str(obj_res.term),
+                        "status" : OBJECTIVE_STATUS[obj_res.status + 1],
+                        "optimum" : format_objective_value(obj_res.optimum)
+                                    if obj_res.status > 0
+                                    else format_objective_status(obj_res.status),
+                    } for obj_res in results_list]
+                    res["model"] = {}
+                    if ret > 0 and options.get("model_generation") == "true":
+                        res["model"] = {str(term) : str(value)
+                                        for term, value in get_model_values(env)}
+                msat_set_termination_test(env, None)
+    except Exception as exc: # pylint: disable=broad-except
+        res["status"] = "error"
+        res["error"] = str(exc)
+    res["time"] = time.monotonic() - start
+    results.put(res)
+
+###
+### PORTFOLIO
+###
+
+def problem_key(problem):
+    """
+    Computes an identifier of a problem, for logging purposes.
+
+    :param problem: the problem description.
+
+    :returns: the 'name' entry of the problem, if any, or a
+              digest of its description.
+    """
+    if "name" in problem:
+        return problem["name"]
+    data = json.dumps(problem, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+def solve_portfolio(problem, configs=None, timeout=None, share_bounds=True, # pylint: disable=too-many-arguments,too-many-locals,locally-disabled
+                    interval=0.5, cooldown=None, log=None):
+    """
+    Races a problem under several configurations, returning the
+    outcome of the first one that completes its search.
+
+    :param problem: the problem description.
+    :param configs: a list of dictionaries of configuration options,
+                    by default DEFAULT_PORTFOLIO.
+    :param timeout: the number of wall-clock seconds after which
+                    all workers are cancelled, or None.
+    :param share_bounds: enables sharing improving bounds among
+                         workers, when the problem has a single
+                         'min' or 'max' objective.
+    :param interval: the initial number of seconds between two bound
+                     exchanges of a worker, doubled after each one.
+    :param cooldown: the minimum number of seconds between an exchange
+                     of a worker and its interruption due to a better
+                     bound of another worker, by default 'interval'.
+    :param log: the path of a file to which a JSON line recording
+                the winning configuration is appended, or None.
+
+    :returns: a dictionary with the overall 'status' (sat|unsat|
+              unknown|error), the 'objectives' results and 'model'
+              of the winner, its 'index', 'config', number of
+              'restarts' and solving 'time', and the best 'bound'
+              shared among workers. A worker wins only if its
+              search completes with a sat or unsat answer; if none
+              does, the outcome of the first worker is returned.
+    """
+    configs = configs if configs is not None else DEFAULT_PORTFOLIO
+    specs = problem.get("objectives", ())
+    bound = None
+    if share_bounds and len(specs) == 1 and specs[0][0] in ("min", "max"):
+        bound = SharedBound(specs[0][0])
+    done = multiprocessing.RawValue('i', -1)
+    results = multiprocessing.Queue()
+    procs = []
+    for index, config in enumerate(configs):
+        proc = multiprocessing.Process(target=_worker_main,
+                                       args=(index, problem, config, done, bound,
+                                             results, interval, cooldown),
+                                       daemon=True)
+        proc.start()
+        procs.append(proc)
+
+    start = time.monotonic()
+    winner = None
+    failures = []
+    while winner is None and len(failures) < len(procs):
+        wait = None if timeout is None else timeout - (time.monotonic() - start)
+        if wait is not None and wait <= 0:
+            break
+        try:
+            res = results.get(timeout=wait)
+        except queue.Empty:
+            break
+        if res["status"] in ("sat", "unsat"):
+            winner = res
+        else:
+            failures.append(res)
+    done.value = winner["index"] if winner is not None else len(procs)
+    for proc in procs:
+        proc.join(1.0)
+        if proc.is_alive():
+            proc.terminate()
+            proc.join()
+
+    if winner is None:
+        winner = {"status" : "unknown", "index" : None, "config" : None}
+        if failures and len(failures) == len(procs):
+            winner = failures[0]
+    best = bound.get() if bound is not None else None
+    winner["bound"] = str(best) if best is not None else None
+    winner["wall"] = time.monotonic() - start
+    if log is not None and winner["index"] is not None:
+        with open(log, 'a') as f:
+            f.write(json.dumps({"problem" : problem_key(problem),
+                                "index" : winner["index"],
+                                "config" : winner["config"],
+                                "status" : winner["status"],
+                                "time" : winner["wall"]}) + "\n")
+    return winner
@@ -0,0 +1,424 @@
+"""
+Profiling of the linear/binary/adaptive optimization search.
+
+With 'opt.verbose=true', OptiMathSAT reports each step of the search
+on its output streams, e.g.:
+
+    # obj(objective) - linear step: 2
+    # obj(objective) -  new: 69
+    # obj(objective) -  update upper: [ (- oo), 69 ]
+    # obj(objective) - binary step: 1
+    # obj(objective) - pivot: (not (<= (to_real 0) objective))
+    # obj(objective) -  update lower: [ 0, 69 ]
+
+The SearchProfiler captures such lines while the solver runs, stamping
+each one with the time at which it is emitted, and turns them into a
+trace of steps, a per-step-kind report and a flame-chart JSON in the
+Trace Event Format (chrome://tracing, Perfetto, speedscope).
+"""
+
+import ctypes
+import json
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from fractions import Fraction
+
+try:
+    import pty
+except ImportError:
+    pty = None
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### OUTPUT CAPTURE
+###
+
+def _fflush():
+    """
+    Flushes the output buffers of the C library.
+    """
+    try:
+        ctypes.CDLL(None).fflush(None)
+    except (OSError, AttributeError):
+        pass
+    return
+
+class LineCapture(object):
+    """
+    Captures the lines written on some file descriptors, including
+    by C code, and stamps each one with the time it was read.
+
+    Lines are read by a forked process, since msat_solve() holds the
+    GIL and would otherwise both delay the time stamps until the end
+    of the search and, once the output fills the buffer of the
+    descriptors, block the solver on write(). The time stamps are
+    given by time.monotonic(), whose clock is system-wide.
+
+    A pseudo-terminal is used when available, so that the C library
+    flushes its output at the end of each line.
+    """
+
+    def __init__(self, fds=(1, 2), echo=False):
+        """
+        Class constructor.
+
+        :param fds: the file descriptors to capture.
+        :param echo: when enabled, captured lines are also written
+                     on the original standard output.
+        """
+        if not hasattr(os, "fork"):
+            raise Exception("Output capture requires os.fork().")
+        self._fds = fds
+        self._echo = echo
+        self._saved = []
+        self._pid = None
+        self._results = None
+        self.lines = []
+
+    def __enter__(self):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _fflush()
+        if pty is not None:
+            master, slave = pty.openpty()
+        else:
+            master, slave = os.pipe()
+        results, sink = os.pipe()
+        out = os.dup(self._fds[0]) if self._echo else None
+        self._pid = os.fork()
+        if self._pid == 0:
+            # N.B.: the reader must never return into the caller's code.
+            try:
+                os.close(slave)
+                os.close(results)
+                self._read(master, sink, out)
+            finally:
+                os._exit(0) # pylint: disable=protected-access
+        os.close(master)
+        os.close(sink)
+        if out is not None:
+            os.close(out)
+        self._results = results
+        self._saved = [os.dup(fd) for fd in self._fds]
+        for fd in self._fds:
+            os.dup2(slave, fd)
+        os.close(slave)
+        return self
+
+    def __exit__(self, *args):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _fflush()
+        # N.B.: restoring the descriptors closes the last copies of
+        #       the slave side, upon which the reader terminates.
+        for fd, saved in zip(self._fds, self._saved):
+            os.dup2(saved, fd)
+            os.close(saved)
+        self._saved = []
+        chunks = []
+        while True:
+            data = os.read(self._results, 65536)
+            if not data:
+                break
+            chunks.append(data)
+        os.close(self._results)
+        self._results = None
+        os.waitpid(self._pid, 0)
+        self._pid = None
+        for record in b"".join(chunks).decode("utf-8").split("\n")[:-1]:
+            now, _, line = record.partition("\t")
+            self.lines.append((float(now), line))
+
+    @staticmethod
+    def _read(master, sink, out):
+        """
+        Body of the reader process. Lines are kept in memory until
+        the end of the capture, so that the reader never blocks on
+        the parent process.
+
+        :param master: the descriptor from which lines are read.
+        :param sink: the descriptor on which the stamped lines are
+                     written at the end of the capture.
+        :param out: the descriptor on which lines are echoed, or None.
+        """
+        lines = []
+        pending = b""
+        while True:
+            try:
+                data = os.read(master, 65536)
+            except OSError:
+                # N.B.: reading the master side of a pseudo-terminal
+                #       fails with EIO once the slave side is closed.
+                data = b""
+            if not data:
+                break
+            now = time.monotonic()
+            if out is not None:
+                os.write(out, data.replace(b"\r\n", b"\n"))
+            pending += data
+            *chunk, pending = pending.split(b"\n")
+            for line in chunk:
+                lines.append((now, line.rstrip(b"\r")))
+        if pending:
+            lines.append((time.monotonic(), pending))
+        data = "".join("{!r}\t{}\n".format(now, line.decode("utf-8", errors="replace"))
+                       for now, line in lines).encode("utf-8")
+        while data:
+            data = data[os.write(sink, data):]
+        return
+
+###
+### TRACE
+###
+
+SearchStep = namedtuple("SearchStep", ["objective", "kind", "index", "pivot", "outcome",
+                                       "start", "end", "lower", "upper"])
+SearchStep.__doc__ = """
+A step of the optimization search: 'objective' is the cost function,
+'kind' either 'linear' or 'binary', 'index' the step number within its
+kind, 'pivot' the pivoting constraint of a binary step, or None,
+'outcome' one of 'sat', 'unsat' or 'unknown', 'start' and 'end' the
+times relative to the start of the profile, in seconds, and 'lower'
+and 'upper' the bounds of the objective after the step.
+"""
+
+VERBOSE_LINE = re.compile(r"^# obj\((?P<obj>.+?)\) -\s+(?P<msg>.*)$")
+
+def parse_bound(srepr):
+    """
+    Parses a bound reported by the solver.
+
+    :param srepr: the bound, in SMT-LIBv2 format, e.g. '(/ 137 4)'.
+
+    :returns: a fractions.Fraction, or +/-inf for infinite bounds.
+    """
+    srepr = srepr.strip()
+    if srepr == "oo":
+        return float("inf")
+    if srepr == "(- oo)":
+        return float("-inf")
+    match = re.match(r"^\(to_real (.*)\)$", srepr)
+    if match:
+        return parse_bound(match.group(1))
+    match = re.match(r"^\(- (.*)\)$", srepr)
+    if match:
+        return -parse_bound(match.group(1))
+    match = re.match(r"^\(/ (\S+) (\S+)\)$", srepr)
+    if match:
+        return Fraction(parse_bound(match.group(1))) / Fraction(parse_bound(match.group(2)))
+    return Fraction(srepr)
+
+def parse_search_trace(lines):
+    """
+    Turns the verbose lines of the solver into a list of steps.
+
+    :param lines: a list of '(time, line)' pairs, with times
+                  relative to the start of the profile.
+
+    :returns: a list of SearchStep instances, sorted by start time.
+    """
+    steps = []
+    current = {}
+    bounds = {}
+
+    def close(obj, now):
+        step = current.pop(obj, None)
+        if step is not None:
+            lower, upper = bounds.get(obj, (None, None))
+            steps.append(SearchStep(obj, step["kind"], step["index"], step["pivot"],
+                                    step["outcome"], step["start"], now, lower, upper))
+
+    for now, line in lines:
+        match = VERBOSE_LINE.match(line.strip())
+        if not match:
+            continue
+        obj, msg = match.group("obj"), match.group("msg")
+        key, _, value = msg.partition(":")
+        value = value.strip()
+        if key in ("linear step", "binary step"):
+            close(obj, now)
+            current[obj] = {"kind" : key.split()[0], "index" : int(value), "pivot" : None,
+                            "outcome" : "unsat", "start" : now}
+        elif key == "pivot" and obj in current:
+            current[obj]["pivot"] = value
+        elif key == "new" and obj in current:
+            current[obj]["outcome"] = "sat"
+        elif key in ("search start", "update upper", "update lower"):
+            lower, upper = value.strip("[] ").split(", ")
+            bounds[obj] = (parse_bound(lower), parse_bound(upper))
+            if key == "update lower" and not current.get(obj) and steps and \
+                    steps[-1].objective == obj:
+                # N.B.: the final lower bound of an optimal search is
+                #       reported after the end of the search.
+                steps[-1] = steps[-1]._replace(lower=bounds[obj][0], upper=bounds[obj][1])
+        elif key == "search end":
+            step = current.get(obj)
+            if step is not None and step["outcome"] != "sat" and \
+                    value not in ("sat_optimal", "unsat"):
+                # N.B.: the step has been interrupted.
+                step["outcome"] = "unknown"
+            close(obj, now)
+    for obj in list(current):
+        close(obj, lines[-1][0] if lines else 0.0)
+    return sorted(steps, key=lambda step: step.start)
+
+###
+### PROFILER
+###
+
+class SearchProfiler(object):
+    """
+    Records the steps of the optimization searches performed while
+    it is active. The environment must be configured with
+    'opt.verbose=true'.
+    """
+
+    def __init__(self, echo=False, fds=(1, 2)):
+        """
+        Class constructor.
+
+        :param echo: when enabled, the output of the solver is
+                     also written on the standard output.
+        :param fds: the file descriptors on which the solver
+                    writes its verbose output.
+        """
+        self._capture = LineCapture(fds, echo)
+        self._start = None
+        self._end = None
+        self.steps = []
+
+    def __enter__(self):
+        self._start = time.monotonic()
+        self._capture.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self._capture.__exit__(*args)
+        self._end = time.monotonic()
+        self.steps = parse_search_trace([(now - self._start, line)
+                                         for now, line in self._capture.lines])
+
+    @property
+    def elapsed(self):
+        """
+        The duration of the profile, in seconds.
+        """
+        return (self._end or time.monotonic()) - self._start
+
+    def report(self):
+        """
+        Summarizes the recorded steps.
+
+        :returns: a dictionary where 'key' is the objective and
+                  'value' is a dictionary with, for each step kind,
+                  the number of 'steps', of 'sat' and 'unsat'
+                  outcomes and the 'time' spent, plus the 'gaps'
+                  time series of '(time, upper - lower)' pairs and
+                  the 'gap_rate', the average gap reduction per
+                  second since the first finite gap.
+        """
+        ret = {}
+        for step in self.steps:
+            entry = ret.setdefault(step.objective, {"gaps" : [], "gap_rate" : None})
+            kind = entry.setdefault(step.kind, {"steps" : 0, "sat" : 0, "unsat" : 0,
+                                                "time" : 0.0})
+            kind["steps"] += 1
+            kind["time"] += step.end - step.start
+            if step.outcome in ("sat", "unsat"):
+                kind[step.outcome] += 1
+            if step.lower is not None:
+                gap = step.upper - step.lower
+                if gap != float("inf"):
+                    entry["gaps"].append((step.end, float(gap)))
+        for entry in ret.values():
+            gaps = entry["gaps"]
+            if len(gaps) > 1 and gaps[-1][0] > gaps[0][0]:
+                entry["gap_rate"] = (gaps[0][1] - gaps[-1][1]) / (gaps[-1][0] - gaps[0][0])
+        return ret
+
+    def print_report(self):
+        """
+        Prints the report of the recorded steps.
+        """
+        for obj, entry in sorted(self.report().items()):
+            print("objective: {}".format(obj))
+            print("\t{:<8s} {:>6s} {:>6s} {:>6s} {:>10s}".format(
+                "step", "count", "sat", "unsat", "time (s)"))
+            for kind in ("linear", "binary"):
+                if kind in entry:
+                    stats = entry[kind]
+                    print("\t{:<8s} {:>6d} {:>6d} {:>6d} {:>10.3f}".format(
+                        kind, stats["steps"], stats["sat"], stats["unsat"], stats["time"]))
+            if entry["gap_rate"] is not None:
+                print("\tgap closing rate: {:.3f}/s".format(entry["gap_rate"]))
+        return
+
+    def to_trace(self):
+        """
+        Returns the recorded steps in the Trace Event Format, with one
+        enclosing event per objective search.
+
+        :returns: a JSON-serializable dictionary.
+        """
+        events = []
+        tids = {}
+        for step in self.steps:
+            tid = tids.setdefault(step.objective, len(tids))
+            events.append({
+                "name" : "{} step {}".format(step.kind, step.index),
+                "cat" : step.kind,
+                "ph" : "X",
+                "ts" : step.start * 1e6,
+                "dur" : (step.end - step.start) * 1e6,
+                "pid" : 0,
+                "tid" : tid,
+                "args" : {
+                    "pivot" : step.pivot,
+                    "outcome" : step.outcome,
+                    "lower" : str(step.lower),
+                    "upper" : str(step.upper),
+                },
+            })
+        for obj, tid in tids.items():
+            obj_steps = [step for step in self.steps if step.objective == obj]
+            start = min(step.start for step in obj_steps)
+            end = max(step.end for step in obj_steps)
+            events.append({"name" : "search {}".format(obj), "cat" : "search", "ph" : "X",
+                           "ts" : start * 1e6, "dur" : (end - start) * 1e6,
+                           "pid" : 0, "tid" : tid})
+            events.append({"name" : "thread_name", "ph" : "M", "pid" : 0, "tid" : tid,
+                           "args" : {"name" : obj}})
+        return {"traceEvents" : events, "displayTimeUnit" : "ms"}
+
+    def dump_trace(self, path):
+        """
+        Stores the recorded steps in the Trace Event Format.
+
+        :param path: the JSON output file.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_trace(), f, indent=1)
+        return
+
+def profile_solve(env, echo=False):
+    """
+    Checks the satisfiability of the given environment, recording
+    the steps of the optimization search.
+
+    :param env: the environment to check, configured with
+                'opt.verbose=true'.
+    :param echo: when enabled, the output of the solver is
+                 also written on the standard output.
+
+    :returns: a '(ret, profiler)' pair, where 'ret' is the result
+              of msat_solve() and 'profiler' a SearchProfiler.
+    """
+    with SearchProfiler(echo) as profiler:
+        before = time.monotonic()
+        ret = msat_solve(env)
+        log_solve_time(time.monotonic() - before)
+    return ret, profiler
@@ -0,0 +1,432 @@
+"""
+Multi-process execution layer for independent OMT problems.
+
+A problem is described by a dictionary with the same data used
+by the unit-tests:
+
+    {
+        "options"    : { "model_generation" : "true", ... },
+        "decls"      : { "int" : ("x", "y"), ... },
+        "hard"       : [ "(<= 0 x)", ... ],
+        "soft"       : { "goal" : (("(< x 0)", "1"), ...) },
+        "objectives" : [ ("min", "x"), ("maxmin", ("x", "y")), ... ],
+    }
+
+where each objective is a '(kind, cost_fun)' or '(kind, cost_fun,
+signed)' tuple, and 'kind' is one of min|max|minmax|maxmin.
+
+With the optional '"pareto" : True' entry, and 'opt.priority=par'
+among the options, the Pareto front of the objectives is enumerated,
+up to the optional '"max_points"' entry.
+"""
+
+import collections
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import ExitStack
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### PROBLEM SOLVING
+###
+
+def solve_problem(pool, problem, termination_test=None):
+    """
+    Solves a problem within an environment taken from a pool.
+
+    :param pool: the EnvPool instance to use.
+    :param problem: the problem description.
+    :param termination_test: a callable returning non-zero when
+                             the search must be interrupted, or None.
+
+    :returns: a dictionary with the overall 'status' (sat|unsat|
+              unknown), the 'objectives' results and the 'model'
+              or, if the problem has the 'pareto' flag, the 'front'
+              of Pareto-optimal points.
+    """
+    options = problem.get("options", {})
+    with pool.acquire(options, problem.get("decls", {})) as env:
+        if termination_test is not None:
+            msat_set_termination_test(env, termination_test)
+        try:
+            assert_string_formulas(env, problem.get("hard", ()))
+            assert_string_soft_formulas_dict(env, problem.get("soft", {}))
+            with ExitStack() as stack:
+                for spec in problem.get("objectives", ()):
+                    obj = stack.enter_context(OBJECTIVE_MAKERS[spec[0]](env, *spec[1:]))
+                    assert_objective(env, obj)
+
+                if problem.get("pareto"):
+                    res = _solve_pareto(env, problem.get("max_points"))
+                else:
+                    res = _solve_single(env, options)
+        finally:
+            # N.B.: the environment is returned to the pool.
+            if termination_test is not None:
+                msat_set_termination_test(env, None)
+    return res
+
+def _solve_pareto(env, max_points=None):
+    """
+    Enumerates the Pareto front of the objectives asserted in an
+    environment configured with 'opt.priority=par'.
+
+    :param env: the environment in which to operate.
+    :param max_points: the maximum number of points, or None.
+
+    :returns: a dictionary with the overall 'status' (sat|unsat)
+              and the 'front', a list of dictionaries with the
+              objective 'values', the 'model' and the 'latency'
+              of each point.
+    """
+    front = []
+    for point in iter_pareto_front(env, max_points=max_points):
+        front.append({
+            "values" : point.values,
+            "model" : {str(term) : str(value) for term, value in point.model.items()},
+            "latency" : point.latency,
+        })
+    return {"status" : "sat" if front else "unsat", "front" : front}
+
+def _solve_single(env, options):
+    """
+    Solves the objectives asserted in an environment.
+
+    :param env: the environment in which to operate.
+    :param options: the configuration options.
+
+    :returns: a dictionary with the overall 'status' (sat|unsat|
+              unknown), the 'objectives' results and the 'model'.
+    """
+    ret = msat_solve(env)
+    res = {
+        "status" : "sat" if ret > 0 else ("unsat" if ret == 0 else "unknown"),
+        "objectives" : [],
+        "model" : {},
+    }
+    for obj_res in get_objective_results(env, None, msat_from_string(env, "0")):
+        entry = {
+            "term" : str(obj_res.term),
+            "status" : OBJECTIVE_STATUS[obj_res.status + 1],
+        }
+        if obj_res.status > 0:
+            entry["optimum"] = format_objective_value(obj_res.optimum)
+            entry["lower"] = format_objective_value(obj_res.lower)
+            entry["upper"] = format_objective_value(obj_res.upper)
+            if not obj_res.optimum.infinity and not obj_res.optimum.epsilon:
+                entry["value"] = term_to_number(obj_res.optimum.term)
+        else:
+            entry["optimum"] = format_objective_status(obj_res.status)
+        res["objectives"].append(entry)
+    if ret > 0 and options.get("model_generation") == "true":
+        res["model"] = {str(term) : str(value)
+                        for term, value in get_model_values(env)}
+    return res
+
+###
+### WORKER PROCESS
+###
+
+class SharedCancelTest(object): # pylint: disable=too-few-public-methods,locally-disabled
+    """
+    Termination test interrupting the search when the parent process
+    requests the cancellation of the task being solved.
+    """
+
+    def __init__(self, cancel, task_id):
+        """
+        Class constructor.
+
+        :param cancel: a shared integer holding the identifier
+                       of the task to be cancelled.
+        :param task_id: the identifier of the current task.
+        """
+        self._cancel = cancel
+        self._task_id = task_id
+
+    def __call__(self):
+        """
+        Callback function.
+
+        :returns: non-zero upon cancellation.
+        """
+        return 1 if self._cancel.value == self._task_id else 0
+
+def _worker_main(index, conn, results, cancel, pool_size):
+    """
+    Main loop of a worker process: solves the problems received
+    through 'conn' and posts the results on the 'results' queue.
+
+    :param index: the worker index.
+    :param conn: the connection from which tasks are received.
+    :param results: the queue on which results are posted.
+    :param cancel: a shared integer holding the identifier of
+                   the task to be cancelled.
+    :param pool_size: the number of idle environments kept for
+                      each group of equivalent problems.
+    """
+    pool = EnvPool(size=pool_size)
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            task_id, problem = msg
+            start = time.monotonic()
+            try:
+                res = solve_problem(pool, problem, SharedCancelTest(cancel, task_id))
+            except Exception as exc: # pylint: disable=broad-except
+                res = {"status" : "error", "error" : str(exc)}
+            res["cancelled"] = cancel.value == task_id
+            res["time"] = time.monotonic() - start
+            res["worker"] = index
+            results.put((index, task_id, res))
+    finally:
+        pool.clear()
+
+###
+### SOLVE FARM
+###
+
+class BrokenFarm(Exception):
+    """
+    The error of the tasks whose worker process terminated
+    abruptly, e.g. upon a crash of the solver.
+    """
+
+class SolveFarm(object):
+    """
+    A pool of worker processes, each one keeping long-lived
+    environments, to which independent problems are dispatched.
+
+    A worker that dies fails its running task with BrokenFarm, and
+    is no longer assigned tasks; once every worker is dead, pending
+    tasks fail as well, and no more problems can be submitted.
+    """
+
+    LIVENESS_INTERVAL = 0.5
+
+    def __init__(self, workers=None, pool_size=4):
+        """
+        Class constructor.
+
+        :param workers: the number of worker processes, by default
+                        the number of CPUs.
+        :param pool_size: the number of idle environments kept by
+                          each worker for each group of equivalent
+                          problems.
+        """
+        workers = workers or os.cpu_count() or 1
+        self._results = multiprocessing.Queue()
+        self._lock = threading.Lock()
+        self._pending = collections.deque()
+        self._futures = {}
+        self._next_id = 0
+        self._workers = []
+        self._closing = False
+        self._start = time.monotonic()
+        for index in range(workers):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            cancel = multiprocessing.RawValue('q', -1)
+            proc = multiprocessing.Process(target=_worker_main,
+                                           args=(index, child_conn, self._results,
+                                                 cancel, pool_size),
+                                           daemon=True)
+            proc.start()
+            self._workers.append({
+                "proc" : proc,
+                "conn" : parent_conn,
+                "cancel" : cancel,
+                "task" : None,
+                "dead" : False,
+                "tasks" : 0,
+                "busy" : 0.0,
+            })
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    @property
+    def workers(self):
+        """
+        The number of worker processes.
+        """
+        return len(self._workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def _dispatch(self):
+        """
+        Assigns pending tasks to idle workers. Must be called
+        with the lock held.
+        """
+        for worker in self._workers:
+            if worker["task"] is not None or worker["dead"]:
+                continue
+            while self._pending:
+                task_id, problem = self._pending.popleft()
+                future = self._futures[task_id]
+                if not future.set_running_or_notify_cancel():
+                    del self._futures[task_id]
+                    continue
+                try:
+                    worker["conn"].send((task_id, problem))
+                except OSError:
+                    # N.B.: the worker died, the collector fails the task.
+                    worker["dead"] = True
+                worker["task"] = task_id
+                break
+        return
+
+    def _check_workers(self):
+        """
+        Fails the tasks of the worker processes that have died.
+        """
+        failed = []
+        with self._lock:
+            if self._closing:
+                return
+            for worker in self._workers:
+                if worker["proc"].is_alive() and not worker["dead"]:
+                    continue
+                worker["dead"] = True
+                if worker["task"] is not None:
+                    failed.append(self._futures.pop(worker["task"]))
+                    worker["task"] = None
+            if all(worker["dead"] for worker in self._workers):
+                for task_id, _ in self._pending:
+                    failed.append(self._futures.pop(task_id))
+                self._pending.clear()
+            else:
+                self._dispatch()
+        for future in failed:
+            future.set_exception(BrokenFarm("A worker process terminated abruptly."))
+        return
+
+    def _collect(self):
+        """
+        Receives results from the workers and completes the
+        corresponding futures, checking periodically that the
+        workers are still alive.
+        """
+        while True:
+            try:
+                msg = self._results.get(timeout=self.LIVENESS_INTERVAL)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if msg is None:
+                break
+            index, task_id, res = msg
+            with self._lock:
+                worker = self._workers[index]
+                worker["task"] = None
+                worker["tasks"] += 1
+                worker["busy"] += res["time"]
+                future = self._futures.pop(task_id, None)
+                self._dispatch()
+            if future is not None:
+                future.set_result(res)
+            self._check_workers()
+
+    def submit(self, problem):
+        """
+        Schedules a problem for solving.
+
+        :param problem: the problem description.
+
+        :returns: a concurrent.futures.Future whose result is the
+                  dictionary returned by solve_problem(), extended
+                  with the 'worker' index, the solving 'time' and a
+                  'cancelled' flag.
+        """
+        future = Future()
+        with self._lock:
+            if all(worker["dead"] for worker in self._workers):
+                raise BrokenFarm("Every worker process terminated abruptly.")
+            task_id = self._next_id
+            self._next_id += 1
+            future.task_id = task_id
+            self._futures[task_id] = future
+            self._pending.append((task_id, problem))
+            self._dispatch()
+        return future
+
+    def map(self, problems):
+        """
+        Solves a list of problems.
+
+        :param problems: a list of problem descriptions.
+
+        :returns: the list of results, in the same order.
+
+        :raises BrokenFarm: if the worker solving a problem dies.
+        """
+        futures = [self.submit(problem) for problem in problems]
+        return [future.result() for future in futures]
+
+    def cancel(self, future):
+        """
+        Cancels a task. A pending task is never started, whereas the
+        search of a running task is interrupted by its termination
+        test, and its result is flagged as 'cancelled'.
+
+        :param future: the future returned by submit().
+
+        :returns: True if the task was pending or running.
+        """
+        if future.cancel():
+            return True
+        with self._lock:
+            for worker in self._workers:
+                if worker["task"] == future.task_id:
+                    worker["cancel"].value = future.task_id
+                    return True
+        return False
+
+    def stats(self):
+        """
+        Returns the throughput of each worker.
+
+        :returns: a list of dictionaries with the number of solved
+                  'tasks', the 'busy' time, the 'throughput' in tasks
+                  per busy second and the 'utilization' of each worker.
+        """
+        elapsed = time.monotonic() - self._start
+        with self._lock:
+            return [{
+                "tasks" : worker["tasks"],
+                "busy" : worker["busy"],
+                "throughput" : worker["tasks"] / worker["busy"] if worker["busy"] else 0.0,
+                "utilization" : worker["busy"] / elapsed if elapsed else 0.0,
+            } for worker in self._workers]
+
+    def shutdown(self):
+        """
+        Stops all worker processes, cancelling pending tasks.
+        """
+        with self._lock:
+            self._closing = True
+            for task_id, _ in self._pending:
+                self._futures.pop(task_id).cancel()
+            self._pending.clear()
+            for worker in self._workers:
+                if worker["task"] is not None:
+                    worker["cancel"].value = worker["task"]
+                try:
+                    worker["conn"].send(None)
+                except OSError:
+                    pass
+        for worker in self._workers:
+            worker["proc"].join()
+        self._results.put(None)
+        self._collector.join()
+        return
@@ -3,8 +3,17 @@ High level wrapper for OMT functionalities in the
 mathsat library.
 """
 
+import bisect
+import hashlib
+import mmap
+import os
+import queue
+import re
+import threading
 import time
-from contextlib import contextmanager
+from collections import OrderedDict, namedtuple
+from contextlib import ExitStack, contextmanager
+from fractions import Fraction
 from optimathsat import * # pylint: disable=unused-wildcard-import,wildcard-import
 
 ###
@@ -71,6 +80,8 @@ def create_env(cfg=None, other=None, optimizing=True):
         yield env
     finally:
         if not MSAT_ERROR_ENV(env):
+            disable_term_cache(env)
+            disable_symbol_table(env)
             msat_destroy_env(env)
 
 def destroy_env(env):
@@ -80,6 +91,8 @@ def destroy_env(env):
     :param env: the MathSAT environment instance to be destroyed.
     """
     assert not MSAT_ERROR_ENV(env)
+    disable_term_cache(env)
+    disable_symbol_table(env)
     msat_destroy_env(env)
     return
 
@@ -187,6 +200,149 @@ def destroy_obj(env, obj):
     msat_destroy_objective(env, obj)
     return
 
+OBJECTIVE_MAKERS = {
+    "min" : create_minimize,
+    "max" : create_maximize,
+    "minmax" : create_minmax,
+    "maxmin" : create_maxmin,
+}
+
+###
+### TERM CACHE
+###
+
+class TermCache(object):
+    """
+    A bounded LRU cache mapping string representations to the
+    terms parsed from them within an environment.
+
+    Entries added after a backtrack point are dropped when such
+    point is popped, so that a cached term never outlives the
+    context in which its string has been parsed.
+    """
+
+    def __init__(self, maxsize=4096):
+        """
+        Class constructor.
+
+        :param maxsize: the maximum number of cached terms.
+        """
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._levels = [[]]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, srepr):
+        """
+        Returns the cached term of a string representation.
+
+        :param srepr: the string representation.
+
+        :returns: the cached term, or None.
+        """
+        entry = self._entries.get(srepr)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(srepr)
+        return entry[0]
+
+    def insert(self, srepr, term):
+        """
+        Adds a term to the cache, evicting the least recently
+        used one if the cache is full.
+
+        :param srepr: the string representation.
+        :param term: the term parsed from 'srepr'.
+        """
+        level = len(self._levels) - 1
+        self._entries[srepr] = (term, level)
+        self._entries.move_to_end(srepr)
+        if level > 0:
+            self._levels[level].append(srepr)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return
+
+    def push(self):
+        """
+        Signals that a backtrack point has been pushed.
+        """
+        self._levels.append([])
+        return
+
+    def pop(self):
+        """
+        Signals that a backtrack point has been popped, dropping
+        the entries added after it.
+        """
+        level = len(self._levels) - 1
+        for srepr in self._levels.pop():
+            entry = self._entries.get(srepr)
+            if entry is not None and entry[1] == level:
+                del self._entries[srepr]
+        if not self._levels:
+            self._levels.append([])
+        return
+
+    def stats(self):
+        """
+        Returns the cache statistics.
+
+        :returns: a dictionary with the number of hits, misses,
+                  evictions and cached entries.
+        """
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "evictions" : self.evictions,
+            "size" : len(self._entries),
+        }
+
+TERM_CACHES = {}
+
+def enable_term_cache(env, maxsize=4096):
+    """
+    Enables caching the terms created by string_to_term()
+    within an environment.
+
+    :param env: the environment in which to operate.
+    :param maxsize: the maximum number of cached terms.
+
+    :returns: the TermCache instance of the environment.
+    """
+    assert not MSAT_ERROR_ENV(env)
+    cache = TERM_CACHES.get(id(env))
+    if cache is None:
+        cache = TermCache(maxsize)
+        TERM_CACHES[id(env)] = cache
+    return cache
+
+def disable_term_cache(env):
+    """
+    Disables caching the terms created by string_to_term()
+    within an environment.
+
+    :param env: the environment in which to operate.
+    """
+    TERM_CACHES.pop(id(env), None)
+    return
+
+def get_term_cache(env):
+    """
+    Returns the TermCache instance of an environment.
+
+    :param env: the environment in which to operate.
+
+    :returns: the TermCache instance, or None if caching
+              is not enabled.
+    """
+    return TERM_CACHES.get(id(env))
+
 ###
 ### Formula/Objective Stack
 ###
@@ -200,6 +356,9 @@ def push(env):
     assert not MSAT_ERROR_ENV(env)
     if msat_push_backtrack_point(env) != 0:
         raise Exception("Error while pushing a backtrack point.")
+    cache = TERM_CACHES.get(id(env))
+    if cache is not None:
+        cache.push()
     return
 
 def pop(env):
@@ -211,6 +370,9 @@ def pop(env):
     assert not MSAT_ERROR_ENV(env)
     if msat_pop_backtrack_point(env) != 0:
         raise Exception("Error while popping a backtrack point.")
+    cache = TERM_CACHES.get(id(env))
+    if cache is not None:
+        cache.pop()
     return
 
 def string_to_term(env, srepr):
@@ -219,7 +381,8 @@ def string_to_term(env, srepr):
 
     The syntax of 'repr' is that of the SMT-LIBv2. All the
     variables and functions must have been previously declared
-    in 'env'.
+    in 'env'. If term caching is enabled in 'env', each string
+    is parsed only once.
 
     :param env: the environment of the definition.
     :param srepr: the string to parse, in SMT-LIBv2 format.
@@ -227,9 +390,16 @@ def string_to_term(env, srepr):
     :returns: the created term.
     """
     assert not MSAT_ERROR_ENV(env)
+    cache = TERM_CACHES.get(id(env))
+    if cache is not None:
+        term = cache.lookup(srepr)
+        if term is not None:
+            return term
     term = msat_from_string(env, srepr)
     if MSAT_ERROR_TERM(term):
         raise Exception("Unable to convert '{}' to msat_term.".format(str(srepr)))
+    if cache is not None:
+        cache.insert(srepr, term)
     return term
 
 def assert_string_formula(env, hard):
@@ -300,6 +470,76 @@ def assert_string_soft_formulas_dict(env, sdict): # pylint: disable=invalid-name
         assert_string_soft_formulas_list(env, sid, slist)
     return
 
+def string_formulas_to_terms(env, srepr_list):
+    """
+    Creates the terms of a list of logical formulas with a single
+    call to the SMT-LIBv2 parser.
+
+    :param env: the environment of the definition.
+    :param srepr_list: the list of strings to parse, in
+                       SMT-LIBv2 format. Each string must
+                       represent a Boolean term.
+
+    :returns: the list of created terms, in the same order.
+    """
+    assert not MSAT_ERROR_ENV(env)
+    if not srepr_list:
+        return []
+    script = "".join("(assert (! {} :named __omt_batch_{}))\n".format(srepr, idx)
+                     for idx, srepr in enumerate(srepr_list))
+    res, names, terms = msat_named_list_from_smtlib2(env, script)
+    if res != 0:
+        raise Exception("Unable to convert a batch of {} strings to msat_term."
+                        .format(len(srepr_list)))
+    named = dict(zip(names, terms))
+    return [named["__omt_batch_{}".format(idx)] for idx in range(len(srepr_list))]
+
+def assert_string_formulas_batch(env, hard_list):
+    """
+    Adds a list of logical formulas to an environment, parsing
+    all of them at once and asserting their conjunction.
+
+    :param env: the environment in which the formulas are asserted.
+    :param hard_list: a list of strings representing the formulas to
+                      be asserted.
+    """
+    assert not MSAT_ERROR_ENV(env)
+    if not hard_list:
+        return
+    script = "".join("(assert {})\n".format(hard) for hard in hard_list)
+    tcons = msat_from_smtlib2(env, script)
+    if MSAT_ERROR_TERM(tcons):
+        raise Exception("Unable to convert a batch of {} formulas to msat_term."
+                        .format(len(hard_list)))
+    if msat_assert_formula(env, tcons) != 0:
+        raise Exception("Unable to assert a batch of {} formulas.".format(len(hard_list)))
+    return
+
+def assert_string_soft_formulas_batch(env, sdict): # pylint: disable=invalid-name,locally-disabled
+    """
+    Adds a set of logical soft-constraint formulas to an environment,
+    parsing all distinct formulas at once and each distinct weight
+    only once.
+
+    :param env: the environment in which the soft-formulas are asserted.
+    :param sdict: a dictionary where 'key' is the identifier of a group
+                  of soft-formula and 'value' is a list of strings
+                  representing the soft-formulas contained in such group.
+    """
+    assert not MSAT_ERROR_ENV(env)
+    index = {}
+    weights = {}
+    for slist in sdict.values():
+        for soft, weight in slist:
+            index.setdefault(soft, len(index))
+            if weight not in weights:
+                weights[weight] = string_to_term(env, weight)
+    terms = string_formulas_to_terms(env, list(index))
+    for sid, slist in sdict.items():
+        for soft, weight in slist:
+            msat_assert_soft_formula(env, terms[index[soft]], weights[weight], sid)
+    return
+
 def assert_objective(env, obj):
     """
     Adds an objective to an environment, so that it will be
@@ -314,6 +554,129 @@ def assert_objective(env, obj):
         raise Exception("Unable to assert objective function.")
     return
 
+###
+### SYMBOL TABLE
+###
+
+class SymbolTable(object):
+    """
+    A registry of the variables declared within an environment.
+
+    Declarations are not undone by backtracking, so the registry
+    is unaffected by push() and pop(): a variable declared after a
+    backtrack point is still available once such point is popped.
+    """
+
+    def __init__(self, env):
+        """
+        Class constructor.
+
+        :param env: the environment of the declarations.
+        """
+        self._env = env
+        self._symbols = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, name, vtp):
+        """
+        Returns the variable with the given name, if it has already
+        been declared, including by means other than make_var().
+
+        :param name: the name of the variable.
+        :param vtp: the variable type.
+
+        :returns: the msat_term variable, or None.
+
+        :raises Exception: if 'name' has been declared with another type.
+        """
+        entry = self._symbols.get(name)
+        if entry is None:
+            decl = msat_find_decl(self._env, name)
+            if MSAT_ERROR_DECL(decl):
+                self.misses += 1
+                return None
+            if msat_decl_get_arity(decl) != 0:
+                raise Exception("Symbol '{}' already declared as a function.".format(name))
+            term = msat_make_constant(self._env, decl)
+            assert not MSAT_ERROR_TERM(term)
+            entry = (msat_decl_get_return_type(decl), term)
+            self._symbols[name] = entry
+        if not msat_type_equals(entry[0], vtp):
+            raise Exception("Variable '{}' already declared with type '{}'.".format(
+                name, msat_type_repr(entry[0])))
+        self.hits += 1
+        return entry[1]
+
+    def insert(self, name, vtp, term):
+        """
+        Records a new declaration.
+
+        :param name: the name of the variable.
+        :param vtp: the variable type.
+        :param term: the msat_term variable.
+        """
+        self._symbols[name] = (vtp, term)
+        return
+
+    def __contains__(self, name):
+        return name in self._symbols
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def stats(self):
+        """
+        Returns the registry statistics.
+
+        :returns: a dictionary with the number of hits, misses
+                  and registered symbols.
+        """
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "size" : len(self._symbols),
+        }
+
+SYMBOL_TABLES = {}
+
+def enable_symbol_table(env):
+    """
+    Enables recording the variables declared with make_var()
+    and its derivatives within an environment, so that repeated
+    declarations return the existing terms.
+
+    :param env: the environment in which to operate.
+
+    :returns: the SymbolTable instance of the environment.
+    """
+    assert not MSAT_ERROR_ENV(env)
+    table = SYMBOL_TABLES.get(id(env))
+    if table is None:
+        table = SymbolTable(env)
+        SYMBOL_TABLES[id(env)] = table
+    return table
+
+def disable_symbol_table(env):
+    """
+    Disables recording the variables declared within an environment.
+
+    :param env: the environment in which to operate.
+    """
+    SYMBOL_TABLES.pop(id(env), None)
+    return
+
+def get_symbol_table(env):
+    """
+    Returns the SymbolTable instance of an environment.
+
+    :param env: the environment in which to operate.
+
+    :returns: the SymbolTable instance, or None if it is
+              not enabled.
+    """
+    return SYMBOL_TABLES.get(id(env))
+
 ###
 ### DECLARE VARIABLES
 ###
@@ -323,6 +686,9 @@ def make_var(env, name, vtp):
     Declares a variable with identifier 'name'
     and type 'vtp' in the given environment.
 
+    If the symbol table is enabled in 'env' and 'name' has
+    already been declared, the existing variable is returned.
+
     :param env: the environment in which to operate.
     :param name: the name of the variable.
     :param vtp: the variable type.
@@ -331,10 +697,17 @@ def make_var(env, name, vtp):
     """
     assert not MSAT_ERROR_ENV(env)
     assert not MSAT_ERROR_TYPE(vtp)
+    table = SYMBOL_TABLES.get(id(env))
+    if table is not None:
+        term = table.lookup(name, vtp)
+        if term is not None:
+            return term
     decl = msat_declare_function(env, name, vtp)
     assert not MSAT_ERROR_DECL(decl)
     term = msat_make_constant(env, decl)
     assert not MSAT_ERROR_TERM(term)
+    if table is not None:
+        table.insert(name, vtp, term)
     return term
 
 def make_bool_var(env, name):
@@ -419,7 +792,8 @@ def make_bool_vars(env, nlist):
 
     :returns: the list of msat_term variables declared.
     """
-    return [make_bool_var(env, name) for name in nlist]
+    vtp = msat_get_bool_type(env)
+    return [make_var(env, name, vtp) for name in nlist]
 
 def make_int_vars(env, nlist):
     """
@@ -430,7 +804,8 @@ def make_int_vars(env, nlist):
 
     :returns: the list of msat_term variables declared.
     """
-    return [make_int_var(env, name) for name in nlist]
+    vtp = msat_get_integer_type(env)
+    return [make_var(env, name, vtp) for name in nlist]
 
 def make_rational_vars(env, nlist):
     """
@@ -441,7 +816,8 @@ def make_rational_vars(env, nlist):
 
     :returns: the list of msat_term variables declared.
     """
-    return [make_rational_var(env, name) for name in nlist]
+    vtp = msat_get_rational_type(env)
+    return [make_var(env, name, vtp) for name in nlist]
 
 def make_bv_vars(env, nlist):
     """
@@ -452,7 +828,13 @@ def make_bv_vars(env, nlist):
 
     :returns: the list of msat_term variables declared.
     """
-    return [make_bv_var(env, name, width) for name, width in nlist]
+    vtps = {}
+    ret = []
+    for name, width in nlist:
+        if width not in vtps:
+            vtps[width] = msat_get_bv_type(env, width)
+        ret.append(make_var(env, name, vtps[width]))
+    return ret
 
 def make_fp_vars(env, nlist):
     """
@@ -463,7 +845,13 @@ def make_fp_vars(env, nlist):
 
     :returns: the list of msat_term variables declared.
     """
-    return [make_fp_var(env, name, ebits, sbits) for name, ebits, sbits in nlist]
+    vtps = {}
+    ret = []
+    for name, ebits, sbits in nlist:
+        if (ebits, sbits) not in vtps:
+            vtps[(ebits, sbits)] = msat_get_fp_type(env, ebits, sbits)
+        ret.append(make_var(env, name, vtps[(ebits, sbits)]))
+    return ret
 
 def make_all_vars(env, vdict):
     """
@@ -496,272 +884,2010 @@ def make_all_vars(env, vdict):
     return ret
 
 ###
-### SOLVE / SOLVE ALL
+### DECLARE VARIABLE FAMILIES
 ###
 
-def solve(env):
+class VarFamily(object):
+    """
+    An indexed family of variables sharing the same type, such
+    as 'course_load__ARRAY__1', ..., 'course_load__ARRAY__N'.
     """
-    Checks the satisfiability of the given environment.
 
-    :param env: the environment to check.
+    __slots__ = ("name", "terms", "names", "_start", "_positions", "_by_name")
 
-    :returns:
-        MSAT_SAT if the problem is satisfiable
-        MSAT_UNSAT if it is unsatisfiable, and
-        MSAT_UNKNOWN if there was some error or if the
-                     satisfiability can't be determined.
-    """
-    ret = msat_solve(env)
-    if ret > 0:
-        print("sat")
-    elif ret < 0:
-        print("unknown")
-    else:
-        print("unsat")
-    return ret
+    def __init__(self, name, indices, names, terms):
+        """
+        Class constructor.
+
+        :param name: the family name.
+        :param indices: the integer indices of the variables.
+        :param names: the variable names, in the same order.
+        :param terms: the msat_term variables, in the same order.
+        """
+        self.name = name
+        self.names = names
+        self.terms = terms
+        if isinstance(indices, range) and indices.step == 1:
+            self._start = indices.start
+            self._positions = None
+        else:
+            self._start = None
+            self._positions = {idx : pos for pos, idx in enumerate(indices)}
+        self._by_name = None
 
-def solve_all_sat(env, important):
+    def __len__(self):
+        return len(self.terms)
+
+    def __iter__(self):
+        return iter(self.terms)
+
+    def __getitem__(self, idx):
+        """
+        Returns the variable with the given index.
+
+        :param idx: the integer index.
+
+        :returns: a msat_term variable.
+        """
+        if self._positions is None:
+            pos = idx - self._start
+            if pos < 0 or pos >= len(self.terms):
+                raise IndexError(idx)
+            return self.terms[pos]
+        return self.terms[self._positions[idx]]
+
+    def lookup(self, name):
+        """
+        Returns the variable with the given name.
+
+        :param name: the variable name.
+
+        :returns: a msat_term variable.
+        """
+        if self._by_name is None:
+            self._by_name = dict(zip(self.names, self.terms))
+        return self._by_name[name]
+
+def make_var_family(env, name, vtp, indices, fmt="{}__ARRAY__{}"):
     """
-    Performs AllSat over the important atoms of the conjunction
-    of all formulas asserted in the given environment. When used
-    in incremental mode, a backtrack-point should be pushed before
-    calling this function, and popped after this call has completed.
-    Not doing this changes the satisfiability of the formula.
+    Declares an indexed family of variables of the same type.
 
-    :param env: the environment to check.
-    :param important: an array of important atoms.
+    :param env: the environment in which to operate.
+    :param name: the family name.
+    :param vtp: the variable type, e.g. msat_get_integer_type(env).
+    :param indices: the integer indices of the variables, e.g.
+                    range(1, N + 1).
+    :param fmt: the format of the variable names, given the family
+                name and the index.
 
-    :returns: an over-approximation of the number of models found,
-        or -1 on error. If the solver detects that the formula is a
-        tautology, -2 is returned.
+    :returns: a VarFamily instance.
     """
-    callback = AllSatModelPrinter(env)
-    important = [string_to_term(env, el) for el in important]
-    ret = msat_all_sat(env, important, callback)
-    if ret == -2:
-        print("tautology")
-    elif ret == -1:
-        print("unknown")
-    elif ret == 0:
-        print("unsat")
-    return ret
+    assert not MSAT_ERROR_ENV(env)
+    assert not MSAT_ERROR_TYPE(vtp)
+    names = [fmt.format(name, idx) for idx in indices]
+    terms = [make_var(env, vname, vtp) for vname in names]
+    return VarFamily(name, indices, names, terms)
 
 ###
-### ALL-SAT MODEL PRINTER
+### ENVIRONMENT POOL
 ###
 
-class AllSatModelPrinter(object): # pylint: disable=too-few-public-methods,locally-disabled
+class EnvPool(object):
     """
-    A simple class for printing models found by the all_sat() procedure.
+    A pool of pre-warmed MathSAT environments.
+
+    Environments are grouped by the configuration options and the
+    variable declarations they have been created with. An environment
+    is handed out with a backtrack point already pushed, and it is
+    popped back to its base state when it is returned to the pool.
     """
 
-    def __init__(self, env):
+    def __init__(self, size=4, max_idle=None):
         """
         Class constructor.
 
-        :param env: the environment in which to operate.
+        :param size: the maximum number of idle environments kept
+                     for each group.
+        :param max_idle: the number of seconds after which an idle
+                         environment is destroyed, or None.
         """
-        self._env = env
-        self._first = True
+        self._size = size
+        self._max_idle = max_idle
+        self._idle = {}
+        self._stats = {}
 
-    def __call__(self, data):
+    @staticmethod
+    def _key(options, decls):
         """
-        Callback function, invocked each time a model is found.
+        Computes the group of an environment.
 
-        :param data: the model-assignment over the important
-                     atoms of the all_sat() search.
-        :returns: 1 to continue the search.
+        :param options: the configuration options.
+        :param decls: the variable declarations, in the format
+                      accepted by make_all_vars().
+
+        :returns: a hashable key.
         """
-        if self._first:
-            print("sat")
-            self._first = False
-            get_objectives_pretty(self._env)
-        print("sat")
-        for term in data:
-            value = "True"
-            if msat_term_is_not(self._env, term):
-                term = msat_make_not(self._env, term)
-                value = "False"
-            print("\t{} : {}".format(str(term), str(value)))
-        return 1
+        return (tuple(sorted(options.items())),
+                tuple(sorted((vtype, tuple(nlist)) for vtype, nlist in decls.items())))
 
-###
-### GET_OBJECTIVES
-###
+    def _group_stats(self, key):
+        """
+        Returns the statistics record of a group.
 
-def get_objectives(env, inf=None, eps=None):
-    """
-    Prints the list of objectives currently asserted
-    and their value.
+        :param key: the group key.
 
-    :param env: the environment in which to operate.
-    :param inf: the symbolic/constant value representing
-                an infinite amount.
-    :param eps: the symbolic/constant value representing
-                an infinitesimal amount.
-    """
-    obj_iter = msat_create_objective_iterator(env)
-    assert not MSAT_ERROR_OBJECTIVE_ITERATOR(obj_iter)
-    print("(objectives")
-    while msat_objective_iterator_has_next(obj_iter):
-        res, obj = msat_objective_iterator_next(obj_iter)
-        assert res == 0
-        cost_fun = msat_objective_get_term(env, obj)
-        assert not MSAT_ERROR_TERM(cost_fun)
+        :returns: a dictionary of counters.
+        """
+        if key not in self._stats:
+            self._stats[key] = {"hits" : 0, "misses" : 0, "evictions" : 0, "in_use" : 0}
+        return self._stats[key]
 
-        res = msat_objective_result(env, obj)
-        if res < 0:
-            print("\t({} unknown)".format(str(cost_fun)))
-        elif res == 0:
-            print("\t({} unsat)".format(str(cost_fun)))
-        else:
-            value = msat_objective_value_term(env, obj, MSAT_OPTIMUM,
-                                              inf, eps)
-            assert not MSAT_ERROR_TERM(value)
-            print("\t({} {})".format(str(cost_fun), str(value)))
-    print(")")
-    msat_destroy_objective_iterator(obj_iter)
+    @staticmethod
+    def _create(options, decls):
+        """
+        Creates a new environment and declares its variables.
 
-def get_objectives_pretty(env):
-    """
-    Prints the list of objectives currently asserted
-    and their value, in a pretty format.
+        :param options: the configuration options.
+        :param decls: the variable declarations.
 
-    :param env: the environment in which to operate.
-    """
-    obj_iter = msat_create_objective_iterator(env)
-    assert not MSAT_ERROR_OBJECTIVE_ITERATOR(obj_iter)
-    print("(objectives")
-    while msat_objective_iterator_has_next(obj_iter):
+        :returns: a MathSAT environment instance.
+        """
+        with create_config(options) as cfg:
+            env = msat_create_opt_env(cfg)
+            assert not MSAT_ERROR_ENV(env)
+        enable_symbol_table(env)
+        make_all_vars(env, decls)
+        return env
+
+    def _evict_idle(self):
+        """
+        Destroys the environments that have been idle for too long.
+        """
+        if self._max_idle is None:
+            return
+        deadline = time.monotonic() - self._max_idle
+        for key, idle in self._idle.items():
+            while idle and idle[0][1] < deadline:
+                env, _ = idle.pop(0)
+                destroy_env(env)
+                self._group_stats(key)["evictions"] += 1
+        return
+
+    @contextmanager
+    def acquire(self, options, decls):
+        """
+        Takes an environment from the pool, creating it if needed.
+
+        :param options: the configuration options, as accepted by
+                        create_config().
+        :param decls: the variable declarations, as accepted by
+                      make_all_vars().
+
+        :yields: a MathSAT environment instance, with a backtrack
+                 point pushed.
+        """
+        self._evict_idle()
+        key = self._key(options, decls)
+        stats = self._group_stats(key)
+        idle = self._idle.setdefault(key, [])
+        if idle:
+            env, _ = idle.pop()
+            stats["hits"] += 1
+        else:
+            env = self._create(options, decls)
+            stats["misses"] += 1
+        stats["in_use"] += 1
+        try:
+            push(env)
+        except Exception:
+            stats["in_use"] -= 1
+            destroy_env(env)
+            raise
+        try:
+            yield env
+        finally:
+            stats["in_use"] -= 1
+            try:
+                pop(env)
+                reusable = len(idle) < self._size
+            except Exception: # pylint: disable=broad-except
+                reusable = False
+            if reusable:
+                idle.append((env, time.monotonic()))
+            else:
+                destroy_env(env)
+                stats["evictions"] += 1
+
+    def clear(self):
+        """
+        Destroys all idle environments.
+        """
+        for idle in self._idle.values():
+            for env, _ in idle:
+                destroy_env(env)
+            del idle[:]
+        return
+
+    def stats(self):
+        """
+        Returns the statistics of each group of environments.
+
+        :returns: a dictionary where 'key' is a '(options, decls)'
+                  pair and 'value' is a dictionary with the number
+                  of hits, misses, evictions, idle and in-use
+                  environments of the group.
+        """
+        ret = {}
+        for key, stats in self._stats.items():
+            ret[key] = dict(stats, idle=len(self._idle.get(key, ())))
+        return ret
+
+###
+### SESSION
+###
+
+class Session(object):
+    """
+    An environment kept in sync with a sequence of problem bundles,
+    each one with the 'decls', 'hard', 'soft' and 'objectives' entries
+    described in solve_farm, by asserting only what changed.
+
+    The assertion stack of the environment is organized in layers:
+    soft-constraints, objectives, and then any number of layers of
+    hard constraints. Removing a hard constraint pops the layer that
+    contains it, together with the ones above, and re-asserts the
+    surviving constraints of such layers; changing soft-constraints
+    or objectives rebuilds every layer. Parsed terms are kept across
+    requests, since they are not affected by backtracking.
+    """
+
+    def __init__(self, env):
+        """
+        Class constructor.
+
+        :param env: the environment in which to operate, with no
+                    backtrack point pushed.
+        """
+        assert not MSAT_ERROR_ENV(env)
+        self._env = env
+        self._terms = {}
+        self._soft = None
+        self._objectives = None
+        self._objective_stack = None
+        self._layers = []
+        self._base = 0
+        self.reused = 0
+        self.parsed = 0
+        enable_symbol_table(env)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _term(self, srepr):
+        """
+        Returns the term of a string representation, parsing it
+        only the first time it is seen.
+
+        :param srepr: the string to parse, in SMT-LIBv2 format.
+
+        :returns: a msat_term.
+        """
+        term = self._terms.get(srepr)
+        if term is None:
+            term = string_to_term(self._env, srepr)
+            self._terms[srepr] = term
+            self.parsed += 1
+        else:
+            self.reused += 1
+        return term
+
+    def _push_layer(self, formulas):
+        """
+        Pushes a new layer of hard constraints.
+
+        :param formulas: the list of string representations.
+        """
+        push(self._env)
+        try:
+            for formula in formulas:
+                if msat_assert_formula(self._env, self._term(formula)) != 0:
+                    raise Exception("Unable to assert formula '{}'.".format(formula))
+        except Exception:
+            # N.B.: keep the layers in sync with the backtrack points.
+            pop(self._env)
+            raise
+        self._layers.append(list(formulas))
+        return
+
+    def _pop_layers(self, level):
+        """
+        Pops the layers of hard constraints from a given one.
+
+        :param level: the index of the lowest layer to pop.
+
+        :returns: the list of formulas of the popped layers.
+        """
+        ret = []
+        while len(self._layers) > level:
+            ret = self._layers.pop() + ret
+            pop(self._env)
+        return ret
+
+    def _reset(self):
+        """
+        Pops every layer and destroys the objectives.
+        """
+        self._pop_layers(0)
+        while self._base > 0:
+            pop(self._env)
+            self._base -= 1
+        if self._objective_stack is not None:
+            self._objective_stack.close()
+            self._objective_stack = None
+        self._soft = None
+        self._objectives = None
+        return
+
+    def _build_base(self, soft, objectives):
+        """
+        Pushes the soft-constraint and objective layers.
+
+        :param soft: the soft-constraints, in the format accepted by
+                     assert_string_soft_formulas_dict().
+        :param objectives: the objectives, as '(kind, cost_fun)' or
+                           '(kind, cost_fun, signed)' tuples.
+        """
+        push(self._env)
+        self._base += 1
+        for sid, slist in sorted(soft.items()):
+            for formula, weight in slist:
+                msat_assert_soft_formula(self._env, self._term(formula),
+                                         self._term(weight), sid)
+        push(self._env)
+        self._base += 1
+        self._objective_stack = ExitStack()
+        for spec in objectives:
+            obj = self._objective_stack.enter_context(
+                OBJECTIVE_MAKERS[spec[0]](self._env, *spec[1:]))
+            assert_objective(self._env, obj)
+        self._soft = soft
+        self._objectives = objectives
+        return
+
+    def apply(self, bundle):
+        """
+        Updates the assertions of the environment to match a bundle.
+
+        :param bundle: the problem bundle.
+
+        :returns: a dictionary with the number of 'asserted' hard
+                  constraints, of 're_asserted' ones, that had to be
+                  asserted again after a pop, of 'retracted' and
+                  'kept' ones, of 'reused' and newly 'parsed' terms,
+                  and the number of hard-constraint 'layers'.
+        """
+        reused, parsed = self.reused, self.parsed
+        make_all_vars(self._env, bundle.get("decls", {}))
+        soft = {sid : tuple(tuple(item) for item in slist)
+                for sid, slist in bundle.get("soft", {}).items()}
+        objectives = [tuple(spec) for spec in bundle.get("objectives", ())]
+        hard = list(OrderedDict.fromkeys(bundle.get("hard", ())))
+        wanted = set(hard)
+
+        old = [formula for layer in self._layers for formula in layer]
+        if soft != self._soft or objectives != self._objectives:
+            self._reset()
+            self._build_base(soft, objectives)
+            current = set()
+        else:
+            current = set(old)
+        retracted = len([formula for formula in old if formula not in wanted])
+
+        popped = []
+        for level, layer in enumerate(self._layers):
+            if any(formula not in wanted for formula in layer):
+                popped = self._pop_layers(level)
+                break
+        survivors = [formula for formula in popped if formula in wanted]
+        added = [formula for formula in hard if formula not in current]
+        if survivors or added:
+            self._push_layer(survivors + added)
+
+        return {
+            "asserted" : len(added),
+            "re_asserted" : len(survivors),
+            "retracted" : retracted,
+            "kept" : sum(len(layer) for layer in self._layers) - len(survivors) - len(added),
+            "reused" : self.reused - reused,
+            "parsed" : self.parsed - parsed,
+            "layers" : len(self._layers),
+        }
+
+    def solve(self):
+        """
+        Checks the satisfiability of the environment.
+
+        :returns: the result of msat_solve().
+        """
+        start = time.monotonic()
+        ret = msat_solve(self._env)
+        log_solve_time(time.monotonic() - start)
+        return ret
+
+    def close(self):
+        """
+        Retracts every assertion made by the session and destroys
+        its objectives.
+        """
+        self._reset()
+        return
+
+###
+### SMT-LIBv2 FORMULA CACHE
+###
+
+class SmtLib2Cache(object):
+    """
+    A cache of formulas parsed from SMT-LIBv2 files.
+
+    Each formula is parsed once within a private parent environment,
+    and it is made available to new environments that share terms
+    with such parent environment. Cache entries are identified by
+    the path, the modification time and the content hash of a file.
+
+    At most 'maxsize' parent environments are kept alive: the least
+    recently used ones are destroyed when there are no environments
+    sharing terms with them.
+    """
+
+    def __init__(self, maxsize=8):
+        """
+        Class constructor.
+
+        :param maxsize: the maximum number of cached parent
+                        environments.
+        """
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(path):
+        """
+        Computes the cache key of a file.
+
+        :param path: the path of the SMT-LIBv2 file.
+
+        :returns: a '(path, mtime, digest)' triplet.
+        """
+        path = os.path.abspath(path)
+        with open(path, 'rb') as f:
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+            digest = hashlib.sha1(f.read()).hexdigest()
+        return (path, mtime, digest)
+
+    def acquire(self, path):
+        """
+        Returns the parent environment and the formula parsed from
+        an SMT-LIBv2 file, parsing it only if it is not cached.
+        Each call must be matched by a call to release().
+
+        :param path: the path of the SMT-LIBv2 file.
+
+        :returns: a '(key, parent_env, term)' triplet.
+        """
+        key = self._key(path)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            parent = msat_create_opt_env()
+            assert not MSAT_ERROR_ENV(parent)
+            with open(path, 'r') as f:
+                term = msat_from_smtlib2(parent, f.read())
+            if MSAT_ERROR_TERM(term):
+                msat_destroy_env(parent)
+                raise Exception("Unable to parse SMT-LIBv2 file '{}'.".format(path))
+            entry = [parent, term, 0]
+            self._entries[key] = entry
+        entry[2] += 1
+        self._evict()
+        return key, entry[0], entry[1]
+
+    def release(self, key):
+        """
+        Signals that an environment sharing terms with the
+        parent environment of a cache entry has been destroyed.
+
+        :param key: the key returned by acquire().
+        """
+        self._entries[key][2] -= 1
+        self._evict()
+        return
+
+    def _evict(self):
+        """
+        Destroys the least recently used parent environments
+        that are not in use, until the cache size is within bounds.
+        """
+        for key in list(self._entries):
+            if len(self._entries) <= self._maxsize:
+                break
+            parent, _, refs = self._entries[key]
+            if refs == 0:
+                del self._entries[key]
+                msat_destroy_env(parent)
+                self.evictions += 1
+        return
+
+    def clear(self):
+        """
+        Destroys all parent environments that are not in use.
+        """
+        for key in list(self._entries):
+            parent, _, refs = self._entries[key]
+            if refs == 0:
+                del self._entries[key]
+                msat_destroy_env(parent)
+        return
+
+    def stats(self):
+        """
+        Returns the cache statistics.
+
+        :returns: a dictionary with the number of hits, misses,
+                  evictions and cached entries.
+        """
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "evictions" : self.evictions,
+            "size" : len(self._entries),
+        }
+
+SMTLIB2_CACHE = SmtLib2Cache()
+
+@contextmanager
+def create_env_from_smtlib2(cfg, path, cache=None):
+    """
+    Create a new MathSAT environment in which the formula
+    contained in an SMT-LIBv2 file is asserted.
+
+    The file is parsed only the first time it is loaded, and
+    the parsed formula is shared with all environments created
+    afterwards, as long as the file is not modified.
+
+    :param cfg: the configuration to use.
+    :param path: the path of the SMT-LIBv2 file.
+    :param cache: the SmtLib2Cache instance to use, by default
+                  SMTLIB2_CACHE.
+
+    :yields: a '(env, term)' pair, where 'env' is a MathSAT
+             environment instance and 'term' is the formula
+             asserted in it.
+    """
+    cache = cache if cache is not None else SMTLIB2_CACHE
+    key, parent, term = cache.acquire(path)
+    try:
+        env = msat_create_shared_opt_env(cfg, parent)
+        assert not MSAT_ERROR_ENV(env)
+        try:
+            if msat_assert_formula(env, term) != 0:
+                raise Exception("Unable to assert formula from '{}'.".format(path))
+            yield env, term
+        finally:
+            destroy_env(env)
+    finally:
+        cache.release(key)
+
+###
+### SMT-LIBv2 STREAMING LOADER
+###
+
+SMTLIB2_TOKEN = re.compile(rb'[()";|]')
+
+SMTLIB2_SPECIAL = re.compile(rb'[";|]')
+
+SMTLIB2_PRELUDE = re.compile(rb'\(\s*(define-|set-logic|set-option)')
+
+SMTLIB2_DEFINITION = re.compile(rb'\(\s*define-(?:fun|fun-rec|sort|const)\s+(\|[^|]*\||[^\s()";|]+)')
+
+SMTLIB2_SYMBOL = re.compile(rb'\|[^|]*\||[^\s()";|]+')
+
+def _smtlib2_symbols(text):
+    """
+    Returns the symbols occurring in a fragment of SMT-LIBv2 text,
+    over-approximated by including the words of string literals and
+    comments.
+
+    :param text: the fragment, as bytes.
+
+    :returns: a set of symbols, without '|' quotes.
+    """
+    return {symbol.strip(b'|') for symbol in SMTLIB2_SYMBOL.findall(text)}
+
+def iter_smtlib2_commands(data, exact=False):
+    """
+    Splits an SMT-LIBv2 script into groups of top-level commands.
+
+    Lines without string literals, quoted symbols and comments are
+    handled by counting their parentheses, the other ones are scanned
+    token by token. Hence, a group contains a single command unless
+    several commands share a line and 'exact' is disabled.
+
+    :param data: the script, as a bytes-like object (e.g. mmap).
+    :param exact: when enabled, each group is a single command.
+
+    :yields: '(start, end)' pairs delimiting each group in 'data'.
+    """
+    depth = 0
+    start = -1
+    pos = 0
+    size = len(data)
+    while pos < size:
+        eol = data.find(b'\n', pos) + 1 or size
+        if not exact and SMTLIB2_SPECIAL.search(data, pos, eol) is None:
+            line = data[pos:eol]
+            opened = line.count(b'(')
+            if depth == 0 and opened:
+                start = pos + line.find(b'(')
+            depth += opened - line.count(b')')
+            if depth < 0:
+                raise Exception("Unbalanced ')' at offset {}.".format(pos))
+            if depth == 0 and start >= 0:
+                yield start, pos + len(line.rstrip())
+                start = -1
+            pos = eol
+            continue
+        while pos < eol:
+            match = SMTLIB2_TOKEN.search(data, pos, eol)
+            if match is None:
+                pos = eol
+                break
+            pos = match.end()
+            tok = match.group()
+            if tok == b'(':
+                if depth == 0:
+                    start = match.start()
+                depth += 1
+            elif tok == b')':
+                depth -= 1
+                if depth == 0:
+                    yield start, pos
+                    start = -1
+                elif depth < 0:
+                    raise Exception("Unbalanced ')' at offset {}.".format(match.start()))
+            elif tok == b'"':
+                # N.B.: '""' is an escaped quote within a string literal.
+                while True:
+                    pos = data.find(b'"', pos) + 1
+                    if pos == 0:
+                        raise Exception("Unterminated string literal.")
+                    if data[pos:pos + 1] != b'"':
+                        break
+                    pos += 1
+            elif tok == b'|':
+                pos = data.find(b'|', pos) + 1
+                if pos == 0:
+                    raise Exception("Unterminated quoted symbol.")
+            else:
+                pos = eol
+    if depth != 0:
+        raise Exception("Unexpected end of SMT-LIBv2 script.")
+
+def load_smtlib2_stream(env, path, chunk_size=1 << 20):
+    """
+    Asserts the formula contained in an SMT-LIBv2 file, without
+    reading the whole file in memory.
+
+    The file is memory-mapped and split into top-level commands,
+    which are parsed in chunks of about 'chunk_size' bytes. Since
+    function and sort definitions are not retained by the environment
+    across parser calls, whereas declarations are, the definitions
+    referenced by a chunk, directly or through other definitions, are
+    prepended to it. Hence, each definition is parsed again with each
+    chunk that uses it.
+
+    :param env: the environment in which to operate.
+    :param path: the path of the SMT-LIBv2 file.
+    :param chunk_size: the approximate size, in bytes, of the text
+                       given to the parser at once.
+
+    :returns: the list of asserted terms, one for each chunk.
+    """
+    assert not MSAT_ERROR_ENV(env)
+    ret = []
+    # N.B.: commands that are always prepended, i.e. options, logic
+    #       and definitions whose name is unknown.
+    header = []
+    # name -> (position, command, names of referenced definitions)
+    definitions = {}
+    chunk = []
+    size = 0
+
+    def flush():
+        needed = set()
+        todo = [name for name in _smtlib2_symbols(b"\n".join(chunk)) if name in definitions]
+        while todo:
+            name = todo.pop()
+            if name not in needed:
+                needed.add(name)
+                todo.extend(definitions[name][2])
+        prelude = [definitions[name][:2] for name in needed]
+        prelude = header + [cmd for _, cmd in sorted(prelude)]
+        text = b"\n".join(prelude + chunk).decode("utf-8")
+        term = msat_from_smtlib2(env, text)
+        if MSAT_ERROR_TERM(term):
+            raise Exception("Unable to parse SMT-LIBv2 file '{}'.".format(path))
+        if msat_assert_formula(env, term) != 0:
+            raise Exception("Unable to assert formula from '{}'.".format(path))
+        ret.append(term)
+
+    def define(cmd):
+        match = SMTLIB2_DEFINITION.match(cmd)
+        if match is None:
+            header.append(cmd)
+            return
+        name = match.group(1).strip(b'|')
+        deps = {dep for dep in _smtlib2_symbols(cmd[match.end():]) if dep in definitions}
+        definitions[name] = (len(definitions), cmd, deps)
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ret
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for start, end in iter_smtlib2_commands(data):
+                group = data[start:end]
+                if SMTLIB2_PRELUDE.search(group) is None:
+                    cmds = [group]
+                else:
+                    cmds = [group[cstart:cend] for cstart, cend
+                            in iter_smtlib2_commands(group, exact=True)]
+                for cmd in cmds:
+                    if SMTLIB2_PRELUDE.match(cmd):
+                        # N.B.: a definition may refer to symbols declared
+                        #       by the commands preceding it.
+                        if chunk:
+                            flush()
+                            chunk = []
+                            size = 0
+                        define(cmd)
+                        continue
+                    chunk.append(cmd)
+                    size += len(cmd)
+                if size >= chunk_size:
+                    flush()
+                    chunk = []
+                    size = 0
+    if chunk:
+        flush()
+    return ret
+
+###
+### SOLVE / SOLVE ALL
+###
+
+def solve(env):
+    """
+    Checks the satisfiability of the given environment.
+
+    :param env: the environment to check.
+
+    :returns:
+        MSAT_SAT if the problem is satisfiable
+        MSAT_UNSAT if it is unsatisfiable, and
+        MSAT_UNKNOWN if there was some error or if the
+                     satisfiability can't be determined.
+    """
+    start = time.monotonic()
+    ret = msat_solve(env)
+    log_solve_time(time.monotonic() - start)
+    if ret > 0:
+        print("sat")
+    elif ret < 0:
+        print("unknown")
+    else:
+        print("unsat")
+    return ret
+
+# N.B.: the log is opened once, when the module is imported, and
+#       is line-buffered so that forked processes can share it.
+SOLVE_LOG = open(os.environ["OMT_SOLVE_LOG"], 'a', buffering=1) \
+            if os.environ.get("OMT_SOLVE_LOG") else None # pylint: disable=consider-using-with
+
+def log_solve_time(elapsed):
+    """
+    Appends the duration of a solve() call to the file named by
+    the OMT_SOLVE_LOG environment variable, if it was set when
+    this module was imported.
+
+    :param elapsed: the duration of the call, in seconds.
+    """
+    if SOLVE_LOG is not None:
+        SOLVE_LOG.write("{:.6f}\n".format(elapsed))
+    return
+
+def solve_all_sat(env, important, callback=None):
+    """
+    Performs AllSat over the important atoms of the conjunction
+    of all formulas asserted in the given environment. When used
+    in incremental mode, a backtrack-point should be pushed before
+    calling this function, and popped after this call has completed.
+    Not doing this changes the satisfiability of the formula.
+
+    :param env: the environment to check.
+    :param important: an array of important atoms.
+    :param callback: the function invoked with each model, by
+                     default an AllSatModelPrinter. If it has a
+                     flush() method, it is called once the search
+                     is over.
+
+    :returns: an over-approximation of the number of models found,
+        or -1 on error. If the solver detects that the formula is a
+        tautology, -2 is returned.
+    """
+    if callback is None:
+        callback = AllSatModelPrinter(env)
+    important = [string_to_term(env, el) for el in important]
+    ret = msat_all_sat(env, important, callback)
+    if hasattr(callback, "flush"):
+        callback.flush()
+    if ret == -2:
+        print("tautology")
+    elif ret == -1:
+        print("unknown")
+    elif ret == 0:
+        print("unsat")
+    return ret
+
+###
+### ALL-SAT MODEL PRINTER
+###
+
+class AllSatModelPrinter(object): # pylint: disable=too-few-public-methods,locally-disabled
+    """
+    A simple class for printing models found by the all_sat() procedure.
+    """
+
+    def __init__(self, env):
+        """
+        Class constructor.
+
+        :param env: the environment in which to operate.
+        """
+        self._env = env
+        self._first = True
+
+    def __call__(self, data):
+        """
+        Callback function, invocked each time a model is found.
+
+        :param data: the model-assignment over the important
+                     atoms of the all_sat() search.
+        :returns: 1 to continue the search.
+        """
+        if self._first:
+            print("sat")
+            self._first = False
+            get_objectives_pretty(self._env)
+        print("sat")
+        for term in data:
+            value = "True"
+            if msat_term_is_not(self._env, term):
+                term = msat_make_not(self._env, term)
+                value = "False"
+            print("\t{} : {}".format(str(term), str(value)))
+        return 1
+
+###
+### ALL-SAT MODEL COLLECTOR
+###
+
+class AllSatCollector(object):
+    """
+    A callback for the all_sat() procedure storing each model as
+    an integer bitset over the important atoms, in which bit 'i'
+    is set iff the i-th atom is true, and delivering the models
+    to a consumer in chunks.
+    """
+
+    def __init__(self, env, important, consumer, chunk_size=4096, # pylint: disable=too-many-arguments,locally-disabled
+                 max_models=None, timeout=None):
+        """
+        Class constructor.
+
+        :param env: the environment in which to operate.
+        :param important: the important atoms, as strings or
+                          msat_term, in the same order given
+                          to solve_all_sat().
+        :param consumer: the function invoked with each chunk,
+                         a list of integer bitsets, e.g. the
+                         put() method of a queue.Queue.
+        :param chunk_size: the number of models in a chunk.
+        :param max_models: the number of models after which the
+                           search is stopped, or None.
+        :param timeout: the number of wall-clock seconds after
+                        which the search is stopped, or None.
+        """
+        self._env = env
+        self.atoms = [string_to_term(env, atom) if isinstance(atom, str) else atom
+                      for atom in important]
+        self._masks = {msat_term_id(atom) : 1 << idx for idx, atom in enumerate(self.atoms)}
+        self._consumer = consumer
+        self._chunk_size = chunk_size
+        self._max_models = max_models
+        self._timeout = timeout
+        self._chunk = []
+        self._start = None
+        self._end = None
+        self.count = 0
+        self.stopped = False
+
+    def __call__(self, data):
+        """
+        Callback function, invoked each time a model is found.
+
+        :param data: the model-assignment over the important
+                     atoms of the all_sat() search.
+        :returns: 1 to continue the search, 0 to stop it.
+        """
+        if self._start is None:
+            self._start = time.monotonic()
+        # N.B.: negated atoms have their own identifier, which
+        #       is not in the index, and leave their bit unset.
+        masks = self._masks
+        row = 0
+        for term in data:
+            row |= masks.get(msat_term_id(term), 0)
+        self._chunk.append(row)
+        self.count += 1
+        if len(self._chunk) >= self._chunk_size:
+            self._deliver()
+        if self._max_models is not None and self.count >= self._max_models:
+            self.stopped = True
+        elif self._timeout is not None and \
+                time.monotonic() - self._start > self._timeout:
+            self.stopped = True
+        return 0 if self.stopped else 1
+
+    def _deliver(self):
+        """
+        Hands the current chunk to the consumer.
+        """
+        chunk, self._chunk = self._chunk, []
+        self._end = time.monotonic()
+        self._consumer(chunk)
+        return
+
+    def flush(self):
+        """
+        Hands the models not yet delivered to the consumer.
+        """
+        if self._chunk:
+            self._deliver()
+        return
+
+    def decode(self, row):
+        """
+        Converts a bitset to an assignment.
+
+        :param row: an integer bitset.
+
+        :returns: a list of '(atom, value)' pairs, with 'atom'
+                  a msat_term and 'value' a bool.
+        """
+        return [(atom, bool(row >> idx & 1)) for idx, atom in enumerate(self.atoms)]
+
+    def stats(self):
+        """
+        Returns the collector statistics.
+
+        :returns: a dictionary with the number of 'models', the
+                  'elapsed' time between the first and the last
+                  delivery and the 'models_per_s' throughput.
+        """
+        elapsed = 0.0
+        if self._start is not None and self._end is not None:
+            elapsed = self._end - self._start
+        return {
+            "models" : self.count,
+            "elapsed" : elapsed,
+            "models_per_s" : self.count / elapsed if elapsed else 0.0,
+        }
+
+def iter_all_sat(env, important, chunk_size=4096, max_models=None, timeout=None):
+    """
+    Performs AllSat over the important atoms on a background thread,
+    yielding the models found in chunks of integer bitsets, as with
+    AllSatCollector. The environment must not be used until the
+    generator is exhausted or closed.
+
+    :param env: the environment to check.
+    :param important: an array of important atoms.
+    :param chunk_size: the number of models in a chunk.
+    :param max_models: the number of models after which the
+                       search is stopped, or None.
+    :param timeout: the number of wall-clock seconds after
+                    which the search is stopped, or None.
+
+    :yields: lists of integer bitsets.
+    """
+    chunks = queue.Queue(maxsize=4)
+    collector = AllSatCollector(env, important, chunks.put, chunk_size, max_models, timeout)
+
+    def run():
+        try:
+            msat_all_sat(env, collector.atoms, collector)
+            collector.flush()
+        finally:
+            chunks.put(None)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    chunk = ()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        collector.stopped = True
+        while chunk is not None:
+            chunk = chunks.get()
+        thread.join()
+
+###
+### GET_OBJECTIVES
+###
+
+OBJECTIVE_STATUS = ["MSAT_OPT_UNKNOWN",
+                    "MSAT_OPT_UNSAT",
+                    "MSAT_OPT_SAT_PARTIAL",
+                    "MSAT_OPT_SAT_APPROX",
+                    "MSAT_OPT_SAT_OPTIMAL"]
+
+ObjectiveValue = namedtuple("ObjectiveValue", ["term", "epsilon", "infinity"])
+ObjectiveValue.__doc__ = """
+An objective value: 'term' is the finite part of the value, 'epsilon'
+and 'infinity' are respectively positive/negative when the value
+includes a positive/negative infinitesimal or infinite amount, and
+zero otherwise.
+"""
+
+ObjectiveResult = namedtuple("ObjectiveResult", ["objective", "term", "status",
+                                                 "optimum", "lower", "upper"])
+ObjectiveResult.__doc__ = """
+The result of an objective: 'objective' is the msat_objective instance,
+'term' its cost function, 'status' one of the MSAT_OPT_* values, and
+'optimum', 'lower' and 'upper' are ObjectiveValue instances, or None
+when the status is not satisfiable.
+"""
+
+def get_objective_value(env, obj, val, inf=None, eps=None):
+    """
+    Returns an objective value.
+
+    :param env: the environment in which to operate.
+    :param obj: the msat_objective instance of reference.
+    :param val: the objective value to evaluate.
+    :param inf: the symbolic/constant value representing
+                an infinite amount.
+    :param eps: the symbolic/constant value representing
+                an infinitesimal amount.
+
+    :returns: an ObjectiveValue instance.
+    """
+    if msat_objective_value_is_minus_inf(env, obj, val) > 0:
+        infinity = -1
+    elif msat_objective_value_is_plus_inf(env, obj, val) > 0:
+        infinity = 1
+    else:
+        infinity = 0
+    term = msat_objective_value_term(env, obj, val, inf, eps)
+    assert not MSAT_ERROR_TERM(term)
+    epsilon = msat_objective_value_get_epsilon(env, obj, val)
+    return ObjectiveValue(term, epsilon, infinity)
+
+def get_objective_results(env, inf=None, eps=None):
+    """
+    Returns the results of the objectives currently asserted.
+
+    :param env: the environment in which to operate.
+    :param inf: the symbolic/constant value representing
+                an infinite amount.
+    :param eps: the symbolic/constant value representing
+                an infinitesimal amount.
+
+    :returns: a list of ObjectiveResult instances.
+    """
+    ret = []
+    obj_iter = msat_create_objective_iterator(env)
+    assert not MSAT_ERROR_OBJECTIVE_ITERATOR(obj_iter)
+    while msat_objective_iterator_has_next(obj_iter):
         res, obj = msat_objective_iterator_next(obj_iter)
         assert res == 0
         cost_fun = msat_objective_get_term(env, obj)
         assert not MSAT_ERROR_TERM(cost_fun)
-        value = get_objective_value_pretty_string(env, obj, MSAT_OPTIMUM)
+        status = msat_objective_result(env, obj)
+        if status > 0:
+            ret.append(ObjectiveResult(obj, cost_fun, status,
+                                       get_objective_value(env, obj, MSAT_OPTIMUM, inf, eps),
+                                       get_objective_value(env, obj, MSAT_FINAL_LOWER, inf, eps),
+                                       get_objective_value(env, obj, MSAT_FINAL_UPPER, inf, eps)))
+        else:
+            ret.append(ObjectiveResult(obj, cost_fun, status, None, None, None))
+    msat_destroy_objective_iterator(obj_iter)
+    return ret
+
+def format_objective_value(value):
+    """
+    Returns a pretty string representing an objective value.
+
+    :param value: the ObjectiveValue instance.
+
+    :returns: a string representing the objective value.
+    """
+    if value.infinity < 0:
+        return "-oo"
+    if value.infinity > 0:
+        return "+oo"
+    if value.epsilon > 0:
+        return "(+ {} epsilon)".format(value.term)
+    if value.epsilon < 0:
+        return "(- {} epsilon)".format(value.term)
+    return str(value.term)
+
+def format_objective_status(status):
+    """
+    Returns a pretty string representing an unsatisfiable
+    objective status.
+
+    :param status: the objective status.
+
+    :returns: 'unknown' or 'unsat'.
+    """
+    return "unknown" if status == MSAT_UNKNOWN else "unsat"
+
+def get_objectives(env, inf=None, eps=None):
+    """
+    Prints the list of objectives currently asserted
+    and their value.
+
+    :param env: the environment in which to operate.
+    :param inf: the symbolic/constant value representing
+                an infinite amount.
+    :param eps: the symbolic/constant value representing
+                an infinitesimal amount.
+    """
+    print("(objectives")
+    for res in get_objective_results(env, inf, eps):
+        if res.status < 0:
+            print("\t({} unknown)".format(str(res.term)))
+        elif res.status == 0:
+            print("\t({} unsat)".format(str(res.term)))
+        else:
+            print("\t({} {})".format(str(res.term), str(res.optimum.term)))
+    print(")")
+
+def get_objectives_pretty(env):
+    """
+    Prints the list of objectives currently asserted
+    and their value, in a pretty format.
+
+    :param env: the environment in which to operate.
+    """
+    print("(objectives")
+    for res in get_objective_results(env, None, msat_from_string(env, "0")):
+        if res.status <= 0:
+            print("\t({} {})".format(str(res.term), format_objective_status(res.status)))
+            continue
+        value = format_objective_value(res.optimum)
         # Handle partial/approx result
         extra = ""
-        res = msat_objective_result(env, obj)
-        if res == MSAT_OPT_SAT_PARTIAL: # timeout
-            lb = get_objective_value_pretty_string(env, obj, MSAT_FINAL_LOWER)
-            ub = get_objective_value_pretty_string(env, obj, MSAT_FINAL_UPPER)
-            extra = ", partial search, range: [ {}, {} ]".format(lb, ub)
-        elif res == MSAT_OPT_SAT_APPROX: # absolute/tolerance threshold
-            lb = get_objective_value_pretty_string(env, obj, MSAT_FINAL_LOWER)
-            ub = get_objective_value_pretty_string(env, obj, MSAT_FINAL_UPPER)
-            extra = ", termination threshold, range: [ {}, {} ]".format(lb, ub)
-        else:
-            extra = ""
-        print("\t({} {}){}".format(str(cost_fun), value, extra))
+        if res.status == MSAT_OPT_SAT_PARTIAL: # timeout
+            extra = ", partial search, range: [ {}, {} ]".format(
+                format_objective_value(res.lower), format_objective_value(res.upper))
+        elif res.status == MSAT_OPT_SAT_APPROX: # absolute/tolerance threshold
+            extra = ", termination threshold, range: [ {}, {} ]".format(
+                format_objective_value(res.lower), format_objective_value(res.upper))
+        print("\t({} {}){}".format(str(res.term), value, extra))
     print(")")
+
+def get_objective_value_pretty_string(env, obj, val): # pylint: disable=invalid-name,locally-disabled
+    """
+    Returns a pretty string representing the given
+    objective value.
+
+    :param env: the environment in which to operate.
+    :param obj: the msat_objective instance of reference.
+    :param val: the objective value to evaluate.
+
+    :returns: a string representing the target objective
+              value.
+    """
+    res = msat_objective_result(env, obj)
+    if val == MSAT_OPTIMUM and res <= 0:
+        return format_objective_status(res)
+    value = get_objective_value(env, obj, val, None, msat_from_string(env, "0"))
+    return format_objective_value(value)
+
+###
+### MODEL(s)
+###
+
+ObjectiveModel = namedtuple("ObjectiveModel", ["objective", "term", "status", "model"])
+ObjectiveModel.__doc__ = """
+The model of an objective: 'objective' is the msat_objective instance,
+'term' its cost function, 'status' one of the MSAT_OPT_* values, and
+'model' the list of '(term, value)' pairs returned by get_model_values(),
+or None when no model is available.
+"""
+
+def load_model(env, obj):
+    """
+    Loads the model associated with an objective instance 'obj'
+    within the environment (if any).
+
+    :param env: the environment in which to operate.
+    :param obj: the target objective.
+    """
+    msat_load_objective_model(env, obj)
+
+def get_objective_models(env, hidden=False):
+    """
+    Returns the model associated with each objective currently
+    asserted in the given environment.
+
+    :param env: the environment in which to operate.
+    :param hidden: enables collecting the value of hidden
+                   variables.
+
+    :returns: a list of ObjectiveModel instances.
+    """
+    ret = []
+    obj_iter = msat_create_objective_iterator(env)
+    assert not MSAT_ERROR_OBJECTIVE_ITERATOR(obj_iter)
+    while msat_objective_iterator_has_next(obj_iter):
+        res, obj = msat_objective_iterator_next(obj_iter)
+        assert res == 0
+        cost_fun = msat_objective_get_term(env, obj)
+        assert not MSAT_ERROR_TERM(cost_fun)
+        status = msat_objective_result(env, obj)
+        model = None
+        if status > 0:
+            load_model(env, obj)
+            model = get_model_values(env, hidden)
+        ret.append(ObjectiveModel(obj, cost_fun, status, model))
     msat_destroy_objective_iterator(obj_iter)
+    return ret
+
+def dump_models(env):
+    """
+    Prints the model associated with each objective currently
+    asserted in the given environment.
+
+    :param env: the environment in which to operate.
+    """
+    for res in get_objective_models(env):
+        print("% Goal: {}".format(str(res.term)))
+        print("% Status: {}".format(OBJECTIVE_STATUS[res.status+1]))
+        print("% (Finite) Model:")
+        if res.model is not None:
+            print_model_values(res.model)
+        else:
+            print("\tno model available")
+        print("")
+
+def get_model_values(env, hidden=False):
+    """
+    Returns the model currently loaded in the given
+    environment.
+
+    :param env: the environment in which to operate.
+    :param hidden: enables collecting the value of hidden
+                   variables.
+
+    :returns: a list of '(term, value)' pairs of msat_term.
+    """
+    model = msat_get_model(env)
+    if MSAT_ERROR_MODEL(model):
+        raise Exception("Unable to get model from environment.")
+    ret = []
+    miter = msat_model_create_iterator(model)
+    assert not MSAT_ERROR_MODEL_ITERATOR(miter)
+    while msat_model_iterator_has_next(miter):
+        (term, value) = msat_model_iterator_next(miter)
+        if hidden or str(term)[0] != ".":
+            ret.append((term, value))
+    msat_destroy_model_iterator(miter)
+    msat_destroy_model(model)
+    return ret
+
+def print_model_values(values):
+    """
+    Prints a list of '(term, value)' pairs.
+
+    :param values: the pairs returned by get_model_values().
+    """
+    for term, value in values:
+        print("\t{} : {}".format(str(term), str(value)))
+
+class Model(object):
+    """
+    A lazy view over the model currently loaded in an environment.
+
+    Values are computed on demand, by evaluating the requested
+    variables or terms in the model, and cached. The model is only
+    iterated upon an explicit call to items().
+    """
 
-def get_objective_value_pretty_string(env, obj, val): # pylint: disable=invalid-name,locally-disabled
+    def __init__(self, env):
+        """
+        Class constructor.
+
+        :param env: the environment in which to operate.
+        """
+        assert not MSAT_ERROR_ENV(env)
+        self._env = env
+        self._model = msat_get_model(env)
+        if MSAT_ERROR_MODEL(self._model):
+            self._model = None
+            raise Exception("Unable to get model from environment.")
+        self._cache = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.destroy()
+
+    def destroy(self):
+        """
+        Destroys the underlying msat_model instance. It is an error
+        to destroy the environment before its model.
+        """
+        if self._model is not None:
+            msat_destroy_model(self._model)
+            self._model = None
+        return
+
+    def _term(self, key):
+        """
+        Resolves a variable name to its term.
+
+        :param key: a variable name or a msat_term.
+
+        :returns: a msat_term.
+        """
+        if not isinstance(key, str):
+            return key
+        decl = msat_find_decl(self._env, key)
+        if MSAT_ERROR_DECL(decl):
+            raise KeyError(key)
+        term = msat_make_constant(self._env, decl)
+        assert not MSAT_ERROR_TERM(term)
+        return term
+
+    def __getitem__(self, key):
+        """
+        Returns the value of a variable or term in the model.
+
+        :param key: a variable name or a msat_term.
+
+        :returns: the msat_term value.
+        """
+        assert self._model is not None
+        ckey = key if isinstance(key, str) else msat_term_id(key)
+        value = self._cache.get(ckey)
+        if value is None:
+            value = msat_model_eval(self._model, self._term(key))
+            if MSAT_ERROR_TERM(value):
+                raise KeyError(key)
+            self._cache[ckey] = value
+        return value
+
+    def get(self, key, default=None):
+        """
+        Returns the value of a variable or term in the model.
+
+        :param key: a variable name or a msat_term.
+        :param default: the value returned if 'key' is unknown.
+
+        :returns: the msat_term value, or 'default'.
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self, hidden=False):
+        """
+        Iterates over the whole model.
+
+        :param hidden: enables returning the value of hidden
+                       variables.
+
+        :yields: '(term, value)' pairs of msat_term.
+        """
+        assert self._model is not None
+        miter = msat_model_create_iterator(self._model)
+        assert not MSAT_ERROR_MODEL_ITERATOR(miter)
+        try:
+            while msat_model_iterator_has_next(miter):
+                (term, value) = msat_model_iterator_next(miter)
+                if not hidden and msat_decl_get_name(msat_term_get_decl(term))[0] == ".":
+                    continue
+                yield term, value
+        finally:
+            msat_destroy_model_iterator(miter)
+
+def get_model(env):
+    """
+    Returns a lazy view over the model currently loaded in the
+    given environment. The view should be used as a context manager,
+    or destroyed explicitly, to release the model deterministically.
+
+    :param env: the environment in which to operate.
+
+    :returns: a Model instance.
     """
-    Returns a pretty string representing the given
-    objective value.
+    return Model(env)
+
+def dump_model(env, hidden=False):
+    """
+    Prints the model currently loaded in the given
+    environment.
 
     :param env: the environment in which to operate.
-    :param obj: the msat_objective instance of reference.
-    :param val: the objective value to evaluate.
+    :param hidden: enables printing the value of hidden
+                   variables.
+    """
+    print_model_values(get_model_values(env, hidden))
 
-    :returns: a string representing the target objective
-              value.
+###
+### PARETO FRONT
+###
+
+ParetoPoint = namedtuple("ParetoPoint", ["index", "values", "model", "latency", "elapsed"])
+ParetoPoint.__doc__ = """
+A Pareto-optimal point: 'index' is its position in the enumeration,
+'values' the tuple of objective values (fractions.Fraction, or int for
+Bit-Vector goals), 'model' a lazy Model view, 'latency' the time spent
+searching for the point and 'elapsed' the time since the enumeration
+started, in seconds.
+"""
+
+def term_to_number(term):
     """
-    ret = ""
-    res = msat_objective_result(env, obj)
-    if val == MSAT_OPTIMUM and res <= 0:
-        if res == MSAT_UNKNOWN:
-            ret = "unknown"
-        elif res == MSAT_UNSAT:
-            ret = "unsat"
-    else:
-        if msat_objective_value_is_minus_inf(env, obj, val) > 0:
-            ret = "-oo"
-        elif msat_objective_value_is_plus_inf(env, obj, val) > 0:
-            ret = "+oo"
+    Converts a numeric value term to a Python number.
+
+    :param term: a msat_term Integer, Rational or Bit-Vector value.
+
+    :returns: a fractions.Fraction, or an int for Bit-Vector values.
+    """
+    srepr = msat_term_repr(term)
+    # N.B.: Bit-Vector values are represented as '<value>_<width>'
+    number, sep, _ = srepr.partition("_")
+    if sep:
+        return int(number)
+    return Fraction(srepr)
+
+def number_to_smtlib2(value):
+    """
+    Returns the SMT-LIBv2 representation of a number.
+
+    :param value: a fractions.Fraction or an int.
+
+    :returns: an SMT-LIBv2 constant.
+    """
+    value = Fraction(value)
+    num = "{}".format(abs(value.numerator))
+    if value.denominator != 1:
+        num = "(/ {} {})".format(num, value.denominator)
+    return "(- {})".format(num) if value < 0 else num
+
+class ParetoFront(object):
+    """
+    A set of mutually non-dominated points.
+
+    Points are kept sorted by their first objective value, so that,
+    with two objectives, dominance queries and insertions take a
+    logarithmic number of comparisons.
+    """
+
+    def __init__(self, senses):
+        """
+        Class constructor.
+
+        :param senses: the direction of each objective, either
+                       'min' or 'max'.
+        """
+        for sense in senses:
+            if sense not in ("min", "max"):
+                raise Exception("Unsupported objective direction '{}'.".format(sense))
+        self._signs = tuple(1 if sense == "min" else -1 for sense in senses)
+        self._keys = []
+        self._points = []
+
+    def _key(self, values):
+        """
+        Maps objective values to the minimization space.
+
+        :param values: the objective values.
+
+        :returns: a tuple of numbers.
+        """
+        if len(values) != len(self._signs):
+            raise Exception("Expected {} objective values.".format(len(self._signs)))
+        return tuple(sign * value for sign, value in zip(self._signs, values))
+
+    def is_dominated(self, values):
+        """
+        Checks whether a point is weakly dominated by the front.
+
+        :param values: the objective values of the point.
+
+        :returns: True if some point of the front is at least
+                  as good on all objectives.
+        """
+        key = self._key(values)
+        end = bisect.bisect_right(self._keys, key)
+        if len(key) == 2:
+            # N.B.: with two objectives, the second value decreases
+            #       along the front, so the last candidate is the best.
+            return end > 0 and self._keys[end - 1][1] <= key[1]
+        return any(all(a <= b for a, b in zip(other, key))
+                   for other in self._keys[:end])
+
+    def insert(self, point):
+        """
+        Adds a point to the front, dropping the points it dominates.
+
+        :param point: a ParetoPoint, or any object with a 'values'
+                      attribute.
+
+        :returns: False if the point is dominated by the front.
+        """
+        if self.is_dominated(point.values):
+            return False
+        key = self._key(point.values)
+        start = bisect.bisect_left(self._keys, key)
+        if len(key) == 2:
+            end = start
+            while end < len(self._keys) and self._keys[end][1] >= key[1]:
+                end += 1
+            del self._keys[start:end]
+            del self._points[start:end]
         else:
-            term = msat_objective_value_term(env, obj, val,
-                                             MSAT_MAKE_ERROR_TERM(),
-                                             msat_from_string(env, "0"))
+            keep = [idx for idx in range(start, len(self._keys))
+                    if not all(a <= b for a, b in zip(key, self._keys[idx]))]
+            self._keys[start:] = [self._keys[idx] for idx in keep]
+            self._points[start:] = [self._points[idx] for idx in keep]
+        self._keys.insert(start, key)
+        self._points.insert(start, point)
+        return True
 
-            eps = msat_objective_value_get_epsilon(env, obj, val)
+    def __len__(self):
+        return len(self._points)
 
-            if eps > 0:
-                ret = "(+ {} epsilon)".format(term)
-            elif eps < 0:
-                ret = "(- {} epsilon)".format(term)
-            else:
-                ret = str(term)
-    return ret
+    def __iter__(self):
+        return iter(list(self._points))
+
+    def points(self):
+        """
+        Returns the points of the front.
+
+        :returns: a list of points, sorted by the first objective
+                  in its optimization direction.
+        """
+        return list(self._points)
+
+def iter_pareto_front(env, front=None, max_points=None, timeout=None):
+    """
+    Enumerates the Pareto front of the objectives asserted in an
+    environment configured with 'opt.priority=par'.
+
+    The model of each point is only valid until the generator is
+    resumed, after which it is destroyed.
+
+    :param env: the environment in which to operate.
+    :param front: a ParetoFront instance updated with each point
+                  as it is found, or None.
+    :param max_points: the maximum number of points, or None.
+    :param timeout: the number of wall-clock seconds after which
+                    the enumeration is interrupted, or None.
+
+    :yields: ParetoPoint instances.
+    """
+    assert not MSAT_ERROR_ENV(env)
+    cost_funs = [res.term for res in get_objective_results(env)]
+    timer = None
+    if timeout is not None:
+        timer = ThreadedTimer(timeout)
+        msat_set_termination_test(env, timer)
+    start = time.monotonic()
+    index = 0
+    try:
+        while max_points is None or index < max_points:
+            before = time.monotonic()
+            ret = msat_solve(env)
+            now = time.monotonic()
+            log_solve_time(now - before)
+            if ret <= 0:
+                break
+            model = Model(env)
+            try:
+                point = ParetoPoint(index, tuple(term_to_number(model[cost_fun])
+                                                 for cost_fun in cost_funs),
+                                    model, now - before, now - start)
+                if front is not None:
+                    front.insert(point)
+                index += 1
+                yield point
+            finally:
+                model.destroy()
+    finally:
+        if timer is not None:
+            timer.cancel()
+            msat_set_termination_test(env, None)
 
 ###
-### MODEL(s)
+### ANYTIME OPTIMIZATION
 ###
 
-def load_model(env, obj):
+AnytimeEvent = namedtuple("AnytimeEvent", ["kind", "time", "incumbent", "bound", "model"])
+AnytimeEvent.__doc__ = """
+A progress event of an AnytimeSearch: 'kind' is 'model' when a better
+model is found, 'bound' when the proven bound improves, 'optimal' when
+the incumbent is proven optimal and 'timeout' when the search is
+interrupted; 'time' is the number of seconds since the search started,
+'incumbent' the cost of the best model and 'bound' the proven limit on
+the cost of any model, either as numbers or None; 'model' is a lazy
+Model view of the new incumbent, or None.
+"""
+
+class AnytimeSearch(object):
     """
-    Loads the model associated with an objective instance 'obj'
-    within the environment (if any).
+    An optimization search driven from Python, which reports every
+    improving model and bound as soon as it is found.
 
-    :param env: the environment in which to operate.
-    :param obj: the target objective.
+    Each step is a satisfiability check of the formulas asserted in
+    the environment, strengthened with a bound on the cost function.
+    Linear steps look for any model better than the incumbent, binary
+    steps, which require a known bound, look for a model better than
+    the midpoint between the bound and the incumbent. Since each step
+    is a plain satisfiability check, the environment must not have
+    any objective asserted.
+
+    N.B.: the search terminates only if the cost function is bounded
+          in the optimization direction and, with Rational cost
+          functions, the optimum is attained by finitely many
+          improving steps; otherwise, use 'timeout' or 'max_steps',
+          and 'tolerance' to stop within a given gap.
     """
-    msat_load_objective_model(env, obj)
 
-def dump_models(env):
+    def __init__(self, env, cost_fun, sense="min", bound=None, strategy="linear", # pylint: disable=too-many-arguments,locally-disabled
+                 tolerance=0):
+        """
+        Class constructor.
+
+        :param env: the environment in which to operate.
+        :param cost_fun: the cost function, as string or msat_term.
+        :param sense: the objective direction, either 'min' or 'max'.
+        :param bound: a known limit on the cost of any model, i.e.
+                      a lower bound when minimizing, or None.
+        :param strategy: either 'linear' or 'binary'.
+        :param tolerance: the search stops once the gap between
+                          the incumbent and the bound is within
+                          this amount.
+        """
+        if sense not in ("min", "max"):
+            raise Exception("Unsupported objective direction '{}'.".format(sense))
+        if strategy not in ("linear", "binary"):
+            raise Exception("Unsupported search strategy '{}'.".format(strategy))
+        assert not MSAT_ERROR_ENV(env)
+        self._env = env
+        self._cost_fun = string_to_term(env, cost_fun) if isinstance(cost_fun, str) else cost_fun
+        self._sign = 1 if sense == "min" else -1
+        self._strategy = strategy
+        self._tolerance = Fraction(tolerance)
+        self.incumbent = None
+        self.bound = Fraction(bound) if bound is not None else None
+        self.trajectory = []
+
+    def _check_objectives(self):
+        """
+        Raises an exception if the environment has objectives,
+        which would turn each step into a full optimization search.
+        """
+        obj_iter = msat_create_objective_iterator(self._env)
+        assert not MSAT_ERROR_OBJECTIVE_ITERATOR(obj_iter)
+        found = msat_objective_iterator_has_next(obj_iter)
+        msat_destroy_objective_iterator(obj_iter)
+        if found:
+            raise Exception("AnytimeSearch requires an environment without objectives.")
+        return
+
+    def _better_than(self, value):
+        """
+        Returns the constraint asking for a model strictly better
+        than the given cost.
+
+        :param value: a number.
+
+        :returns: a msat_term.
+        """
+        return string_to_term(self._env, "({} {} {})".format(
+            "<" if self._sign > 0 else ">", msat_term_repr(self._cost_fun),
+            number_to_smtlib2(value)))
+
+    def _pivot(self):
+        """
+        Returns the cost to beat in the next step.
+
+        :returns: a number, or None for an unconstrained step.
+        """
+        if self.incumbent is None:
+            return None
+        if self._strategy == "linear" or self.bound is None:
+            return self.incumbent
+        pivot = (self.incumbent + self.bound) / 2
+        if self.incumbent.denominator == 1 and self.bound.denominator == 1:
+            # N.B.: round towards the incumbent, so that the
+            #       pivot is always strictly better than the bound.
+            pivot = Fraction(pivot.numerator // pivot.denominator) if self._sign > 0 \
+                    else -Fraction(-pivot.numerator // pivot.denominator)
+        if self._sign * pivot <= self._sign * self.bound:
+            return self.incumbent
+        return pivot
+
+    def _event(self, kind, start, model=None):
+        """
+        Records a point of the trajectory.
+
+        :param kind: the event kind.
+        :param start: the start time of the search.
+        :param model: the Model of the incumbent, or None.
+
+        :returns: an AnytimeEvent instance.
+        """
+        event = AnytimeEvent(kind, time.monotonic() - start, self.incumbent, self.bound, model)
+        self.trajectory.append((event.time, kind, self.incumbent, self.bound))
+        return event
+
+    def events(self, timeout=None, max_steps=None):
+        """
+        Runs the search. The model of each event is only valid until
+        the generator is resumed, after which it is destroyed. The
+        constraints added by the search are retracted once the
+        generator is exhausted or closed.
+
+        :param timeout: the number of wall-clock seconds after
+                        which the search is interrupted, or None.
+        :param max_steps: the maximum number of satisfiability
+                          checks, or None.
+
+        :yields: AnytimeEvent instances.
+        """
+        env = self._env
+        self._check_objectives()
+        timer = None
+        if timeout is not None:
+            timer = ThreadedTimer(timeout)
+            msat_set_termination_test(env, timer)
+        start = time.monotonic()
+        push(env)
+        try:
+            steps = 0
+            while max_steps is None or steps < max_steps:
+                if self.incumbent is not None and self.bound is not None and \
+                        self._sign * (self.incumbent - self.bound) <= self._tolerance:
+                    yield self._event("optimal", start)
+                    return
+                pivot = self._pivot()
+                model = None
+                # N.B.: the pivot bound is retracted before any event is
+                #       yielded, so that closing the generator leaves a
+                #       single backtrack point to pop.
+                push(env)
+                try:
+                    if pivot is not None and \
+                            msat_assert_formula(env, self._better_than(pivot)) != 0:
+                        raise Exception("Unable to assert bound {}.".format(pivot))
+                    before = time.monotonic()
+                    ret = msat_solve(env)
+                    log_solve_time(time.monotonic() - before)
+                    if ret > 0:
+                        model = Model(env)
+                finally:
+                    pop(env)
+                steps += 1
+                if ret < 0:
+                    yield self._event("timeout", start)
+                    return
+                if ret == 0:
+                    if pivot is None:
+                        raise Exception("Unsatisfiable formula.")
+                    self.bound = pivot
+                    if pivot == self.incumbent:
+                        yield self._event("optimal", start)
+                        return
+                    # N.B.: all models are known to be no better than
+                    #       the pivot, the next step is a linear one if
+                    #       the bound is tight.
+                    yield self._event("bound", start)
+                    continue
+                try:
+                    self.incumbent = term_to_number(model[self._cost_fun])
+                    yield self._event("model", start, model)
+                finally:
+                    model.destroy()
+                # N.B.: every later model must improve the incumbent.
+                if msat_assert_formula(env, self._better_than(self.incumbent)) != 0:
+                    raise Exception("Unable to assert bound {}.".format(self.incumbent))
+        finally:
+            pop(env)
+            if timer is not None:
+                timer.cancel()
+                msat_set_termination_test(env, None)
+
+    def run(self, callback, timeout=None, max_steps=None):
+        """
+        Runs the search, invoking a function with each event.
+
+        :param callback: the function invoked with each AnytimeEvent;
+                         the search stops when it returns False.
+        :param timeout: the number of wall-clock seconds after
+                        which the search is interrupted, or None.
+        :param max_steps: the maximum number of satisfiability
+                          checks, or None.
+
+        :returns: the last AnytimeEvent, or None.
+        """
+        last = None
+        for event in self.events(timeout, max_steps):
+            last = event
+            if callback(event) is False:
+                break
+        return last
+
+###
+### WARM START
+###
+
+WarmStart = namedtuple("WarmStart", ["bounds", "model"])
+WarmStart.__doc__ = """
+The data carried over from a solve to the next one: 'bounds' is a list
+of SMT-LIBv2 formulas bounding each objective by its previous optimum,
+and 'model' is a list of '(name, value)' pairs of strings, with
+Boolean values being either 'true' or 'false'.
+"""
+
+def _warm_bound(env, model, spec):
     """
-    Prints the model associated with each objective currently
-    asserted in the given environment.
+    Returns the formula bounding an objective by its value in a model.
 
     :param env: the environment in which to operate.
+    :param model: the Model instance.
+    :param spec: a '(sense, cost_fun)' pair or, for Bit-Vector cost
+                 functions, a '(sense, cost_fun, signed)' triple.
+
+    :returns: an SMT-LIBv2 formula.
     """
-    svector = ["MSAT_OPT_UNKNOWN",
-               "MSAT_OPT_UNSAT",
-               "MSAT_OPT_SAT_PARTIAL",
-               "MSAT_OPT_SAT_APPROX",
-               "MSAT_OPT_SAT_OPTIMAL"]
-    obj_iter = msat_create_objective_iterator(env)
-    assert not MSAT_ERROR_OBJECTIVE_ITERATOR(obj_iter)
-    while msat_objective_iterator_has_next(obj_iter):
-        res, obj = msat_objective_iterator_next(obj_iter)
-        assert res == 0
-        cost_fun = msat_objective_get_term(env, obj)
-        assert not MSAT_ERROR_TERM(cost_fun)
-        status = msat_objective_result(env, obj)
-        print("% Goal: {}".format(str(cost_fun)))
-        print("% Status: {}".format(svector[status+1]))
-        print("% (Finite) Model:")
-        if status > 0:
-            load_model(env, obj)
-            dump_model(env)
-        else:
-            print("\tno model available")
-        print("")
-    msat_destroy_objective_iterator(obj_iter)
+    sense, cost_fun = spec[0], spec[1]
+    if sense not in ("min", "max"):
+        raise Exception("Unsupported warm-start objective kind '{}'.".format(sense))
+    srepr = msat_term_repr(model[string_to_term(env, cost_fun)])
+    # N.B.: Bit-Vector values are represented as '<value>_<width>'
+    number, sep, width = srepr.partition("_")
+    if sep:
+        signed = len(spec) > 2 and spec[2]
+        op = "bv{}{}".format("s" if signed else "u", "le" if sense == "min" else "ge")
+        return "({} {} (_ bv{} {}))".format(op, cost_fun, number, width)
+    return "({} {} {})".format("<=" if sense == "min" else ">=", cost_fun,
+                               number_to_smtlib2(Fraction(srepr)))
 
-def dump_model(env, hidden=False):
+def get_warm_start(env, objectives=()):
     """
-    Prints the model currently loaded in the given
-    environment.
+    Collects the optimum and the model found by the last solve.
 
     :param env: the environment in which to operate.
-    :param hidden: enables printing the value of hidden
-                   variables.
+    :param objectives: a list of '(sense, cost_fun)' pairs, where
+                       'sense' is either 'min' or 'max' and 'cost_fun'
+                       is a string; Bit-Vector cost functions take a
+                       '(sense, cost_fun, signed)' triple, and are
+                       compared as unsigned numbers by default.
+
+    :returns: a WarmStart instance.
+    """
+    with get_model(env) as model:
+        bounds = [_warm_bound(env, model, spec) for spec in objectives]
+        values = []
+        for term, value in model.items():
+            # N.B.: Boolean values are represented as '`true`'.
+            if msat_term_is_true(env, value):
+                value = "true"
+            elif msat_term_is_false(env, value):
+                value = "false"
+            values.append((str(term), str(value)))
+    return WarmStart(bounds, values)
+
+def _apply_hints(env, warm):
+    """
+    Makes the solver branch first on the Boolean variables of
+    a previous model, with their previous value.
+
+    :param env: the environment in which to operate.
+    :param warm: the WarmStart instance.
     """
-    model = msat_get_model(env)
-    if MSAT_ERROR_MODEL(model):
-        raise Exception("Unable to get model from environment.")
-    assert not MSAT_ERROR_MODEL(model)
-    miter = msat_model_create_iterator(model)
-    assert not MSAT_ERROR_MODEL_ITERATOR(miter)
-    while msat_model_iterator_has_next(miter):
-        (term, value) = msat_model_iterator_next(miter)
-        if str(term)[0] == "." and not hidden:
+    for name, value in warm.model:
+        if value not in ("true", "false"):
             continue
-        else:
-            print("\t{} : {}".format(str(term), str(value)))
-    msat_destroy_model_iterator(miter)
-    msat_destroy_model(model)
+        decl = msat_find_decl(env, name)
+        if MSAT_ERROR_DECL(decl):
+            continue
+        term = msat_make_constant(env, decl)
+        if value == "false":
+            term = msat_make_not(env, term)
+        msat_add_preferred_for_branching(env, term)
+    return
+
+@contextmanager
+def warm_solve(env, warm, hints=True):
+    """
+    Checks the satisfiability of the given environment, starting
+    from the optimum and the model of a previous solve.
+
+    Each objective given to get_warm_start() is bounded by its
+    previous optimum, which is sound as long as such values are still
+    reachable by a single model. When they are not, i.e. when the
+    bounded problem is unsatisfiable, all bounds are retracted and
+    the problem is solved again. Since the bounds are asserted
+    together, with lexicographic optimization only the first objective
+    should be bounded, and with boxed or Pareto optimization none.
+
+    :param env: the environment to check, in which the objectives
+                have already been asserted.
+    :param warm: the WarmStart instance, or None for a cold solve.
+    :param hints: enables using the previous model as a branching
+                  preference.
+
+    :yields: a '(ret, fallback)' pair, where 'ret' is the result of
+             msat_solve() and 'fallback' tells whether the bound had
+             to be retracted. Objectives and model are available
+             within the context, after which the bound is retracted.
+    """
+    assert not MSAT_ERROR_ENV(env)
+    bounded = warm is not None and bool(warm.bounds)
+    if warm is not None and hints:
+        _apply_hints(env, warm)
+    push(env)
+    try:
+        if bounded:
+            assert_string_formulas(env, warm.bounds)
+        start = time.monotonic()
+        ret = msat_solve(env)
+        log_solve_time(time.monotonic() - start)
+        fallback = bounded and ret == 0
+        if fallback:
+            pop(env)
+            push(env)
+            start = time.monotonic()
+            ret = msat_solve(env)
+            log_solve_time(time.monotonic() - start)
+        yield ret, fallback
+    finally:
+        pop(env)
+        if warm is not None and hints:
+            msat_clear_preferred_for_branching(env)
 
 
 ###
@@ -788,7 +2914,7 @@ class Timer(object): # pylint: disable=too-few-public-methods,locally-disabled
 
         :returns: non-zero upon timeout.
         """
-        now = time.time()
+        now = time.monotonic()
         if not self._started:
             self._started = now
         self._end = now
@@ -804,6 +2930,169 @@ class Timer(object): # pylint: disable=too-few-public-methods,locally-disabled
         self._started = False
         return
 
+class SampledTimer(object): # pylint: disable=too-few-public-methods,locally-disabled
+    """
+    A low-overhead timer object, supporting wall-clock and CPU-time
+    budgets.
+
+    The clocks are sampled only once every K calls, where K is adapted
+    so that consecutive samples are about 'resolution' seconds apart.
+    """
+
+    def __init__(self, timeout=None, cpu_timeout=None, resolution=0.001, max_period=65536):
+        """
+        Timer Constructor. The timer starts at the first call.
+
+        :param timeout: the number of wall-clock seconds before
+                        a timeout, or None.
+        :param cpu_timeout: the number of CPU seconds before a
+                            timeout, or None.
+        :param resolution: the desired interval between two clock
+                           samples, in seconds.
+        :param max_period: the maximum number of calls between two
+                           clock samples.
+        """
+        self._wall_budget = None if timeout is None else int(timeout * 1e9)
+        self._cpu_budget = None if cpu_timeout is None else int(cpu_timeout * 1e9)
+        self._resolution = int(resolution * 1e9)
+        self._max_period = max_period
+        self._period = 1
+        self._countdown = 1
+        self._started = False
+        self._wall_start = 0
+        self._cpu_start = 0
+        self._last = 0
+        self._expired = 0
+
+    def __call__(self):
+        """
+        Callback function.
+
+        :returns: non-zero upon timeout.
+        """
+        self._countdown -= 1
+        if self._countdown > 0:
+            return self._expired
+        return self._sample()
+
+    def _sample(self):
+        """
+        Samples the clocks and adapts the sampling period.
+
+        :returns: non-zero upon timeout.
+        """
+        now = time.monotonic_ns()
+        if not self._started:
+            self._started = True
+            self._wall_start = now
+            self._cpu_start = time.process_time_ns()
+            self._last = now
+        else:
+            delta = now - self._last
+            self._last = now
+            if delta <= 0:
+                period = self._period * 2
+            else:
+                period = self._period * self._resolution // delta
+                period = max(self._period // 2, min(period, self._period * 2))
+            self._period = max(1, min(period, self._max_period))
+        self._countdown = self._period
+        if self._wall_budget is not None and now - self._wall_start > self._wall_budget:
+            self._expired = 1
+        elif self._cpu_budget is not None and \
+                time.process_time_ns() - self._cpu_start > self._cpu_budget:
+            self._expired = 1
+        return self._expired
+
+    def reset(self):
+        """
+        Reset the timer.
+        """
+        self._started = False
+        self._period = 1
+        self._countdown = 1
+        self._expired = 0
+        return
+
+class ThreadedTimer(object): # pylint: disable=too-few-public-methods,locally-disabled
+    """
+    A timer object whose clocks are checked by a background thread,
+    so that the callback invoked by the solver only reads a flag.
+    """
+
+    def __init__(self, timeout=None, cpu_timeout=None, resolution=0.01):
+        """
+        Timer Constructor. The timer starts immediately.
+
+        :param timeout: the number of wall-clock seconds before
+                        a timeout, or None.
+        :param cpu_timeout: the number of CPU seconds before a
+                            timeout, or None.
+        :param resolution: the interval between two clock checks
+                           of the background thread, in seconds.
+        """
+        self._timeout = timeout
+        self._cpu_timeout = cpu_timeout
+        self._resolution = resolution
+        self._stop = threading.Event()
+        self._thread = None
+        self.expired = 0
+        self.reset()
+
+    def __call__(self):
+        """
+        Callback function.
+
+        :returns: non-zero upon timeout.
+        """
+        return self.expired
+
+    def _run(self, stop):
+        """
+        Body of the background thread.
+
+        :param stop: the event signalling the thread to stop.
+        """
+        wall_start = time.monotonic()
+        cpu_start = time.process_time()
+        while True:
+            wait = self._resolution
+            if self._timeout is not None:
+                remaining = self._timeout - (time.monotonic() - wall_start)
+                if remaining <= 0:
+                    break
+                wait = remaining if self._cpu_timeout is None else min(wait, remaining)
+            if self._cpu_timeout is not None and \
+                    time.process_time() - cpu_start > self._cpu_timeout:
+                break
+            if stop.wait(wait):
+                return
+        self.expired = 1
+        return
+
+    def reset(self):
+        """
+        Reset the timer.
+        """
+        self.cancel()
+        self.expired = 0
+        if self._timeout is None and self._cpu_timeout is None:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), daemon=True)
+        self._thread.start()
+        return
+
+    def cancel(self):
+        """
+        Stops the background thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return
+
 ###
 ###
 ###
@@ -2,11 +2,27 @@
 
 """
 Runs all unit-tests.
+
+By default, unit-tests are executed one after the other. With
+'-j N', unit-tests are scheduled over a pool of N workers, the
+ones that took longer in previous runs being started first, and
+the output of each unit-test is printed once it has completed.
+
+With '--verify', the output of each unit-test is compared against
+the '## EXPECTED OUTPUT' comment block at the end of its source
+file, and the solve() latency of each unit-test is recorded.
 """
 
+import argparse
+import difflib
 import glob
+import json
 import os
 import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 ###
 ###
@@ -14,13 +30,355 @@ import subprocess
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-MATCHES = glob.glob(os.path.join(BASE_DIR, "unit-tests", "*.py"))
+TIMINGS_FILE = os.path.join(BASE_DIR, ".run_timings.json")
+
+###
+### TIMINGS
+###
+
+def load_timings():
+    """
+    Loads the wall-clock timings recorded by earlier runs.
+
+    :returns: a dictionary where 'key' is the unit-test name
+              and 'value' is its last wall-clock time.
+    """
+    try:
+        with open(TIMINGS_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def store_timings(timings):
+    """
+    Stores the wall-clock timings of the current run, keeping
+    the ones of unit-tests that have not been executed.
+
+    :param timings: a dictionary where 'key' is the unit-test name
+                    and 'value' is its wall-clock time.
+    """
+    data = load_timings()
+    data.update(timings)
+    try:
+        with open(TIMINGS_FILE, 'w') as f:
+            json.dump(data, f, indent=4, sort_keys=True)
+    except OSError:
+        pass
+    return
+
+###
+### EXPECTED OUTPUT
+###
+
+EXPECTED_MARKER = "## EXPECTED OUTPUT"
+
+def extract_expected(test):
+    """
+    Extracts the '## EXPECTED OUTPUT' comment block of a unit-test.
+
+    :param test: the path of the unit-test script.
+
+    :returns: the list of expected output lines, or None
+              if the unit-test has no such block.
+    """
+    with open(test, 'r') as f:
+        lines = f.read().splitlines()
+    for idx, line in enumerate(lines):
+        if line.strip() == EXPECTED_MARKER:
+            break
+    else:
+        return None
+    ret = []
+    for line in lines[idx + 1:]:
+        if not line.startswith("#"):
+            break
+        ret.append(line[2:] if line.startswith("# ") else line[1:])
+    return ret
+
+def normalize(lines, verbose=True):
+    """
+    Normalizes output lines for comparison: surrounding whitespace
+    is stripped and empty lines are dropped. Solver-verbose lines,
+    which start with '# ', are printed by the C library on its own
+    stream and thus may interleave differently with the output of
+    the script; they are moved after all other lines, or dropped
+    if 'verbose' is disabled.
+
+    :param lines: the list of output lines.
+    :param verbose: when disabled, solver-verbose lines are ignored.
+
+    :returns: the normalized list of output lines.
+    """
+    lines = [line.strip() for line in lines]
+    lines = [line for line in lines if line]
+    regular = [line for line in lines if not line.startswith("# ")]
+    solver = [line for line in lines if line.startswith("# ")]
+    return regular + solver if verbose else regular
+
+def verify(test, res, verbose=True):
+    """
+    Compares the output of a unit-test against its expected output.
+
+    :param test: the path of the unit-test script.
+    :param res: the TestResult instance of the unit-test.
+    :param verbose: when disabled, solver-verbose lines are ignored.
+
+    :returns: a pair '(status, diff)', where 'status' is one of
+              'pass', 'fail' or 'n/a' and 'diff' is a list of
+              unified-diff lines.
+    """
+    expected = extract_expected(test)
+    if res.returncode != 0:
+        return "fail", ["exit status: {}".format(res.returncode)]
+    if expected is None:
+        return "n/a", []
+    expected = normalize(expected, verbose)
+    actual = normalize(res.output.splitlines(), verbose)
+    if expected == actual:
+        return "pass", []
+    diff = difflib.unified_diff(expected, actual, "expected", "actual", lineterm="")
+    return "fail", list(diff)
+
+###
+### EXECUTION
+###
+
+class TestResult(object): # pylint: disable=too-few-public-methods,locally-disabled
+    """The outcome of a single unit-test execution."""
+
+    __slots__ = ("name", "returncode", "output", "wall", "cpu", "solve")
+
+    def __init__(self, name, returncode, output, wall, cpu, solve=None): # pylint: disable=too-many-arguments,locally-disabled
+        """
+        Class constructor.
+
+        :param name: the unit-test file name.
+        :param returncode: the exit status of the unit-test.
+        :param output: the captured stdout/stderr, or None
+                       if it was not captured.
+        :param wall: the wall-clock time, in seconds.
+        :param cpu: the user+system CPU time, in seconds.
+        :param solve: the total time spent within solve(),
+                      in seconds, or None if not recorded.
+        """
+        self.name = name
+        self.returncode = returncode
+        self.output = output
+        self.wall = wall
+        self.cpu = cpu
+        self.solve = solve
+
+def run_test(test, capture=True):
+    """
+    Runs a single unit-test and measures its resource usage.
 
-for test in MATCHES:
-    file_name = os.path.basename(test)
+    :param test: the path of the unit-test script.
+    :param capture: when enabled, stdout and stderr of the
+                    unit-test are collected rather than
+                    printed.
+
+    :returns: a TestResult instance.
+    """
+    name = os.path.basename(test)
+    stdout = subprocess.PIPE if capture else None
+    stderr = subprocess.STDOUT if capture else None
+    with tempfile.NamedTemporaryFile(prefix="omt_solve_", suffix=".log") as log:
+        env = dict(os.environ, OMT_SOLVE_LOG=log.name, PYTHONUNBUFFERED="1")
+        start = time.monotonic()
+        proc = subprocess.Popen([sys.executable, test], stdout=stdout,
+                                stderr=stderr, env=env)
+        output = None
+        if capture:
+            output = proc.stdout.read().decode("utf-8", errors="replace")
+            proc.stdout.close()
+        # N.B.: wait4() is used in place of wait() to obtain the
+        #       resource usage of this child only.
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        wall = time.monotonic() - start
+        cpu = rusage.ru_utime + rusage.ru_stime
+        solve = sum(float(line) for line in log.read().split())
+    return TestResult(name, proc.returncode, output, wall, cpu, solve)
+
+def print_header(name):
+    """
+    Prints the banner preceding the output of a unit-test.
+
+    :param name: the unit-test file name.
+    """
     print_str = "\t" + "#" * 32 + "\n" \
                 "\t### {:^24s} ###\n" + \
                 "\t" + "#" * 32 + "\n"
-    print(print_str.format(file_name))
-    subprocess.check_call([test])
-    print("\n")
+    print(print_str.format(name))
+    return
+
+def print_table(results, wall):
+    """
+    Prints a summary with the wall-clock and CPU time of
+    each unit-test.
+
+    :param results: the list of TestResult instances.
+    :param wall: the wall-clock time of the whole run.
+    """
+    print("{:<28s} {:>6s} {:>10s} {:>10s}".format("test", "status", "wall (s)", "cpu (s)"))
+    print("-" * 57)
+    for res in sorted(results, key=lambda res: -res.wall):
+        status = "ok" if res.returncode == 0 else "FAIL"
+        print("{:<28s} {:>6s} {:>10.3f} {:>10.3f}".format(res.name, status, res.wall, res.cpu))
+    print("-" * 57)
+    print("{:<28s} {:>6s} {:>10.3f} {:>10.3f}".format("total", "", wall,
+                                                     sum(res.cpu for res in results)))
+    return
+
+def print_verification(results, verdicts):
+    """
+    Prints the verification outcome of each unit-test, followed
+    by the diff of the failed ones.
+
+    :param results: the list of TestResult instances.
+    :param verdicts: a dictionary where 'key' is the unit-test name
+                     and 'value' is the '(status, diff)' pair
+                     returned by verify().
+    """
+    for res in results:
+        status, diff = verdicts[res.name]
+        if diff:
+            print_header(res.name)
+            print("\n".join(diff))
+            print("\n")
+    print("{:<28s} {:>6s} {:>10s} {:>10s}".format("test", "verify", "wall (s)", "solve (s)"))
+    print("-" * 57)
+    for res in results:
+        status, _ = verdicts[res.name]
+        print("{:<28s} {:>6s} {:>10.3f} {:>10.3f}".format(res.name, status, res.wall, res.solve))
+    print("-" * 57)
+    return
+
+def store_benchmark(path, results, verdicts):
+    """
+    Stores the per-test outcome and latency of a verification run,
+    so that runs with different OptiMathSAT versions can be compared.
+
+    :param path: the JSON output file.
+    :param results: the list of TestResult instances.
+    :param verdicts: the verification outcome of each unit-test.
+    """
+    data = {res.name : {"status" : verdicts[res.name][0],
+                        "wall" : res.wall,
+                        "cpu" : res.cpu,
+                        "solve" : res.solve} for res in results}
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4, sort_keys=True)
+    return
+
+def schedule(tests, timings):
+    """
+    Sorts unit-tests so that the ones expected to take longer
+    come first. Unit-tests without a recorded timing are
+    considered the longest ones.
+
+    :param tests: the list of unit-test paths.
+    :param timings: the timings recorded by earlier runs.
+
+    :returns: the sorted list of unit-test paths.
+    """
+    def expected(test):
+        return timings.get(os.path.basename(test), float("inf"))
+    return sorted(tests, key=expected, reverse=True)
+
+def run_serial(tests):
+    """
+    Runs the given unit-tests one after the other, printing
+    their output as it is produced.
+
+    :param tests: the list of unit-test paths.
+
+    :returns: the list of TestResult instances.
+    """
+    results = []
+    for test in tests:
+        print_header(os.path.basename(test))
+        sys.stdout.flush()
+        results.append(run_test(test, capture=False))
+        print("\n")
+    return results
+
+def run_parallel(tests, jobs, timings, quiet=False):
+    """
+    Runs the given unit-tests over a pool of workers, printing
+    the output of each unit-test once it has completed.
+
+    :param tests: the list of unit-test paths.
+    :param jobs: the number of workers.
+    :param timings: the timings recorded by earlier runs.
+    :param quiet: when enabled, the output of the unit-tests
+                  is not printed.
+
+    :returns: the list of TestResult instances, in the same
+              order as 'tests'.
+    """
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        futures = {test : pool.submit(run_test, test) for test in schedule(tests, timings)}
+        for future in futures.values():
+            res = future.result()
+            if not quiet:
+                print_header(res.name)
+                sys.stdout.write(res.output)
+                print("\n")
+                sys.stdout.flush()
+    return [futures[test].result() for test in tests]
+
+###
+### MAIN
+###
+
+def main():
+    """
+    Runs all unit-tests.
+
+    :returns: zero if all unit-tests succeeded.
+    """
+    parser = argparse.ArgumentParser(description="Runs all unit-tests.")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of unit-tests executed in parallel")
+    parser.add_argument("--verify", action="store_true",
+                        help="compare the output of each unit-test against "
+                             "its '## EXPECTED OUTPUT' block")
+    parser.add_argument("--no-verbose", action="store_true",
+                        help="ignore solver-verbose lines when verifying")
+    parser.add_argument("--bench", metavar="FILE",
+                        help="store per-test status and latency of a "
+                             "verification run in a JSON file (requires --verify)")
+    parser.add_argument("tests", nargs="*",
+                        help="unit-tests to run (default: all)")
+    args = parser.parse_args()
+    if args.bench and not args.verify:
+        parser.error("--bench requires --verify")
+
+    tests = args.tests or sorted(glob.glob(os.path.join(BASE_DIR, "unit-tests", "*.py")))
+
+    start = time.monotonic()
+    if args.verify:
+        results = run_parallel(tests, args.jobs, load_timings(), quiet=True)
+    elif args.jobs > 1:
+        results = run_parallel(tests, args.jobs, load_timings())
+    else:
+        results = run_serial(tests)
+    wall = time.monotonic() - start
+
+    store_timings({res.name : res.wall for res in results})
+
+    if args.verify:
+        verdicts = {res.name : verify(test, res, not args.no_verbose)
+                    for test, res in zip(tests, results)}
+        print_verification(results, verdicts)
+        if args.bench:
+            store_benchmark(args.bench, results, verdicts)
+        return 0 if all(status != "fail" for status, _ in verdicts.values()) else 1
+
+    print_table(results, wall)
+
+    return 0 if all(res.returncode == 0 for res in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
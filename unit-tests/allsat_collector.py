@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""
+allsat collector unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "opt.priority"     : "lex",
+    "model_generation" : "true",
+}
+
+DECLS = {
+    "bool" : ("a", "b", "c", "d", "e"), # (name, ...)
+    "int"  : ("y"),                     # (name, ...)
+    "rational" : ("x"),                 # (name, ...)
+    "bv" : (),                          # ((name, width), ... )
+    "fp" : ()                           # ((name, ebits, sbits), ... )
+}
+
+HARD = [
+    "(= (> (+ x y) 0) a)",
+    "(= (< (+ (* 2 x) (* 3 y)) (- 10)) c)",
+    "(or a b)",
+    "(or c d)",
+    "(=> e (< 10 x))",
+    "(=> (< 10 x) e)",
+    "(<= x 100)",
+    "(<= y 100)",
+]
+
+SOFT = {}
+
+###
+### ALLSAT COLLECTOR UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        make_all_vars(env, DECLS)
+        assert_string_formulas(env, HARD)
+        assert_string_soft_formulas_dict(env, SOFT)
+
+        with create_maximize(env, "x") as obj1, \
+             create_maximize(env, "y") as obj2:
+            assert_objective(env, obj1)
+            assert_objective(env, obj2)
+
+            chunks = []
+            collector = AllSatCollector(env, ["a", "b", "e"], chunks.append, chunk_size=1)
+            solve_all_sat(env, ["a", "b", "e"], collector)
+
+            print("models: {}".format(collector.stats()["models"]))
+            for chunk in chunks:
+                for row in chunk:
+                    print("{:03b}".format(row))
+                    for atom, value in collector.decode(row):
+                        print("\t{} : {}".format(atom, value))
+
+#
+## EXPECTED OUTPUT
+#
+# models: 2
+# 111
+#   a : True
+#   b : True
+#   e : True
+# 101
+#   a : True
+#   b : False
+#   e : True
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+allsat store unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+from allsat_store import AllSatReader, write_all_sat # pylint: disable=import-error
+
+import tempfile
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+DECLS = {
+    "bool" : ("a", "b", "c"),   # (name, ...)
+    "int"  : (),                # (name, ...)
+    "rational" : (),            # (name, ...)
+    "bv" : (),                  # ((name, width), ... )
+    "fp" : ()                   # ((name, ebits, sbits), ... )
+}
+
+HARD = ["(or a b c)"]
+
+###
+### ALLSAT STORE UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg, optimizing=False) as env:
+
+        make_all_vars(env, DECLS)
+        assert_string_formulas(env, HARD)
+
+        with tempfile.NamedTemporaryFile(suffix=".asat") as store:
+            print("stored: {}".format(write_all_sat(env, ["a", "b", "c"], store.name)))
+
+            with AllSatReader(store.name) as reader:
+                print("atoms: {}".format(reader.atoms))
+                print("models: {}".format(len(reader)))
+                print("a: {}".format(reader.count({"a" : True})))
+                print("not a, not b: {}".format(reader.count({"a" : False, "b" : False})))
+                idx = next(reader.filter({"a" : False, "b" : False}))
+                print("assignment: {}".format(sorted(reader.assignment(idx).items())))
+
+#
+## EXPECTED OUTPUT
+#
+# stored: 7
+# atoms: ['a', 'b', 'c']
+# models: 7
+# a: 4
+# not a, not b: 1
+# assignment: [('a', False), ('b', False), ('c', True)]
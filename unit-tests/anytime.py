@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+anytime optimization unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+DECLS = {
+    "bool" : (),                # (name, ...)
+    "int"  : ("x", "y"),        # (name, ...)
+    "rational" : (),            # (name, ...)
+    "bv" : (),                  # ((name, width), ... )
+    "fp" : (),                  # ((name, ebits, sbits), ... )
+}
+
+HARD = ["(<= 3 x)", "(<= x 100)", "(= y (+ x 2))"]
+
+###
+### ANYTIME OPTIMIZATION UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        make_all_vars(env, DECLS)
+        assert_string_formulas(env, HARD)
+
+        search = AnytimeSearch(env, "y", "min", bound=0, strategy="binary")
+        for event in search.events(timeout=10):
+            if event.kind == "model":
+                assert event.incumbent == int(str(event.model["y"]))
+
+        print("{} y : {}".format(event.kind, event.incumbent))
+        incumbents = [point[2] for point in search.trajectory if point[1] == "model"]
+        print("monotone: {}".format(incumbents == sorted(incumbents, reverse=True)))
+
+#
+## EXPECTED OUTPUT
+#
+# optimal y : 5
+# monotone: True
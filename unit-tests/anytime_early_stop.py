@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+"""
+anytime optimization early stop unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+DECLS = {
+    "bool" : (),                # (name, ...)
+    "int"  : ("x", "y"),        # (name, ...)
+    "rational" : (),            # (name, ...)
+    "bv" : (),                  # ((name, width), ... )
+    "fp" : (),                  # ((name, ebits, sbits), ... )
+}
+
+HARD = ["(<= 3 x)", "(<= x 100)", "(= y (+ x 2))"]
+
+###
+### ANYTIME OPTIMIZATION EARLY STOP UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        make_all_vars(env, DECLS)
+        assert_string_formulas(env, HARD)
+
+        # stop at the first model
+        search = AnytimeSearch(env, "y", "min")
+        event = search.run(lambda event: event.kind != "model", timeout=10)
+        print("stopped at: {}".format(event.kind))
+
+        # the bounds asserted by the search must have been retracted
+        push(env)
+        assert_string_formula(env, "(= y 102)")
+        print("y = 102 : {}".format("sat" if msat_solve(env) > 0 else "unsat"))
+        pop(env)
+
+        search = AnytimeSearch(env, "y", "min", bound=0, strategy="binary")
+        event = search.run(lambda event: True, timeout=10)
+        print("{} y : {}".format(event.kind, event.incumbent))
+
+#
+## EXPECTED OUTPUT
+#
+# stopped at: model
+# y = 102 : sat
+# optimal y : 5
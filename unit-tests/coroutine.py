@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""
+asyncio solve unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+import asyncio
+
+from async_solve import solve_async # pylint: disable=import-error
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {}
+
+DECLS = {
+    "bool" : (),                # (name, ...)
+    "int"  : (),                # (name, ...)
+    "rational" : ("x", "y"),    # (name, ...)
+    "bv" : (),                  # ((name, width), ... )
+    "fp" : (),                  # ((name, ebits, sbits), ... )
+}
+
+HARD = ["(<= 42 x)", "(<= y x)"]
+
+SOFT = {}
+
+###
+### ASYNCIO SOLVE UNIT-TEST
+###
+
+async def main():
+    """Solves the problem without blocking the event loop."""
+    with create_config(OPTIONS) as cfg:
+        with create_env(cfg) as env:
+
+            make_all_vars(env, DECLS)
+            assert_string_formulas(env, HARD)
+            assert_string_soft_formulas_dict(env, SOFT)
+
+            with create_minimize(env, "x") as obj:
+                assert_objective(env, obj)
+
+                res = await solve_async(env, timeout=10.0)
+                print("sat" if res > 0 else ("unsat" if res == 0 else "unknown"))
+                get_objectives_pretty(env)
+
+                # an interrupted search must not affect later ones
+                await solve_async(env, termination_test=lambda: 1)
+                solve(env)
+                get_objectives_pretty(env)
+
+asyncio.run(main())
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# (objectives
+#   (x 42)
+# )
+# sat
+# (objectives
+#   (x 42)
+# )
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+"""
+environment pool unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {}
+
+DECLS = {
+    "bool" : (),        # (name, ...)
+    "int"  : (),        # (name, ...)
+    "rational" : ("x"), # (name, ...)
+    "bv" : (),          # ((name, width), ... )
+    "fp" : (),          # ((name, ebits, sbits), ... )
+}
+
+REQUESTS = [
+    ["(<= 5 x)"],
+    ["(<= 7 x)"],
+]
+
+SOFT = {}
+
+###
+### ENVIRONMENT POOL UNIT-TEST
+###
+
+POOL = EnvPool(size=1)
+
+for HARD in REQUESTS:
+    # the second request reuses the environment of the first one
+    with POOL.acquire(OPTIONS, DECLS) as env:
+
+        assert_string_formulas(env, HARD)
+        assert_string_soft_formulas_dict(env, SOFT)
+
+        with create_minimize(env, "x") as obj:
+            assert_objective(env, obj)
+            solve(env)
+            get_objectives_pretty(env)
+
+for STATS in POOL.stats().values():
+    print("hits: {}, misses: {}".format(STATS["hits"], STATS["misses"]))
+
+POOL.clear()
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# (objectives
+#   (x 5)
+# )
+# sat
+# (objectives
+#   (x 7)
+# )
+# hits: 1, misses: 1
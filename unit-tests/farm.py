@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""
+solve farm unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from solve_farm import SolveFarm # pylint: disable=import-error
+
+###
+### DATA
+###
+
+BASE = {
+    "options" : {"model_generation" : "true"},
+    "decls" : {
+        "bool" : (),            # (name, ...)
+        "int"  : ("x", "y"),    # (name, ...)
+        "rational" : (),        # (name, ...)
+        "bv" : (),              # ((name, width), ... )
+        "fp" : ()               # ((name, ebits, sbits), ... )
+    },
+    "soft" : {},
+}
+
+PROBLEMS = [
+    dict(BASE, hard=["(<= 5 x)", "(= y (* 2 x))"], objectives=[("min", "y")]),
+    dict(BASE, hard=["(<= x 7)", "(= y (- x))"], objectives=[("max", "x")]),
+    dict(BASE, hard=["(< x 0)", "(< 0 x)"], objectives=[("min", "x")]),
+]
+
+###
+### SOLVE FARM UNIT-TEST
+###
+
+if __name__ == "__main__":
+
+    with SolveFarm(workers=2) as farm:
+        for RES in farm.map(PROBLEMS):
+            print(RES["status"])
+            print("(objectives")
+            for OBJ in RES["objectives"]:
+                print("\t({} {})".format(OBJ["term"], OBJ["optimum"]))
+            print(")")
+            for NAME, VALUE in sorted(RES["model"].items()):
+                print("\t{} : {}".format(NAME, VALUE))
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# (objectives
+#   (y 10)
+# )
+#   x : 5
+#   y : 10
+# sat
+# (objectives
+#   (x 7)
+# )
+#   x : 7
+#   y : -7
+# unsat
+# (objectives
+#   (x unsat)
+# )
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+lazy model unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+DECLS = {
+    "bool" : (),                # (name, ...)
+    "int"  : (),                # (name, ...)
+    "rational" : ("x", "y"),    # (name, ...)
+    "bv" : (),                  # ((name, width), ... )
+    "fp" : (),                  # ((name, ebits, sbits), ... )
+}
+
+HARD = ["(<= 42 x)", "(= y (+ x 1))"]
+
+SOFT = {}
+
+###
+### LAZY MODEL UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        make_all_vars(env, DECLS)
+        assert_string_formulas(env, HARD)
+        assert_string_soft_formulas_dict(env, SOFT)
+
+        with create_minimize(env, "x") as obj:
+            assert_objective(env, obj)
+            solve(env)
+
+            load_model(env, obj)
+            with get_model(env) as model:
+                # lookup by name
+                print("x : {}".format(model["x"]))
+                print("y : {}".format(model["y"]))
+                # lookup by term
+                print("(+ x y) : {}".format(model[string_to_term(env, "(+ x y)")]))
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# x : 42
+# y : 43
+# (+ x y) : 85
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""
+model export unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from model_export import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+DECLS = {
+    "bool" : ("b0", "b1"),      # (name, ...)
+    "int"  : ("x", "y"),        # (name, ...)
+    "rational" : ("r", ),       # (name, ...)
+    "bv" : (                    # ((name, width), ... )
+        ("v0", 8),
+        ("v1", 12),
+    ),
+    "fp" : (                    # ((name, ebits, sbits), ... )
+        ("f0", 8, 23),
+    ),
+}
+
+HARD = [
+    "(and b0 (not b1))",
+    "(= x (- 7))",
+    "(= y 1000000)",
+    "(= r (/ 5 2))",
+    "(= v0 (_ bv200 8))",
+    "(= v1 (_ bv3000 12))",
+    "(= f0 (fp #b0 #b10000010 #b01000000000000000000000))",
+    "(= z 1180591620717411303424)",
+]
+
+###
+### MODEL EXPORT UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        vdict = make_all_vars(env, DECLS)
+        big = make_int_vars(env, ["z"])
+        assert_string_formulas(env, HARD)
+
+        solve(env)
+        values = export_all_values(env, vdict)
+        for vtype in sorted(values):
+            print("{:<8s} {:<8s} {}".format(vtype, str(values[vtype].dtype),
+                                            values[vtype].tolist()))
+        values = export_int_values(env, big)
+        print("{:<8s} {:<8s} {}".format("big", str(values.dtype), values.tolist()))
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# bool     bool     [True, False]
+# bv       uint16   [200, 3000]
+# fp       float32  [10.0]
+# int      int64    [-7, 1000000]
+# rational float64  [2.5]
+# big      object   [1180591620717411303424]
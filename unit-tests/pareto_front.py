@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""
+pareto front generator unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+    "opt.priority"     : "par",
+    "opt.par.mode"     : "incremental"
+}
+
+DECLS = {
+    "bool" : (),                # (name, ...)
+    "int"  : (),                # (name, ...)
+    "rational" : ("a", "b"),    # (name, ...)
+    "bv" : (),                  # ((name, width), ... )
+    "fp" : ()                   # ((name, ebits, sbits), ... )
+}
+
+HARD = [
+    """(or
+        (and (= a 1) (= b 1))
+        (and (= a 2) (= b 1))
+        (and (= a 1) (= b 2))
+        (and (= a 2) (= b 2))
+        (and (= a 3) (= b 1))
+        (and (= a 1) (= b 3))
+    )"""
+]
+
+###
+### PARETO FRONT GENERATOR UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        make_all_vars(env, DECLS)
+        assert_string_formulas(env, HARD)
+
+        with create_maximize(env, "a") as obj1, \
+             create_maximize(env, "b") as obj2:
+            assert_objective(env, obj1)
+            assert_objective(env, obj2)
+
+            front = ParetoFront(["max", "max"])
+            for point in iter_pareto_front(env, front, max_points=2):
+                print("point {}: a = {}, b = {}".format(
+                    point.index, point.model["a"], point.model["b"]))
+
+            print("front: {}".format(sorted(point.values for point in front)))
+            print("dominated (2, 1): {}".format(front.is_dominated((2, 1))))
+            print("dominated (1, 3): {}".format(front.is_dominated((1, 3))))
+
+#
+## EXPECTED OUTPUT
+#
+# point 0: a = 3, b = 1
+# point 1: a = 2, b = 2
+# front: [(Fraction(2, 1), Fraction(2, 1)), (Fraction(3, 1), Fraction(1, 1))]
+# dominated (2, 1): True
+# dominated (1, 3): False
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+parallel pareto front unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+
+################################################################################
+################################################################################
+################################################################################
+
+from solve_farm import SolveFarm # pylint: disable=import-error
+from pareto_split import solve_pareto_split # pylint: disable=import-error
+
+###
+### DATA
+###
+
+PROBLEM = {
+    "options" : {
+        "model_generation" : "true",
+        "opt.par.mode"     : "incremental"
+    },
+    "decls" : {
+        "bool" : (),                # (name, ...)
+        "int"  : (),                # (name, ...)
+        "rational" : ("a", "b"),    # (name, ...)
+        "bv" : (),                  # ((name, width), ... )
+        "fp" : ()                   # ((name, ebits, sbits), ... )
+    },
+    "hard" : [
+        """(or
+            (and (= a 1) (= b 1))
+            (and (= a 2) (= b 1))
+            (and (= a 1) (= b 2))
+            (and (= a 2) (= b 2))
+            (and (= a 3) (= b 1))
+            (and (= a 1) (= b 3))
+        )"""
+    ],
+    "soft" : {},
+    "objectives" : [("max", "a"), ("max", "b")],
+}
+
+###
+### PARALLEL PARETO FRONT UNIT-TEST
+###
+
+if __name__ == "__main__":
+
+    with SolveFarm(workers=2) as farm:
+        FRONT, STATS = solve_pareto_split(farm, PROBLEM, splits=[3, 1])
+        print("boxes: {}".format(STATS["boxes"]))
+        for POINT in FRONT:
+            print("a : {}, b : {}".format(POINT.model["a"], POINT.model["b"]))
+
+#
+## EXPECTED OUTPUT
+#
+# boxes: 2
+# a : 3, b : 1
+# a : 2, b : 2
+# a : 1, b : 3
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""
+portfolio unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+
+################################################################################
+################################################################################
+################################################################################
+
+from portfolio import DEFAULT_PORTFOLIO, solve_portfolio # pylint: disable=import-error
+
+###
+### DATA
+###
+
+PROBLEM = {
+    "name" : "bacp-19",
+    "options" : {},
+    "smtlib2" : os.path.join(BASE_DIR, 'smt2', 'bacp-19.smt2'),
+    "objectives" : [("min", "objective")],
+}
+
+###
+### PORTFOLIO UNIT-TEST
+###
+
+if __name__ == "__main__":
+
+    RES = solve_portfolio(PROBLEM, DEFAULT_PORTFOLIO[:3], timeout=60)
+    print(RES["status"])
+    print("(objectives")
+    for OBJ in RES["objectives"]:
+        print("\t({} {})".format(OBJ["term"], OBJ["optimum"]))
+    print(")")
+    print("winner in portfolio: {}".format(RES["config"] in DEFAULT_PORTFOLIO))
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# (objectives
+#   (objective 27)
+# )
+# winner in portfolio: True
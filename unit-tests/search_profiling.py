@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+"""
+search profile unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+from search_profile import profile_solve # pylint: disable=import-error
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "opt.verbose"               : "true",
+    "opt.strategy"              : "ada",
+    "opt.bin.max_consecutive"   : "5",
+    "opt.bin.pivot_position"    : "0.5",
+}
+
+###
+### SEARCH PROFILE UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        # load non-trivial formula directly from file
+        with open(os.path.join(BASE_DIR, 'smt2', 'bacp-19.smt2'), 'r') as f:
+            TERM = msat_from_smtlib2(env, f.read())
+            assert not MSAT_ERROR_TERM(TERM)
+            msat_assert_formula(env, TERM)
+
+        with create_minimize(env, "objective") as obj:
+            assert_objective(env, obj)
+
+            ret, profiler = profile_solve(env)
+            print("sat" if ret > 0 else "not sat")
+
+            report = profiler.report()["objective"]
+            for kind in ("linear", "binary"):
+                print("{} : {steps} steps, {sat} sat, {unsat} unsat".format(kind, **report[kind]))
+            last = profiler.steps[-1]
+            print("last : {} step {}, [ {}, {} ]".format(last.kind, last.index,
+                                                         last.lower, last.upper))
+            trace = profiler.to_trace()
+            print("events : {}".format(len(trace["traceEvents"])))
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# linear : 5 steps, 4 sat, 1 unsat
+# binary : 14 steps, 4 sat, 10 unsat
+# last : linear step 5, [ 27, 27 ]
+# events : 21
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""
+incremental session unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+BASE = {
+    "decls" : {
+        "bool" : (),            # (name, ...)
+        "int"  : ("x", "y"),    # (name, ...)
+        "rational" : (),        # (name, ...)
+        "bv" : (),              # ((name, width), ... )
+        "fp" : ()               # ((name, ebits, sbits), ... )
+    },
+    "soft" : {},
+    "objectives" : [("min", "x")],
+}
+
+REQUESTS = [
+    dict(BASE, hard=["(<= 0 y)", "(<= y x)"]),
+    dict(BASE, hard=["(<= 0 y)", "(<= y x)", "(<= 4 y)"]),
+    dict(BASE, hard=["(<= 0 y)", "(<= y x)", "(<= 7 y)"]),
+    # removes a constraint of the lowest layer
+    dict(BASE, hard=["(<= 0 y)", "(<= 7 y)", "(<= 2 x)"]),
+    # changes the objectives
+    dict(BASE, hard=["(<= 0 y)", "(<= 7 y)", "(<= 2 x)", "(<= x 9)"],
+         objectives=[("max", "x")]),
+]
+
+###
+### INCREMENTAL SESSION UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+        with Session(env) as session:
+            for request in REQUESTS:
+                stats = session.apply(request)
+                print("asserted: {asserted}, re-asserted: {re_asserted}, "
+                      "retracted: {retracted}, kept: {kept}, "
+                      "reused: {reused}, parsed: {parsed}".format(**stats))
+                session.solve()
+                get_objectives_pretty(env)
+
+#
+## EXPECTED OUTPUT
+#
+# asserted: 2, re-asserted: 0, retracted: 0, kept: 0, reused: 0, parsed: 2
+# (objectives
+#   (x 0)
+# )
+# asserted: 1, re-asserted: 0, retracted: 0, kept: 2, reused: 0, parsed: 1
+# (objectives
+#   (x 4)
+# )
+# asserted: 1, re-asserted: 0, retracted: 1, kept: 2, reused: 0, parsed: 1
+# (objectives
+#   (x 7)
+# )
+# asserted: 1, re-asserted: 2, retracted: 1, kept: 0, reused: 2, parsed: 1
+# (objectives
+#   (x 2)
+# )
+# asserted: 4, re-asserted: 0, retracted: 0, kept: 0, reused: 3, parsed: 1
+# (objectives
+#   (x 9)
+# )
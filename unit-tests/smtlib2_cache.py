@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+SMT-LIBv2 formula cache unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+SMT2_FILE = os.path.join(BASE_DIR, 'smt2', 'bacp-19.smt2')
+
+###
+### SMTLIB2 CACHE UNIT-TEST
+###
+
+# the formula is parsed only for the first environment,
+# and shared with the second one.
+for _ in range(2):
+    with create_config(OPTIONS) as cfg:
+        with create_env_from_smtlib2(cfg, SMT2_FILE) as (env, term):
+
+            with create_minimize(env, "objective") as obj:
+                assert_objective(env, obj)
+
+                solve(env)
+                get_objectives_pretty(env)
+
+STATS = SMTLIB2_CACHE.stats()
+print("hits: {}, misses: {}".format(STATS["hits"], STATS["misses"]))
+
+SMTLIB2_CACHE.clear()
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# (objectives
+#   (objective 27)
+# )
+# sat
+# (objectives
+#   (objective 27)
+# )
+# hits: 1, misses: 1
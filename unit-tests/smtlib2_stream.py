@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+"""
+SMT-LIBv2 stream loading unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+# N.B.: parentheses within comments, string literals and quoted
+#       symbols, commands sharing a line or spanning several lines.
+SCRIPT = b"""; a comment with (parentheses
+(set-logic QF_LIA)
+(declare-fun |x (quoted)| () Int)
+(declare-fun y () Int) (declare-fun z () Int)
+(define-fun twice ((v Int)) Int (+ v v))
+(define-fun unused ((v Int)) Int (- v))
+(define-fun four ((v Int)) Int (twice (twice v)))
+(set-info :source "a string with ) and "" quotes")
+(assert (= 3 |x (quoted)|)) ; trailing (comment
+(assert
+  (= y (twice |x (quoted)|)))
+(assert (= z (four 1)))
+"""
+
+###
+### SMT-LIBv2 STREAM UNIT-TEST
+###
+
+for exact in (False, True):
+    groups = [SCRIPT[start:end].decode("utf-8")
+              for start, end in iter_smtlib2_commands(SCRIPT, exact)]
+    print("exact: {}, commands: {}".format(exact, len(groups)))
+    print("\n".join(groups))
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "script.smt2")
+    with open(path, 'wb') as f:
+        f.write(SCRIPT)
+
+    # a chunk size of 1 byte parses each command in its own chunk
+    for chunk_size in (1, 1 << 20):
+        with create_config(OPTIONS) as cfg:
+            with create_env(cfg) as env:
+                terms = load_smtlib2_stream(env, path, chunk_size)
+                print("chunk size: {}, chunks: {}".format(chunk_size, len(terms)))
+                solve(env)
+                with get_model(env) as model:
+                    print("y : {}, z : {}".format(model["y"], model["z"]))
+
+#
+## EXPECTED OUTPUT
+#
+# exact: False, commands: 10
+# (set-logic QF_LIA)
+# (declare-fun |x (quoted)| () Int)
+# (declare-fun y () Int) (declare-fun z () Int)
+# (define-fun twice ((v Int)) Int (+ v v))
+# (define-fun unused ((v Int)) Int (- v))
+# (define-fun four ((v Int)) Int (twice (twice v)))
+# (set-info :source "a string with ) and "" quotes")
+# (assert (= 3 |x (quoted)|))
+# (assert
+#   (= y (twice |x (quoted)|)))
+# (assert (= z (four 1)))
+# exact: True, commands: 11
+# (set-logic QF_LIA)
+# (declare-fun |x (quoted)| () Int)
+# (declare-fun y () Int)
+# (declare-fun z () Int)
+# (define-fun twice ((v Int)) Int (+ v v))
+# (define-fun unused ((v Int)) Int (- v))
+# (define-fun four ((v Int)) Int (twice (twice v)))
+# (set-info :source "a string with ) and "" quotes")
+# (assert (= 3 |x (quoted)|))
+# (assert
+#   (= y (twice |x (quoted)|)))
+# (assert (= z (four 1)))
+# chunk size: 1, chunks: 6
+# sat
+# y : 6, z : 4
+# chunk size: 1048576, chunks: 2
+# sat
+# y : 6, z : 4
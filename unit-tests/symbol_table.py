@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+symbol table unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+DECLS = {
+    "bool" : (),                # (name, ...)
+    "int"  : ("x", "y"),        # (name, ...)
+    "rational" : (),            # (name, ...)
+    "bv" : (),                  # ((name, width), ... )
+    "fp" : (),                  # ((name, ebits, sbits), ... )
+}
+
+REQUESTS = [
+    ["(<= 3 x)", "(<= x y)"],
+    ["(<= 5 x)", "(<= x y)"],
+]
+
+###
+### SYMBOL TABLE UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        table = enable_symbol_table(env)
+
+        for hard in REQUESTS:
+            push(env)
+
+            # repeated declarations return the existing variables
+            make_all_vars(env, DECLS)
+            assert_string_formulas(env, hard)
+
+            with create_minimize(env, "y") as obj:
+                assert_objective(env, obj)
+                solve(env)
+                get_objectives_pretty(env)
+
+            pop(env)
+
+        try:
+            make_bool_var(env, "x")
+        except Exception as exc: # pylint: disable=broad-except
+            print(exc)
+
+        print("hits: {hits}, misses: {misses}, size: {size}".format(**table.stats()))
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# (objectives
+#   (y 3)
+# )
+# sat
+# (objectives
+#   (y 5)
+# )
+# Variable 'x' already declared with type 'Int'.
+# hits: 2, misses: 2, size: 2
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+"""
+term cache unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {}
+
+DECLS = {
+    "bool" : (),        # (name, ...)
+    "int"  : (),        # (name, ...)
+    "rational" : ("x"), # (name, ...)
+    "bv" : (),          # ((name, width), ... )
+    "fp" : (),          # ((name, ebits, sbits), ... )
+}
+
+HARD = ["(<= x 10)"]
+
+SOFT = {}
+
+###
+### TERM CACHE UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        CACHE = enable_term_cache(env)
+
+        make_all_vars(env, DECLS)
+        assert_string_formulas(env, HARD)
+
+        with create_minimize(env, "x") as obj:
+
+            for lower in ("5", "7", "5"):
+                push(env)
+                assert_objective(env, obj)
+                # cached terms parsed after push() are dropped by pop()
+                assert_string_formula(env, "(<= {} x)".format(lower))
+                # cached terms parsed before push() are reused
+                assert_string_formulas(env, HARD)
+                solve(env)
+                get_objectives_pretty(env)
+                pop(env)
+
+        STATS = CACHE.stats()
+        print("hits: {}, misses: {}".format(STATS["hits"], STATS["misses"]))
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# (objectives
+#   (x 5)
+# )
+# sat
+# (objectives
+#   (x 7)
+# )
+# sat
+# (objectives
+#   (x 5)
+# )
+# hits: 3, misses: 5
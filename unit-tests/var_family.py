@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+"""
+variable family unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+N = 5
+
+###
+### VARIABLE FAMILY UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        load = make_var_family(env, "course_load", msat_get_integer_type(env), range(1, N + 1))
+
+        for idx in range(1, N + 1):
+            assert_string_formula(env, "(<= {} {})".format(idx, msat_term_repr(load[idx])))
+
+        with create_minimize(env, "(+ {})".format(" ".join(msat_term_repr(term) for term in load))) as obj:
+            assert_objective(env, obj)
+            solve(env)
+
+            load_model(env, obj)
+            with get_model(env) as model:
+                print("course_load[3] : {}".format(model[load[3]]))
+                print("course_load__ARRAY__5 : {}".format(model[load.lookup("course_load__ARRAY__5")]))
+
+#
+## EXPECTED OUTPUT
+#
+# sat
+# course_load[3] : 3
+# course_load__ARRAY__5 : 5
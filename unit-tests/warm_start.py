@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+"""
+warm start unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+DECLS = {
+    "bool" : ("a",),            # (name, ...)
+    "int"  : ("x",),            # (name, ...)
+    "rational" : (),            # (name, ...)
+    "bv" : (("v", 8),),         # ((name, width), ... )
+    "fp" : (),                  # ((name, ebits, sbits), ... )
+}
+
+HARD = ["(<= 3 x)", "(= a (< x 10))", "(bvsle ((_ to_bv 8) (- 6)) v)"]
+
+PERTURBATIONS = ["(<= 5 x)", "(<= 2 x)"]
+
+BV_PERTURBATIONS = ["(bvsle ((_ to_bv 8) (- 4)) v)"]
+
+###
+### WARM START UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        make_all_vars(env, DECLS)
+        assert_string_formulas(env, HARD)
+
+        with create_minimize(env, "x") as obj:
+            push(env)
+            assert_objective(env, obj)
+
+            with warm_solve(env, None) as (ret, fallback):
+                warm = get_warm_start(env, [("min", "x")])
+            print("bounds: {}".format(warm.bounds))
+
+            for perturbation in PERTURBATIONS:
+                push(env)
+                assert_string_formula(env, perturbation)
+                with warm_solve(env, warm) as (ret, fallback):
+                    print("{} fallback: {}".format(perturbation, fallback))
+                    get_objectives_pretty(env)
+                    warm = get_warm_start(env, [("min", "x")])
+                pop(env)
+            pop(env)
+
+        with create_minimize(env, "v", signed=True) as obj:
+            assert_objective(env, obj)
+
+            with warm_solve(env, None) as (ret, fallback):
+                warm = get_warm_start(env, [("min", "v", True)])
+            print("bounds: {}".format(warm.bounds))
+
+            for perturbation in BV_PERTURBATIONS:
+                push(env)
+                assert_string_formula(env, perturbation)
+                with warm_solve(env, warm) as (ret, fallback):
+                    print("{} fallback: {}".format(perturbation, fallback))
+                    get_objectives_pretty(env)
+                pop(env)
+
+#
+## EXPECTED OUTPUT
+#
+# bounds: ['(<= x 3)']
+# (<= 5 x) fallback: True
+# (objectives
+#   (x 5)
+# )
+# (<= 2 x) fallback: False
+# (objectives
+#   (x 3)
+# )
+# bounds: ['(bvsle v (_ bv250 8))']
+# (bvsle ((_ to_bv 8) (- 4)) v) fallback: True
+# (objectives
+#   (v 252_8)
+# )
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+warm start branching hints unit-test.
+"""
+
+###
+### SETUP PATHS
+###
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INCLUDE_DIR = os.path.join(BASE_DIR, '..', 'include')
+LIB_DIR = os.path.join(BASE_DIR, '..', 'lib')
+sys.path.append(INCLUDE_DIR)
+sys.path.append(LIB_DIR)
+
+################################################################################
+################################################################################
+################################################################################
+
+from wrapper import * # pylint: disable=unused-wildcard-import,wildcard-import
+
+###
+### DATA
+###
+
+OPTIONS = {
+    "model_generation" : "true",
+}
+
+DECLS = {
+    "bool" : ("a", "b"),        # (name, ...)
+    "int"  : (),                # (name, ...)
+    "rational" : (),            # (name, ...)
+    "bv" : (),                  # ((name, width), ... )
+    "fp" : (),                  # ((name, ebits, sbits), ... )
+}
+
+HARD = ["(or a b)"]
+
+###
+### WARM START HINTS UNIT-TEST
+###
+
+with create_config(OPTIONS) as cfg:
+    with create_env(cfg) as env:
+
+        make_all_vars(env, DECLS)
+        assert_string_formulas(env, HARD)
+
+        # previous solve, in which 'a' is forced
+        push(env)
+        assert_string_formulas(env, ["a", "(not b)"])
+        with warm_solve(env, None) as (ret, fallback):
+            warm = get_warm_start(env)
+        pop(env)
+        print("model: {}".format(sorted(warm.model)))
+
+        # 'a' and 'b' are free, the previous values are preferred
+        with warm_solve(env, warm) as (ret, fallback):
+            with get_model(env) as model:
+                print("a : {}, b : {}".format(msat_term_is_true(env, model["a"]) > 0,
+                                              msat_term_is_true(env, model["b"]) > 0))
+
+#
+## EXPECTED OUTPUT
+#
+# model: [('a', 'true'), ('b', 'false')]
+# a : True, b : False